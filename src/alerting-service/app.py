@@ -28,67 +28,159 @@ def send_slack_notification(message):
 # Alerting poller state
 LAST_ALERT = None
 LAST_ALERT_TS = 0.0
+# Sensors currently in ALARM according to the status stream, for re-alerts
+ACTIVE_ALARMS = {}
+# Id of the last stream event seen ("epoch:version"), sent back as Last-Event-ID
+STREAM_CURSOR = None
 
 
-def poll_monitoring():
+def handle_status(data, checked_at):
+    """Alert decision for one status payload (a /status poll or stream event)."""
     global LAST_ALERT, LAST_ALERT_TS
+    state = data.get('state')
+    sensor_id = data.get('sensor_id')
+    try:
+        temp = float(data.get('temp_f'))
+    except (TypeError, ValueError):
+        temp = None
+
+    if state == 'ALARM' and temp is not None:
+        now = time.time()
+        should_alert = False
+
+        if LAST_ALERT is None:
+            should_alert = True
+        else:
+            # re-alert if previous state not ALARM
+            if LAST_ALERT.get('state') != 'ALARM':
+                should_alert = True
+            # re-alert if temp changed by >= 1.0
+            elif abs(temp - float(LAST_ALERT.get('temp_f', temp))) >= 1.0:
+                should_alert = True
+            # re-alert if 60s passed since last alert
+            elif now - LAST_ALERT_TS >= 60:
+                should_alert = True
+
+        if should_alert:
+            # Log alert line
+            print(f"ALERT state=ALARM temp_f={temp} sensor_id={sensor_id} checked_at={checked_at}")
+            LAST_ALERT = {
+                'service': 'alerting-service',
+                'state': 'ALARM',
+                'temp_f': temp,
+                'sensor_id': sensor_id,
+                'checked_at': checked_at,
+                'issued_at': datetime.utcnow().isoformat() + 'Z'
+            }
+            LAST_ALERT_TS = now
+
+
+def poll_once(monitoring_url):
+    checked_at = datetime.utcnow().isoformat() + 'Z'
+    try:
+        resp = requests.get(monitoring_url, timeout=5)
+        if resp.status_code != 200:
+            print(f"WARN monitoring_unreachable error=HTTP_{resp.status_code}")
+            return
+        data = resp.json()
+        if data.get('state') == 'ALARM' and data.get('sensor_id') is not None:
+            ACTIVE_ALARMS[data['sensor_id']] = data
+        handle_status(data, checked_at)
+    except requests.exceptions.RequestException as e:
+        print(f"WARN monitoring_unreachable error={e}")
+    except Exception as e:
+        print(f"WARN monitoring_unreachable error={e}")
+
+
+def iter_sse(lines):
+    """Parse server-sent event lines into (event, data, id) tuples.
+
+    Comment lines (the server's keepalives) come out as ('keepalive', None, None).
+    """
+    event, data, event_id = 'message', [], None
+    for line in lines:
+        if line is None:
+            continue
+        if line == '':
+            if data:
+                yield event, '\n'.join(data), event_id
+            event, data, event_id = 'message', [], None
+        elif line.startswith(':'):
+            yield 'keepalive', None, None
+        else:
+            field, _, value = line.partition(':')
+            if value.startswith(' '):
+                value = value[1:]
+            if field == 'event':
+                event = value
+            elif field == 'data':
+                data.append(value)
+            elif field == 'id':
+                event_id = value
+
+
+def handle_stream_event(event, payload, monitoring_url):
+    if event == 'reset' or (event == 'hello' and payload.get('resync')):
+        # Fresh subscription or missed transitions: take a full snapshot
+        ACTIVE_ALARMS.clear()
+        poll_once(monitoring_url)
+    elif event == 'transition':
+        sensor_id = payload.get('sensor_id')
+        if payload.get('state') == 'ALARM' and not payload.get('silent'):
+            ACTIVE_ALARMS[sensor_id] = payload
+            handle_status(payload, datetime.utcnow().isoformat() + 'Z')
+        else:
+            ACTIVE_ALARMS.pop(sensor_id, None)
+    elif event == 'keepalive':
+        # Nothing changed; still re-alert the current alarm every 60s
+        if LAST_ALERT is not None and LAST_ALERT.get('sensor_id') in ACTIVE_ALARMS:
+            handle_status(ACTIVE_ALARMS[LAST_ALERT['sensor_id']], datetime.utcnow().isoformat() + 'Z')
+
+
+def stream_monitoring(stream_url, monitoring_url, read_timeout):
+    """Follow the monitoring status stream until it closes or fails."""
+    global STREAM_CURSOR
+    headers = {'Accept': 'text/event-stream'}
+    if STREAM_CURSOR is not None:
+        headers['Last-Event-ID'] = str(STREAM_CURSOR)
+    with requests.get(stream_url, headers=headers, stream=True, timeout=(5, read_timeout)) as resp:
+        resp.raise_for_status()
+        if not resp.headers.get('Content-Type', '').startswith('text/event-stream'):
+            raise ValueError(f"unexpected content type {resp.headers.get('Content-Type')}")
+        print(f"INFO monitoring_stream_connected cursor={STREAM_CURSOR}")
+        resumed = STREAM_CURSOR is not None
+        for event, data, event_id in iter_sse(resp.iter_lines(decode_unicode=True)):
+            payload = json.loads(data) if data else {}
+            if event == 'hello' and not resumed:
+                payload['resync'] = True
+            handle_stream_event(event, payload, monitoring_url)
+            if event_id is not None:
+                # Opaque "epoch:version"; monitoring answers a cursor from
+                # before its restart with a reset
+                STREAM_CURSOR = event_id
+
+
+def poll_monitoring():
     # Environment variables:
     # - MONITORING_STATUS_URL: URL to fetch monitoring status (default: Docker DNS on port 5000)
-    # - POLL_INTERVAL_SECONDS: polling interval in seconds (default: 5)
+    # - MONITORING_STREAM_URL: status stream (SSE) to follow; default is
+    #   MONITORING_STATUS_URL + '/stream', empty disables streaming
+    # - POLL_INTERVAL_SECONDS: polling interval in seconds while the stream is down (default: 5)
+    # - STREAM_READ_TIMEOUT_SECONDS: drop the stream if nothing, not even a keepalive, arrives
     monitoring_url = os.getenv('MONITORING_STATUS_URL', os.getenv('MONITORING_URL', 'http://monitoring-service:5000/status'))
+    stream_url = os.getenv('MONITORING_STREAM_URL', monitoring_url.rstrip('/') + '/stream')
     interval = float(os.getenv('POLL_INTERVAL_SECONDS', 5))
+    read_timeout = float(os.getenv('STREAM_READ_TIMEOUT_SECONDS', 45))
     while True:
-        checked_at = datetime.utcnow().isoformat() + 'Z'
-        try:
-            resp = requests.get(monitoring_url, timeout=5)
-            if resp.status_code != 200:
-                print(f"WARN monitoring_unreachable error=HTTP_{resp.status_code}")
-                time.sleep(interval)
-                continue
-
-            data = resp.json()
-            state = data.get('state')
-            sensor_id = data.get('sensor_id')
+        if stream_url:
             try:
-                temp = float(data.get('temp_f'))
-            except (TypeError, ValueError):
-                temp = None
-
-            if state == 'ALARM' and temp is not None:
-                now = time.time()
-                should_alert = False
-
-                if LAST_ALERT is None:
-                    should_alert = True
-                else:
-                    # re-alert if previous state not ALARM
-                    if LAST_ALERT.get('state') != 'ALARM':
-                        should_alert = True
-                    # re-alert if temp changed by >= 1.0
-                    elif abs(temp - float(LAST_ALERT.get('temp_f', temp))) >= 1.0:
-                        should_alert = True
-                    # re-alert if 60s passed since last alert
-                    elif now - LAST_ALERT_TS >= 60:
-                        should_alert = True
-
-                if should_alert:
-                    # Log alert line
-                    print(f"ALERT state=ALARM temp_f={temp} sensor_id={sensor_id} checked_at={checked_at}")
-                    LAST_ALERT = {
-                        'service': 'alerting-service',
-                        'state': 'ALARM',
-                        'temp_f': temp,
-                        'sensor_id': sensor_id,
-                        'checked_at': checked_at,
-                        'issued_at': datetime.utcnow().isoformat() + 'Z'
-                    }
-                    LAST_ALERT_TS = now
-
-        except requests.exceptions.RequestException as e:
-            print(f"WARN monitoring_unreachable error={e}")
-        except Exception as e:
-            print(f"WARN monitoring_unreachable error={e}")
-
+                stream_monitoring(stream_url, monitoring_url, read_timeout)
+            except requests.exceptions.RequestException as e:
+                print(f"WARN monitoring_stream_down error={e}")
+            except Exception as e:
+                print(f"WARN monitoring_stream_down error={e}")
+        # Stream closed or unavailable: poll once, then try the stream again
+        poll_once(monitoring_url)
         time.sleep(interval)
 
 
@@ -127,9 +219,11 @@ def health_check():
     # More complex checks could involve testing connectivity to Slack API if credentials were provided.
     return jsonify({"status": "healthy", "message": "Alerting service is operational"}), 200
 
-if __name__ == '__main__':
+def start_background():
     # Start background poller
     poller_thread = threading.Thread(target=poll_monitoring, daemon=True)
     poller_thread.start()
 
+if __name__ == '__main__':
+    start_background()
     app.run(host='0.0.0.0', port=os.getenv('PORT', 5003))
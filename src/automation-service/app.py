@@ -4,14 +4,66 @@ import time
 import requests
 from flask import Flask, request, jsonify
 
+from jobs import FINISHED, QueueFull, JobRunner
+
 app = Flask(__name__)
 
 SENSOR_SERVICE_HOST = os.getenv('SENSOR_SERVICE_HOST', 'localhost')
 SENSOR_SERVICE_PORT = int(os.getenv('SENSOR_SERVICE_PORT', 5000))
 
+# Remediations run as background jobs on AUTOMATION_WORKERS threads, one at
+# a time per sensor. At most AUTOMATION_MAX_PENDING may be queued or running
+# (further requests get 503); the last AUTOMATION_JOB_HISTORY finished jobs
+# stay available from /jobs.
+AUTOMATION_WORKERS = int(os.getenv('AUTOMATION_WORKERS', 4))
+AUTOMATION_MAX_PENDING = int(os.getenv('AUTOMATION_MAX_PENDING', 1000))
+AUTOMATION_JOB_HISTORY = int(os.getenv('AUTOMATION_JOB_HISTORY', 1000))
+# Longest GET /jobs/<id>?wait= long-poll, in seconds
+JOBS_MAX_WAIT = float(os.getenv('JOBS_MAX_WAIT', 30))
+
+jobs = JobRunner(workers=AUTOMATION_WORKERS, max_pending=AUTOMATION_MAX_PENDING, history=AUTOMATION_JOB_HISTORY)
+
+# incident type -> remediation action
+ACTIONS = {
+    'High Temperature': 'cooling_logic',
+    'Sensor Silent': 'sensor_restart',
+    'Erratic Sensor Data': 'sensor_restart',
+}
+
+def apply_cooling(sensor_id, value):
+    print(f"Simulating applying cooling logic for {sensor_id}...")
+    # In a real system, this would send a command to a thermostat controller
+    # For this lab, we'll just log it and assume it helps.
+    time.sleep(2) # Simulate work
+    print(f"Cooling logic applied for {sensor_id}.")
+    return {"status": "success", "action": "cooling_applied", "details": f"Simulated cooling for {sensor_id}"}
+
+def restart_sensor(sensor_id, value):
+    print(f"Attempting to restart sensor service for {sensor_id}...")
+    # In a real system, this would trigger a deployment or restart of the specific sensor microservice instance
+    # For this lab, we'll simulate a restart by calling a dummy endpoint or just logging.
+    try:
+        # This is a placeholder. A real restart would be handled by Kubernetes/ECS or a dedicated control plane.
+        # For demonstration, we'll just log the action.
+        print(f"Simulated restart of sensor service for {sensor_id}.")
+        time.sleep(3) # Simulate restart time
+        # Optionally, trigger sensor to send data again to verify
+        # requests.post(f"http://{SENSOR_SERVICE_HOST}:{SENSOR_SERVICE_PORT}/generate_data", json={'sensor_id': sensor_id, 'force_generate': True})
+        return {"status": "success", "action": "sensor_service_restarted", "details": f"Simulated restart for {sensor_id}"}
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to simulate sensor service restart: {e}")
+        return {"status": "failed", "action": "sensor_service_restart_failed", "error": str(e)}
+
+REMEDIATIONS = {
+    'cooling_logic': apply_cooling,
+    'sensor_restart': restart_sensor,
+}
+
 @app.route('/remediate', methods=['POST'])
 def remediate_incident():
-    data = request.get_json()
+    # Queues the remediation and answers 202 with its job id right away;
+    # follow it with GET /jobs/<job_id>
+    data = request.get_json(silent=True)
     if not data:
         return jsonify({"error": "Invalid JSON"}), 400
 
@@ -21,34 +73,47 @@ def remediate_incident():
 
     print(f"Received remediation request for {incident_type} on {sensor_id} with value {value}")
 
-    if incident_type == 'High Temperature':
-        print(f"Simulating applying cooling logic for {sensor_id}...")
-        # In a real system, this would send a command to a thermostat controller
-        # For this lab, we'll just log it and assume it helps.
-        time.sleep(2) # Simulate work
-        print(f"Cooling logic applied for {sensor_id}.")
-        return jsonify({"status": "success", "action": "cooling_applied", "details": f"Simulated cooling for {sensor_id}"}), 200
-
-    elif incident_type == 'Sensor Silent' or incident_type == 'Erratic Sensor Data':
-        print(f"Attempting to restart sensor service for {sensor_id}...")
-        # In a real system, this would trigger a deployment or restart of the specific sensor microservice instance
-        # For this lab, we'll simulate a restart by calling a dummy endpoint or just logging.
-        try:
-            # This is a placeholder. A real restart would be handled by Kubernetes/ECS or a dedicated control plane.
-            # For demonstration, we'll just log the action.
-            print(f"Simulated restart of sensor service for {sensor_id}.")
-            time.sleep(3) # Simulate restart time
-            # Optionally, trigger sensor to send data again to verify
-            # requests.post(f"http://{SENSOR_SERVICE_HOST}:{SENSOR_SERVICE_PORT}/generate_data", json={'sensor_id': sensor_id, 'force_generate': True})
-            return jsonify({"status": "success", "action": "sensor_service_restarted", "details": f"Simulated restart for {sensor_id}"}), 200
-        except requests.exceptions.RequestException as e:
-            print(f"Failed to simulate sensor service restart: {e}")
-            return jsonify({"status": "failed", "action": "sensor_service_restart_failed", "error": str(e)}), 500
-
-    else:
+    action = ACTIONS.get(incident_type)
+    if action is None:
         print(f"No automated remediation defined for incident type: {incident_type}")
         return jsonify({"status": "ignored", "message": "No automated remediation defined for this type"}), 200
 
+    try:
+        job, created = jobs.submit(sensor_id, action, REMEDIATIONS[action], sensor_id, value)
+    except QueueFull as e:
+        return jsonify({"error": f"Remediation queue is full: {e}"}), 503
+    if not created:
+        print(f"{action} for {sensor_id} already queued as job {job.id}")
+    return jsonify({**job.to_dict(), "queued": created}), 202, {'Location': f'/jobs/{job.id}'}
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    # Newest first; filter with ?status= and ?sensor_id=
+    try:
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= AUTOMATION_JOB_HISTORY:
+        return jsonify({"error": f"limit must be between 1 and {AUTOMATION_JOB_HISTORY}"}), 400
+    matches = jobs.list(status=request.args.get('status'), sensor_id=request.args.get('sensor_id'), limit=limit)
+    return jsonify([job.to_dict() for job in matches]), 200
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    # ?wait=<seconds> holds the request until the job finishes (long-poll)
+    try:
+        wait = min(float(request.args.get('wait', 0)), JOBS_MAX_WAIT)
+    except ValueError:
+        return jsonify({"error": "wait must be a number of seconds"}), 400
+    job = jobs.wait(job_id, wait) if wait > 0 else jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    return jsonify({**job.to_dict(), "finished": job.status in FINISHED}), 200
+
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    return jsonify({'jobs': jobs.stats()}), 200
+
 @app.route('/health', methods=['GET'])
 def health_check():
     # Basic health check
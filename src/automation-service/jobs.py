@@ -0,0 +1,190 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    __slots__ = ('id', 'sensor_id', 'action', 'args', 'fn', 'status', 'result', 'error',
+                 'created_at', 'started_at', 'finished_at', 'done')
+
+    def __init__(self, sensor_id, action, fn, args):
+        self.id = uuid.uuid4().hex
+        self.sensor_id = sensor_id
+        self.action = action
+        self.fn = fn
+        self.args = args
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'sensor_id': self.sensor_id,
+            'action': self.action,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobRunner:
+    """Runs remediation jobs on `workers` threads, one at a time per sensor.
+
+    Each sensor has its own FIFO of pending jobs. Only a sensor's head job is
+    ever on the shared ready queue, and the next one is released when it
+    finishes, so a sensor never has two remediations running at once while
+    different sensors run in parallel. A job that is still queued behind the
+    same action for the same sensor is not queued twice: submit() returns the
+    waiting job instead. At most `max_pending` jobs may be queued or running
+    (submit() raises QueueFull beyond that), and the last `history` finished
+    jobs are kept for lookups.
+
+    The function's return value becomes the job's result. It fails if it
+    raises or returns a dict whose 'status' is 'failed'.
+    """
+
+    def __init__(self, workers=4, max_pending=1000, history=1000):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.history = history
+        self._ready = queue.Queue()
+        self._pending = {}             # sensor_id -> deque of its jobs, head first
+        self._jobs = OrderedDict()     # job_id -> Job, oldest first
+        self._lock = threading.Lock()
+        self._threads = []
+        self._active = 0
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'remediation-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, sensor_id, action, fn, *args):
+        """Queue fn(*args) behind sensor_id's earlier jobs; returns (job, created)."""
+        if not self._threads:
+            self.start()
+        with self._lock:
+            pending = self._pending.get(sensor_id)
+            if pending:
+                for job in pending:
+                    if job.status == QUEUED and job.action == action:
+                        self.deduplicated += 1
+                        return job, False
+            if self._active >= self.max_pending:
+                self.rejected += 1
+                raise QueueFull(f"{self._active} remediation jobs already pending")
+            job = Job(sensor_id, action, fn, args)
+            self._jobs[job.id] = job
+            self._active += 1
+            self.submitted += 1
+            if pending:
+                pending.append(job)
+            else:
+                self._pending[sensor_id] = deque([job])
+                self._ready.put(job)
+            return job, True
+
+    def _work(self):
+        while True:
+            job = self._ready.get()
+            with self._lock:
+                job.status = RUNNING
+                job.started_at = time.time()
+            try:
+                result = job.fn(*job.args)
+                error = None
+            except Exception as e:
+                result, error = None, str(e)
+                print(f" [!] Remediation job {job.id} ({job.action} on {job.sensor_id}) failed: {e}")
+            failed = error is not None or (isinstance(result, dict) and result.get('status') == 'failed')
+            with self._lock:
+                job.result = result
+                job.error = error
+                job.status = FAILED if failed else SUCCEEDED
+                job.finished_at = time.time()
+                job.fn = job.args = None
+                self._active -= 1
+                if failed:
+                    self.failed += 1
+                else:
+                    self.succeeded += 1
+                pending = self._pending[job.sensor_id]
+                pending.popleft()
+                if pending:
+                    self._ready.put(pending[0])
+                else:
+                    del self._pending[job.sensor_id]
+                self._trim()
+            job.done.set()
+
+    def _trim(self):
+        # Caller holds the lock. Drop the oldest finished jobs past `history`.
+        excess = len(self._jobs) - self._active - self.history
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs):
+            if self._jobs[job_id].status in FINISHED:
+                del self._jobs[job_id]
+                excess -= 1
+                if not excess:
+                    break
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout):
+        """The job once finished or after timeout seconds, whichever is first."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.done.wait(timeout)
+        return job
+
+    def list(self, status=None, sensor_id=None, limit=100):
+        """Newest first, optionally filtered by status and sensor."""
+        with self._lock:
+            jobs = list(reversed(self._jobs.values()))
+        matches = [j for j in jobs
+                   if (status is None or j.status == status) and (sensor_id is None or j.sensor_id == sensor_id)]
+        return matches[:limit]
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'pending': self._active,
+            'queued_sensors': len(self._pending),
+            'retained': len(self._jobs),
+            'submitted': self.submitted,
+            'deduplicated': self.deduplicated,
+            'rejected': self.rejected,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+        }
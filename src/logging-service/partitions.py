@@ -0,0 +1,256 @@
+import gzip
+import json
+import os
+import re
+import time
+
+from sqlalchemy import MetaData, PrimaryKeyConstraint, Table, column, delete, func, select, table, text
+
+
+class PartitionManager:
+    """Splits the incident table into fixed-width time periods and retires old ones.
+
+    On Postgres the table is natively range-partitioned on timestamp, one
+    partition per `period_seconds`, created `premake` periods ahead, plus a
+    DEFAULT partition for anything outside them. The planner prunes by time
+    range and retiring a period is a DETACH + DROP, so old data costs hot
+    inserts and recent-window queries nothing. Other backends (SQLite in
+    tests and local runs), and Postgres tables created before partitioning,
+    keep a single table: a period is then a range of the (timestamp, id)
+    index and retiring it is a ranged DELETE.
+
+    Every retired period is first written to a gzip NDJSON archive. Which
+    of the two layouts the table has is looked up from the database on first
+    use, so a process that never ran create() (the server, when init-db ran
+    separately) still manages native partitions.
+    """
+
+    def __init__(self, table, period_seconds, premake=2):
+        self.table = table
+        self.period_seconds = int(period_seconds)
+        self.premake = premake
+        self.native = None          # table is natively partitioned; None until looked up
+        self.created = 0
+        self.retired_periods = 0
+        self.retired_rows = 0
+        self.last_retired_at = None
+
+    def period_start(self, timestamp):
+        timestamp = int(timestamp)
+        return timestamp - timestamp % self.period_seconds
+
+    def partition_name(self, start):
+        return f"{self.table.name}_p{start}"
+
+    def _partitioned_table(self):
+        # Postgres wants the partition key in the primary key
+        columns = [c._copy() for c in self.table.columns]
+        for c in columns:
+            c.primary_key = False
+            if c.name == 'id':
+                c.autoincrement = True
+        return Table(self.table.name, MetaData(), *columns, PrimaryKeyConstraint('id', 'timestamp'),
+                     postgresql_partition_by='RANGE (timestamp)')
+
+    def _relkind(self, conn, name=None):
+        return conn.execute(text("SELECT relkind FROM pg_class WHERE relname = :name "
+                                 "AND pg_table_is_visible(oid)"), {'name': name or self.table.name}).scalar()
+
+    def _is_native(self, engine):
+        if self.native is None:
+            if engine.dialect.name != 'postgresql':
+                self.native = False
+            else:
+                with engine.connect() as conn:
+                    relkind = self._relkind(conn)
+                if relkind is None:
+                    return False    # not created yet; look again next time
+                self.native = relkind == 'p'
+        return self.native
+
+    def create(self, engine, now=None):
+        """Create the table (partitioned where supported) and its indexes."""
+        if engine.dialect.name != 'postgresql':
+            self.table.create(engine, checkfirst=True)
+            self.native = False
+            return
+        name = self.table.name
+        with engine.begin() as conn:
+            relkind = self._relkind(conn)
+            if relkind is None:
+                self._partitioned_table().create(conn)
+                for index in self.table.indexes:
+                    index.create(conn)
+                conn.execute(text(f"CREATE TABLE {name}_default PARTITION OF {name} DEFAULT"))
+                relkind = 'p'
+        self.native = relkind == 'p'
+        if not self.native:
+            print(f" [!] Table {name} predates partitioning; old periods will be retired with ranged deletes")
+            return
+        self.ensure(engine, now)
+
+    def _partitions(self, conn):
+        rows = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name"), {'name': self.table.name})
+        pattern = re.compile(rf'^{re.escape(self.table.name)}_p(\d+)$')
+        partitions = {}
+        for (name,) in rows:
+            match = pattern.match(name)
+            if match:
+                partitions[int(match.group(1))] = name
+        return partitions
+
+    def _create_partition(self, conn, name, start, end):
+        parent, default = self.table.name, f"{self.table.name}_default"
+        if self._relkind(conn, default) is not None:
+            # Rows for this range may already sit in DEFAULT (written while the
+            # partition was missing); Postgres refuses the new partition until
+            # they are moved out. Lock DEFAULT so none arrive meanwhile.
+            conn.execute(text(f"LOCK TABLE {default} IN ACCESS EXCLUSIVE MODE"))
+            in_default = conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} "
+                                           "WHERE timestamp >= :start AND timestamp < :end)"),
+                                      {'start': start, 'end': end}).scalar()
+            if in_default:
+                conn.execute(text(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS)"))
+                moved = conn.execute(text(
+                    f"WITH moved AS (DELETE FROM {default} WHERE timestamp >= :start AND timestamp < :end "
+                    f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"), {'start': start, 'end': end}).rowcount
+                conn.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {name} "
+                                  f"FOR VALUES FROM ({start}) TO ({end})"))
+                print(f" [*] Moved {moved} incidents from {default} into new partition {name}")
+                return
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {parent} FOR VALUES FROM ({start}) TO ({end})"))
+
+    def ensure(self, engine, now=None):
+        """Make sure partitions exist for the current period and the next `premake`."""
+        if not self._is_native(engine):
+            return []
+        current = self.period_start(time.time() if now is None else now)
+        created = []
+        with engine.begin() as conn:
+            existing = self._partitions(conn)
+            for i in range(self.premake + 1):
+                start = current + i * self.period_seconds
+                if start in existing:
+                    continue
+                name = self.partition_name(start)
+                self._create_partition(conn, name, start, start + self.period_seconds)
+                created.append(name)
+        self.created += len(created)
+        return created
+
+    def partitions(self, engine):
+        if not self._is_native(engine):
+            return []
+        with engine.connect() as conn:
+            return sorted(self._partitions(conn))
+
+    def _archive_path(self, archive_dir, start, end):
+        base = os.path.join(archive_dir, f"{self.table.name}-{start}-{end}")
+        path, n = f"{base}.ndjson.gz", 1
+        while os.path.exists(path):
+            path, n = f"{base}.{n}.ndjson.gz", n + 1
+        return path
+
+    def _archive(self, conn, source, start, end, archive_dir):
+        """Write source's rows in [start, end) to a new archive; returns (rows, max id, path)."""
+        ts, ident = source.c.timestamp, source.c.id
+        query = select(*source.c).where(ts >= start, ts < end).order_by(ts, ident)
+        result = conn.execution_options(yield_per=1000).execute(query)
+        path = self._archive_path(archive_dir, start, end)
+        tmp_path = f"{path}.tmp"
+        count, max_id = 0, None
+        with open(tmp_path, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                for row in result:
+                    record = dict(row._mapping)
+                    f.write((json.dumps(record) + '\n').encode('utf-8'))
+                    count += 1
+                    max_id = record['id'] if max_id is None else max(max_id, record['id'])
+            raw.flush()
+            os.fsync(raw.fileno())
+        if not count:
+            os.remove(tmp_path)
+            return 0, None, None
+        # The archive must be durable before the rows are dropped
+        os.replace(tmp_path, path)
+        return count, max_id, path
+
+    def _next_period(self, conn, after, cutoff):
+        ts = self.table.c.timestamp
+        oldest = conn.execute(select(func.min(ts)).where(ts >= after, ts < cutoff)).scalar()
+        return None if oldest is None else self.period_start(oldest)
+
+    def retire(self, engine, retention_seconds, archive_dir, now=None):
+        """Archive and remove every whole period older than retention_seconds.
+
+        Returns one {'start', 'end', 'rows', 'archive'} entry per retired
+        period or partition.
+        """
+        now = time.time() if now is None else now
+        cutoff = self.period_start(now - retention_seconds)
+        os.makedirs(archive_dir, exist_ok=True)
+        retired = []
+
+        if self._is_native(engine):
+            with engine.connect() as conn:
+                partitions = self._partitions(conn)
+            for start, name in sorted(partitions.items()):
+                end = start + self.period_seconds
+                if end > cutoff:
+                    break
+                # Archive while still attached: if that fails the partition
+                # stays in place and the next run tries again
+                partition = table(name, *(column(c.name, c.type) for c in self.table.columns))
+                with engine.connect() as conn:
+                    count, _, path = self._archive(conn, partition, start, end, archive_dir)
+                with engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {self.table.name} DETACH PARTITION {name}"))
+                    # A late write to this period since the archive: keep the
+                    # partition and retry next run rather than lose the row
+                    current = conn.execute(select(func.count()).select_from(partition)).scalar()
+                    if current != count:
+                        conn.rollback()
+                        if path:
+                            os.remove(path)
+                        print(f" [!] {name} changed while being archived; retiring it next run")
+                        continue
+                    conn.execute(text(f"DROP TABLE {name}"))
+                retired.append({'start': start, 'end': end, 'rows': count, 'archive': path})
+
+        # Rows below the cutoff outside any dropped partition: the DEFAULT
+        # partition on Postgres, the whole table elsewhere. Only periods that
+        # actually hold rows are visited.
+        after = 0
+        while True:
+            with engine.connect() as conn:
+                start = self._next_period(conn, after, cutoff)
+                if start is None:
+                    break
+                end = start + self.period_seconds
+                count, max_id, path = self._archive(conn, self.table, start, end, archive_dir)
+            if count:
+                ts = self.table.c.timestamp
+                # Bounded by the last archived id so a row written meanwhile survives
+                with engine.begin() as conn:
+                    conn.execute(delete(self.table).where(ts >= start, ts < end, self.table.c.id <= max_id))
+                retired.append({'start': start, 'end': end, 'rows': count, 'archive': path})
+            after = end
+
+        if retired:
+            self.retired_periods += len(retired)
+            self.retired_rows += sum(r['rows'] for r in retired)
+            self.last_retired_at = now
+        return retired
+
+    def stats(self):
+        return {
+            'native': bool(self.native),
+            'period_seconds': self.period_seconds,
+            'partitions_created': self.created,
+            'retired_periods': self.retired_periods,
+            'retired_rows': self.retired_rows,
+            'last_retired_at': self.last_retired_at,
+        }
@@ -0,0 +1,93 @@
+FILTER_FIELDS = ('component', 'type', 'severity', 'status')
+ORDERS = ('desc', 'asc')
+
+
+class QueryError(ValueError):
+    pass
+
+
+def encode_cursor(timestamp, incident_id):
+    return f"{timestamp}:{incident_id}"
+
+
+def decode_cursor(cursor):
+    """Parse a "timestamp:id" keyset cursor into a (timestamp, id) tuple."""
+    try:
+        timestamp, _, incident_id = cursor.partition(':')
+        return int(timestamp), int(incident_id)
+    except ValueError:
+        raise QueryError(f"Invalid cursor '{cursor}'")
+
+
+def parse_limit(value, default, maximum):
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise QueryError("limit must be an integer")
+    if not 1 <= limit <= maximum:
+        raise QueryError(f"limit must be between 1 and {maximum}")
+    return limit
+
+
+def parse_order(value):
+    """'desc' (newest first, the default) or 'asc'."""
+    if value in (None, ''):
+        return 'desc'
+    if value not in ORDERS:
+        raise QueryError(f"order must be one of {list(ORDERS)}")
+    return value
+
+
+def parse_group_by(value):
+    if not value:
+        return ()
+    fields = tuple(dict.fromkeys(f for f in value.split(',') if f))
+    unknown = [f for f in fields if f not in FILTER_FIELDS]
+    if unknown:
+        raise QueryError(f"Cannot group by {unknown}. Must be any of {list(FILTER_FIELDS)}")
+    return fields
+
+
+def parse_positive_int(value, name):
+    if value in (None, ''):
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise QueryError(f"{name} must be an integer")
+    if number <= 0:
+        raise QueryError(f"{name} must be positive")
+    return number
+
+
+def _parse_time(args, name):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise QueryError(f"{name} must be an integer epoch timestamp")
+
+
+def parse_filters(args):
+    """Pull the incident filters out of request args.
+
+    Equality filters accept a comma-separated list (?status=active,manual_intervention).
+    `since` is inclusive and `until` exclusive, both epoch seconds.
+    """
+    filters = {}
+    for field in FILTER_FIELDS:
+        value = args.get(field)
+        if value:
+            values = [v for v in value.split(',') if v]
+            filters[field] = values
+    since = _parse_time(args, 'since')
+    until = _parse_time(args, 'until')
+    if since is not None and until is not None and until <= since:
+        raise QueryError("until must be greater than since")
+    filters['since'] = since
+    filters['until'] = until
+    return filters
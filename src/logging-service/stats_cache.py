@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class BucketCache:
+    """Caches aggregate rows for closed time buckets.
+
+    A bucket that has fully elapsed only changes if an incident inside it
+    is written or updated later, so its GROUP BY result is kept until then.
+    Entries are grouped by (bucket_seconds, bucket_start) so a write
+    invalidates every cached query touching that bucket in one step;
+    the least recently used buckets are dropped past `max_buckets`.
+
+    Each server worker has its own cache and only sees its own writes, so
+    entries also expire `ttl` seconds after being cached (None: never).
+    That bounds how long a write taken by another worker goes unnoticed.
+    """
+
+    def __init__(self, max_buckets=10000, ttl=None, clock=time.monotonic):
+        self.max_buckets = max_buckets
+        self.ttl = ttl
+        self._clock = clock
+        self._buckets = OrderedDict()   # (bucket_seconds, bucket_start) -> {query_key: (rows, expires_at)}
+        self._sizes = {}                # bucket_seconds -> cached bucket count
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, query_key, bucket_seconds, bucket_start):
+        with self._lock:
+            entry = self._buckets.get((bucket_seconds, bucket_start))
+            cached = None if entry is None else entry.get(query_key)
+            if cached is not None:
+                rows, expires_at = cached
+                if expires_at is None or self._clock() < expires_at:
+                    self._buckets.move_to_end((bucket_seconds, bucket_start))
+                    self.hits += 1
+                    return rows
+                del entry[query_key]
+            self.misses += 1
+            return None
+
+    def put(self, query_key, bucket_seconds, bucket_start, rows):
+        key = (bucket_seconds, bucket_start)
+        with self._lock:
+            entry = self._buckets.get(key)
+            if entry is None:
+                entry = self._buckets[key] = {}
+                self._sizes[bucket_seconds] = self._sizes.get(bucket_seconds, 0) + 1
+            entry[query_key] = (rows, None if self.ttl is None else self._clock() + self.ttl)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                (seconds, _), _ = self._buckets.popitem(last=False)
+                self._release(seconds)
+
+    def _release(self, bucket_seconds):
+        # Caller holds the lock
+        self._sizes[bucket_seconds] -= 1
+        if not self._sizes[bucket_seconds]:
+            del self._sizes[bucket_seconds]
+
+    def invalidate(self, timestamps):
+        """Drop every cached bucket containing one of timestamps."""
+        with self._lock:
+            if not self._buckets:
+                return
+            for bucket_seconds in list(self._sizes):
+                for start in {t - t % bucket_seconds for t in timestamps}:
+                    if self._buckets.pop((bucket_seconds, start), None) is not None:
+                        self._release(bucket_seconds)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._sizes.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def stats(self):
+        return {
+            'buckets': len(self._buckets),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+        }
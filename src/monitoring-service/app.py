@@ -1,11 +1,25 @@
+import atexit
 import os
+import signal
+import sys
 import json
 import time
 import threading
+import uuid
 import pika
 import requests
-from datetime import datetime
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+
+from coalescer import OPEN, SUPPRESS, IncidentCoalescer
+from consumer import PartitionedConsumer
+from deadline_wheel import DeadlineWheel
+from fleet_status import FleetStatus
+from dispatch import IncidentDispatcher
+from http_client import ServiceClient
+from snapshot import Snapshotter
+from state_store import SensorStateStore
+from thresholds import Limits, ThresholdConfig, VersionConflict
+from transitions import TransitionLog
 
 app = Flask(__name__)
 
@@ -22,16 +36,132 @@ ALERTING_SERVICE_PORT = int(os.getenv('ALERTING_SERVICE_PORT', 5003))
 AUTOMATION_SERVICE_HOST = os.getenv('AUTOMATION_SERVICE_HOST', 'localhost')
 AUTOMATION_SERVICE_PORT = int(os.getenv('AUTOMATION_SERVICE_PORT', 5004))
 
-# In-memory store for sensor data and last seen timestamps
-sensor_readings = {}
-last_seen_timestamps = {}
 
-# Fault thresholds
+# Outbound HTTP: one keep-alive pool per downstream service, explicit
+# connect/read timeouts and bounded retries with jitter (see http_client.py)
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 2))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 5))
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))
+
+def _service_client(name, host, port):
+    return ServiceClient(
+        name,
+        f"http://{host}:{port}",
+        pool_size=HTTP_POOL_SIZE,
+        connect_timeout=HTTP_CONNECT_TIMEOUT,
+        read_timeout=HTTP_READ_TIMEOUT,
+        retries=HTTP_RETRIES,
+    )
+
+http_clients = {
+    'logging': _service_client('logging', LOGGING_SERVICE_HOST, LOGGING_SERVICE_PORT),
+    'alerting': _service_client('alerting', ALERTING_SERVICE_HOST, ALERTING_SERVICE_PORT),
+    'automation': _service_client('automation', AUTOMATION_SERVICE_HOST, AUTOMATION_SERVICE_PORT),
+}
+
+# Fault thresholds. These are the defaults; the live values (and per-sensor
+# overrides) come from `thresholds` below and can be changed at runtime.
 HIGH_TEMP_THRESHOLD = 80.0
 HIGH_TEMP_DURATION_SECONDS = 5 * 60 # 5 minutes
 SENSOR_SILENCE_THRESHOLD_SECONDS = 2 * 60 # 2 minutes
 ERRATIC_CHANGE_THRESHOLD = 10.0 # >10F change in 10 seconds
 ERRATIC_WINDOW_SECONDS = 10
+# Sensors that have not reported for this long are dropped from memory
+SENSOR_RETIRE_SECONDS = int(os.getenv('SENSOR_RETIRE_SECONDS', 24 * 60 * 60))
+# The silence monitor ticks every SILENCE_TICK_SECONDS and only looks at
+# sensors whose deadline has come up; the full retire scan runs far less often
+SILENCE_TICK_SECONDS = float(os.getenv('SILENCE_TICK_SECONDS', 1))
+SENSOR_RETIRE_SCAN_SECONDS = int(os.getenv('SENSOR_RETIRE_SCAN_SECONDS', 60))
+
+# Live thresholds and OK/WARN/ALARM bands (see thresholds.py, classifier.py).
+# THRESHOLDS_FILE, if set, is a JSON config re-read whenever it changes
+# (checked every THRESHOLDS_POLL_SECONDS); POST /config/thresholds also
+# installs a new version. Each swap is atomic and keeps all sensor state.
+THRESHOLDS_FILE = os.getenv('THRESHOLDS_FILE')
+THRESHOLDS_POLL_SECONDS = float(os.getenv('THRESHOLDS_POLL_SECONDS', 5))
+thresholds = ThresholdConfig(Limits(
+    high_temp_threshold=HIGH_TEMP_THRESHOLD,
+    high_temp_duration_seconds=HIGH_TEMP_DURATION_SECONDS,
+    silence_threshold_seconds=SENSOR_SILENCE_THRESHOLD_SECONDS,
+    erratic_change_threshold=ERRATIC_CHANGE_THRESHOLD,
+    erratic_window_seconds=ERRATIC_WINDOW_SECONDS,
+))
+
+# In-memory per-sensor state: last seen, last reading, erratic window and
+# alarm state (see state_store.py)
+sensor_state = SensorStateStore(ERRATIC_WINDOW_SECONDS)
+# Silence deadlines, bucketed per second (see deadline_wheel.py)
+silence_wheel = DeadlineWheel(resolution=1)
+
+# /status is served from sensor_state. The fleet summary is rebuilt at most
+# every STATUS_CACHE_SECONDS; pages are capped at STATUS_PAGE_MAX sensors.
+STATUS_CACHE_SECONDS = float(os.getenv('STATUS_CACHE_SECONDS', 1))
+STATUS_PAGE_DEFAULT = int(os.getenv('STATUS_PAGE_DEFAULT', 100))
+STATUS_PAGE_MAX = int(os.getenv('STATUS_PAGE_MAX', 1000))
+fleet_status = FleetStatus(sensor_state, ttl=STATUS_CACHE_SECONDS, bands=thresholds.current.bands)
+
+# State transitions pushed to /status/stream (SSE) and /status/changes
+# (long-poll). The newest STATUS_STREAM_BACKLOG events can be resumed from.
+# A sensor already in ALARM is re-published when its temperature moves by
+# STATUS_STREAM_TEMP_DELTA or more.
+STATUS_STREAM_BACKLOG = int(os.getenv('STATUS_STREAM_BACKLOG', 10000))
+STATUS_STREAM_HEARTBEAT_SECONDS = float(os.getenv('STATUS_STREAM_HEARTBEAT_SECONDS', 15))
+STATUS_STREAM_TEMP_DELTA = float(os.getenv('STATUS_STREAM_TEMP_DELTA', 1.0))
+STATUS_CHANGES_MAX_WAIT = float(os.getenv('STATUS_CHANGES_MAX_WAIT', 30))
+transitions = TransitionLog(maxlen=STATUS_STREAM_BACKLOG)
+# Versions restart with the process; cursors carry this epoch so a client
+# resuming across a restart is told to resync instead of skipping events
+STREAM_EPOCH = uuid.uuid4().hex[:12]
+
+# Incident side effects (log/alert/automation HTTP calls) run on this pool so
+# the consumer can ack at full speed. INCIDENT_QUEUE_MAX bounds the backlog;
+# when full, the consumer blocks up to INCIDENT_SUBMIT_TIMEOUT seconds.
+INCIDENT_WORKERS = int(os.getenv('INCIDENT_WORKERS', 8))
+INCIDENT_QUEUE_MAX = int(os.getenv('INCIDENT_QUEUE_MAX', 1000))
+INCIDENT_SUBMIT_TIMEOUT = float(os.getenv('INCIDENT_SUBMIT_TIMEOUT', 10))
+
+# Consumer tuning. CONSUMER_WORKERS threads each own a partition of sensors
+# (by sensor_id), so per-sensor state is updated in order; 0 processes every
+# message on the pika thread. CONSUMER_PREFETCH caps unacked deliveries and
+# acks go out as multi-acks every CONSUMER_ACK_BATCH messages or
+# CONSUMER_ACK_INTERVAL_MS.
+CONSUMER_WORKERS = int(os.getenv('CONSUMER_WORKERS', 4))
+CONSUMER_PREFETCH = int(os.getenv('CONSUMER_PREFETCH', 200))
+CONSUMER_ACK_BATCH = int(os.getenv('CONSUMER_ACK_BATCH', 50))
+CONSUMER_ACK_INTERVAL_MS = float(os.getenv('CONSUMER_ACK_INTERVAL_MS', 200))
+# A partition with a backlog classifies up to CONSUMER_CLASSIFY_BATCH queued
+# readings in one pass before running detection on each
+CONSUMER_CLASSIFY_BATCH = int(os.getenv('CONSUMER_CLASSIFY_BATCH', 256))
+
+# Repeats of the same (sensor, incident type) are folded into one open
+# incident: alert/automation fan out again only after
+# INCIDENT_COOLDOWN_SECONDS, count and peak are written back at most every
+# INCIDENT_UPDATE_INTERVAL_SECONDS, and incidents without an explicit clear
+# condition resolve after INCIDENT_RESOLVE_AFTER_SECONDS without a repeat.
+INCIDENT_COOLDOWN_SECONDS = float(os.getenv('INCIDENT_COOLDOWN_SECONDS', 300))
+INCIDENT_RESOLVE_AFTER_SECONDS = float(os.getenv('INCIDENT_RESOLVE_AFTER_SECONDS', 120))
+INCIDENT_UPDATE_INTERVAL_SECONDS = float(os.getenv('INCIDENT_UPDATE_INTERVAL_SECONDS', 30))
+coalescer = IncidentCoalescer(
+    cooldown=INCIDENT_COOLDOWN_SECONDS,
+    resolve_after=INCIDENT_RESOLVE_AFTER_SECONDS,
+    update_interval=INCIDENT_UPDATE_INTERVAL_SECONDS,
+)
+
+# Warm restarts: sensor_state and the coalescer's open incidents are
+# written to SNAPSHOT_PATH every SNAPSHOT_INTERVAL_SECONDS and on shutdown,
+# and restored on startup, so high-temp timers, erratic windows and the
+# logging ids of open incidents survive deploys. Empty disables it.
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', '')
+SNAPSHOT_INTERVAL_SECONDS = float(os.getenv('SNAPSHOT_INTERVAL_SECONDS', 30))
+snapshotter = Snapshotter(sensor_state, SNAPSHOT_PATH, interval=SNAPSHOT_INTERVAL_SECONDS,
+                          coalescer=coalescer) if SNAPSHOT_PATH else None
+
+dispatcher = IncidentDispatcher(
+    workers=INCIDENT_WORKERS,
+    max_queue=INCIDENT_QUEUE_MAX,
+    submit_timeout=INCIDENT_SUBMIT_TIMEOUT,
+)
 
 def log_incident(incident_type, sensor_id, value, severity='critical', details=None):
     incident_data = {
@@ -43,11 +173,24 @@ def log_incident(incident_type, sensor_id, value, severity='critical', details=N
         'details': details or {}
     }
     try:
-        response = requests.post(f"http://{LOGGING_SERVICE_HOST}:{LOGGING_SERVICE_PORT}/incidents", json=incident_data)
+        response = http_clients['logging'].post('/incidents', json=incident_data)
         response.raise_for_status()
         print(f"Incident logged: {incident_data}")
-    except requests.exceptions.RequestException as e:
+        return response.json().get('id')
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"Error logging incident: {e}")
+        return None
+
+def update_incident(incident_id, status=None, details=None):
+    update_data = {'details': details or {}}
+    if status is not None:
+        update_data['status'] = status
+    try:
+        response = http_clients['logging'].put(f'/incidents/{incident_id}', json=update_data)
+        response.raise_for_status()
+        print(f"Incident {incident_id} updated: {update_data}")
+    except requests.exceptions.RequestException as e:
+        print(f"Error updating incident {incident_id}: {e}")
 
 def trigger_alert(incident_type, sensor_id, value, severity='critical', runbook_link=None):
     alert_data = {
@@ -58,7 +201,7 @@ def trigger_alert(incident_type, sensor_id, value, severity='critical', runbook_
         'runbook_link': runbook_link
     }
     try:
-        response = requests.post(f"http://{ALERTING_SERVICE_HOST}:{ALERTING_SERVICE_PORT}/alert", json=alert_data)
+        response = http_clients['alerting'].post('/alert', json=alert_data)
         response.raise_for_status()
         print(f"Alert triggered: {alert_data}")
     except requests.exceptions.RequestException as e:
@@ -71,65 +214,127 @@ def trigger_automation(incident_type, sensor_id, value):
         'value': value
     }
     try:
-        response = requests.post(f"http://{AUTOMATION_SERVICE_HOST}:{AUTOMATION_SERVICE_PORT}/remediate", json=automation_data)
+        response = http_clients['automation'].post('/remediate', json=automation_data)
         response.raise_for_status()
         print(f"Automation triggered: {automation_data}")
     except requests.exceptions.RequestException as e:
         print(f"Error triggering automation: {e}")
 
+def open_incident(incident, value, details):
+    incident_id = log_incident(incident.incident_type, incident.sensor_id, value, details=details)
+    if incident_id is not None and coalescer.attach_id(incident, incident_id):
+        # Resolved while the create call was in flight
+        update_incident(incident_id, status='resolved', details=incident.summary())
+
+def raise_incident(incident_type, sensor_id, value, details=None, runbook_link=None, sticky=False):
+    # Fan out through the coalescer: repeats of an open incident only bump
+    # its count/peak until the cooldown allows another alert
+    decision, incident = coalescer.record(sensor_id, incident_type, value, sticky=sticky)
+    if decision == SUPPRESS:
+        return decision
+    if decision == OPEN:
+        dispatcher.submit(open_incident, incident, value, details)
+    if runbook_link:
+        dispatcher.submit(trigger_alert, incident_type, sensor_id, value, runbook_link=runbook_link)
+    else:
+        dispatcher.submit(trigger_alert, incident_type, sensor_id, value)
+    dispatcher.submit(trigger_automation, incident_type, sensor_id, value)
+    return decision
+
+def resolve_incident(incident_type, sensor_id):
+    incident = coalescer.resolve(sensor_id, incident_type)
+    if incident is not None:
+        dispatcher.submit(update_incident, incident.incident_id, status='resolved', details=incident.summary())
+
+def sweep_incidents(current_time):
+    # Write back count/peak of busy incidents and close ones that went quiet
+    to_update, to_resolve = coalescer.sweep(current_time)
+    for incident in to_update:
+        dispatcher.submit(update_incident, incident.incident_id, details=incident.summary())
+    for incident in to_resolve:
+        dispatcher.submit(update_incident, incident.incident_id, status='resolved', details=incident.summary())
+
+def publish_transition(state, previous):
+    transitions.append({
+        'sensor_id': state.sensor_id,
+        'state': state.state,
+        'previous': previous,
+        'temp_f': state.last_temp,
+        'silent': state.silent,
+        'last_seen': state.last_seen,
+    })
+    state.reported_temp = state.last_temp
+
+def classify_readings(batch):
+    # One classification pass for a partition's backlog (see PartitionedConsumer)
+    return thresholds.current.bands.classify_labels([data['temperature'] for data in batch], [data['sensor_id'] for data in batch])
+
+def handle_reading(data, band_state=None):
+    sensor_id = data['sensor_id']
+    temperature = data['temperature']
+    timestamp = data['timestamp']
+
+    print(f"Received data: {data}")
+
+    # One lookup for everything tracked about this sensor, and one read of
+    # the live config so a reload can't change thresholds mid-reading
+    state = sensor_state.touch(sensor_id)
+    config = thresholds.current
+    limits = config.for_sensor(sensor_id)
+    # Only new and recovering sensors need a silence deadline; later readings
+    # just move last_seen and the deadline is re-checked when it comes up
+    first_reading = state.last_seen is None
+    previous = state.state
+    was_silent = sensor_state.seen(state, timestamp)
+    needs_deadline = first_reading or was_silent
+    state.last_temp = temperature
+    state.state = band_state or config.bands.classify_one(temperature, sensor_id)
+    if was_silent:
+        print(f"Sensor {sensor_id} is reporting again.")
+        resolve_incident('Sensor Silent', sensor_id)
+    if needs_deadline:
+        silence_wheel.schedule(sensor_id, silence_deadline(timestamp, limits))
+    if (state.state != previous or was_silent
+            or (state.state == 'ALARM' and abs(temperature - state.reported_temp) >= STATUS_STREAM_TEMP_DELTA)):
+        publish_transition(state, previous)
+
+    # Store readings for erratic detection; the window evicts anything
+    # older than the erratic window as it goes
+    window = state.window
+    window.add(timestamp, temperature, window_seconds=limits.erratic_window_seconds)
+
+    # --- Detection Logic ---
+
+    # 1. High Temperature Fault Detection (US-3)
+    if temperature > limits.high_temp_threshold:
+        # Check if it's consistently high for a duration
+        # This is a simplified check; a real system would track duration more robustly
+        if state.high_temp_start is None:
+            state.high_temp_start = timestamp
+        elif timestamp - state.high_temp_start >= limits.high_temp_duration_seconds:
+            raise_incident('High Temperature', sensor_id, temperature, details={'threshold': limits.high_temp_threshold},
+                           runbook_link='/docs/runbooks/high-temp-alarm.md', sticky=True)
+            state.high_temp_start = None # Reset after triggering
+    else:
+        if state.high_temp_start is not None:
+            print(f"High temperature for {sensor_id} resolved before threshold.")
+            state.high_temp_start = None
+        if coalescer.is_open(sensor_id, 'High Temperature'):
+            resolve_incident('High Temperature', sensor_id)
+
+    # 2. Erratic Data Fault Detection (US-5)
+    # Uses the largest swing anywhere in the window (running max - min),
+    # not just the first vs. last reading.
+    if window.span_seconds > 0:
+        temp_diff = window.swing
+        if temp_diff > limits.erratic_change_threshold:
+            raise_incident('Erratic Sensor Data', sensor_id, temperature, details={'temp_diff': temp_diff, 'window_seconds': limits.erratic_window_seconds})
+
 def process_sensor_data(ch, method, properties, body):
+    # Single-threaded pika callback (CONSUMER_WORKERS=0)
     try:
-        data = json.loads(body)
-        sensor_id = data['sensor_id']
-        temperature = data['temperature']
-        timestamp = data['timestamp']
-
-        print(f"Received data: {data}")
-
-        # Update last seen timestamp
-        last_seen_timestamps[sensor_id] = timestamp
-
-        # Store readings for erratic detection
-        if sensor_id not in sensor_readings:
-            sensor_readings[sensor_id] = []
-        sensor_readings[sensor_id].append({'temp': temperature, 'timestamp': timestamp})
-        # Keep only recent readings for erratic detection
-        sensor_readings[sensor_id] = [r for r in sensor_readings[sensor_id] if r['timestamp'] > timestamp - ERRATIC_WINDOW_SECONDS]
-
-        # --- Detection Logic ---
-
-        # 1. High Temperature Fault Detection (US-3)
-        if temperature > HIGH_TEMP_THRESHOLD:
-            # Check if it's consistently high for a duration
-            # This is a simplified check; a real system would track duration more robustly
-            if sensor_id not in app.config:
-                app.config[sensor_id] = {'high_temp_start': None}
-
-            if app.config[sensor_id]['high_temp_start'] is None:
-                app.config[sensor_id]['high_temp_start'] = timestamp
-            elif timestamp - app.config[sensor_id]['high_temp_start'] >= HIGH_TEMP_DURATION_SECONDS:
-                log_incident('High Temperature', sensor_id, temperature, details={'threshold': HIGH_TEMP_THRESHOLD})
-                trigger_alert('High Temperature', sensor_id, temperature, runbook_link='/docs/runbooks/high-temp-alarm.md')
-                trigger_automation('High Temperature', sensor_id, temperature)
-                app.config[sensor_id]['high_temp_start'] = None # Reset after triggering
-        else:
-            if sensor_id in app.config and app.config[sensor_id]['high_temp_start'] is not None:
-                print(f"High temperature for {sensor_id} resolved before threshold.")
-                app.config[sensor_id]['high_temp_start'] = None
-
-        # 2. Erratic Data Fault Detection (US-5)
-        if len(sensor_readings[sensor_id]) >= 2:
-            first_reading = sensor_readings[sensor_id][0]
-            last_reading = sensor_readings[sensor_id][-1]
-            if last_reading['timestamp'] - first_reading['timestamp'] > 0:
-                temp_diff = abs(last_reading['temp'] - first_reading['temp'])
-                if temp_diff > ERRATIC_CHANGE_THRESHOLD:
-                    log_incident('Erratic Sensor Data', sensor_id, temperature, details={'temp_diff': temp_diff, 'window_seconds': ERRATIC_WINDOW_SECONDS})
-                    trigger_alert('Erratic Sensor Data', sensor_id, temperature)
-                    trigger_automation('Erratic Sensor Data', sensor_id, temperature)
-
+        handle_reading(json.loads(body))
         ch.basic_ack(delivery_tag=method.delivery_tag)
-
     except json.JSONDecodeError:
         print(f" [!] Invalid JSON received: {body}")
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
@@ -137,25 +342,100 @@ def process_sensor_data(ch, method, properties, body):
         print(f" [!] Error processing message: {e}")
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
 
+def silence_deadline(last_seen, limits):
+    # First whole second strictly past the threshold
+    return last_seen + limits.silence_threshold_seconds + 1
+
+def schedule_silence_deadlines(config):
+    # The wheel keeps the earlier slot, so this only ever brings deadlines
+    # forward; later ones are handled lazily at expiry
+    for state in sensor_state.snapshot():
+        if not state.silent and state.last_seen is not None:
+            silence_wheel.schedule(state.sensor_id, silence_deadline(state.last_seen, config.for_sensor(state.sensor_id)))
+
+def apply_thresholds(config):
+    # Runs after every threshold swap: pick up shrunken silence thresholds
+    # and re-band /status
+    schedule_silence_deadlines(config)
+    fleet_status.bands = config.bands
+    fleet_status.invalidate()
+
+thresholds.add_listener(apply_thresholds)
+if THRESHOLDS_FILE:
+    thresholds.check_file(THRESHOLDS_FILE)
+
+def check_sensor_silence(current_time):
+    """Raise Sensor Silent for every sensor whose deadline is due; one tick."""
+    fired = 0
+    for sensor_id in silence_wheel.expire(current_time):
+        state = sensor_state.get(sensor_id)
+        if state is None or state.silent:
+            continue
+        limits = thresholds.current.for_sensor(sensor_id)
+        # Flagged silent (avoiding repeated alerts until it reports again)
+        # only if no reading has landed in the meantime
+        if not sensor_state.mark_silent(state, current_time - limits.silence_threshold_seconds):
+            # Reported since it was scheduled, or the threshold was raised;
+            # check again at the new deadline
+            if not state.silent and state.last_seen is not None:
+                silence_wheel.schedule(sensor_id, silence_deadline(state.last_seen, limits))
+            continue
+        last_seen = state.last_seen
+        print(f"Sensor {sensor_id} has been silent for {current_time - last_seen} seconds.")
+        raise_incident('Sensor Silent', sensor_id, 'N/A', details={'last_seen': last_seen},
+                       runbook_link='/docs/runbooks/sensor-silent-alarm.md', sticky=True)
+        if not state.silent:
+            # It reported while the incident was being raised, and that
+            # reading found nothing to resolve yet
+            resolve_incident('Sensor Silent', sensor_id)
+        publish_transition(state, state.state)
+        fired += 1
+    return fired
+
+def retire_sensors(current_time):
+    """Forget sensors gone quiet for SENSOR_RETIRE_SECONDS; returns their ids."""
+    retired = sensor_state.evict_retired(current_time - SENSOR_RETIRE_SECONDS)
+    for sensor_id in retired:
+        silence_wheel.cancel(sensor_id)
+        # Its sticky incidents (Sensor Silent, High Temperature) would never
+        # be resolved otherwise, and would swallow the next outage if it returns
+        for incident in coalescer.resolve_sensor(sensor_id):
+            dispatcher.submit(update_incident, incident.incident_id, status='resolved', details=incident.summary())
+        print(f"Sensor {sensor_id} retired after {SENSOR_RETIRE_SECONDS} seconds without data.")
+    return retired
+
 def monitor_sensor_silence():
+    last_retire_scan = int(time.time())
     while True:
         current_time = int(time.time())
-        for sensor_id, last_seen in list(last_seen_timestamps.items()):
-            if current_time - last_seen > SENSOR_SILENCE_THRESHOLD_SECONDS:
-                print(f"Sensor {sensor_id} has been silent for {current_time - last_seen} seconds.")
-                log_incident('Sensor Silent', sensor_id, 'N/A', details={'last_seen': last_seen})
-                trigger_alert('Sensor Silent', sensor_id, 'N/A', runbook_link='/docs/runbooks/sensor-silent-alarm.md')
-                trigger_automation('Sensor Silent', sensor_id, 'N/A')
-                del last_seen_timestamps[sensor_id] # Remove to avoid repeated alerts for the same silence
-        time.sleep(30) # Check every 30 seconds
+        check_sensor_silence(current_time)
+        sweep_incidents(current_time)
+        if current_time - last_retire_scan >= SENSOR_RETIRE_SCAN_SECONDS:
+            retire_sensors(current_time)
+            last_retire_scan = current_time
+        time.sleep(SILENCE_TICK_SECONDS)
+
+consumer = PartitionedConsumer(
+    handle_reading,
+    workers=CONSUMER_WORKERS,
+    ack_batch=CONSUMER_ACK_BATCH,
+    ack_interval=CONSUMER_ACK_INTERVAL_MS / 1000.0,
+    prepare=classify_readings,
+    max_batch=CONSUMER_CLASSIFY_BATCH,
+)
 
 def start_monitoring_consumer():
     while True:
         try:
             connection = pika.BlockingConnection(pika.ConnectionParameters(host=MESSAGE_QUEUE_HOST, port=MESSAGE_QUEUE_PORT))
             channel = connection.channel()
+            channel.basic_qos(prefetch_count=CONSUMER_PREFETCH)
             channel.queue_declare(queue=SENSOR_QUEUE_NAME, durable=True)
-            channel.basic_consume(queue=SENSOR_QUEUE_NAME, on_message_callback=process_sensor_data)
+            if CONSUMER_WORKERS > 0:
+                consumer.bind(connection, channel)
+                channel.basic_consume(queue=SENSOR_QUEUE_NAME, on_message_callback=consumer.on_message)
+            else:
+                channel.basic_consume(queue=SENSOR_QUEUE_NAME, on_message_callback=process_sensor_data)
 
             print(' [*] Monitoring service waiting for messages. To exit press CTRL+C')
             channel.start_consuming()
@@ -171,47 +451,198 @@ def health_check():
     # Check connectivity to RabbitMQ and dependent services
     try:
         pika.BlockingConnection(pika.ConnectionParameters(host=MESSAGE_QUEUE_HOST, port=MESSAGE_QUEUE_PORT, heartbeat=0)).close()
-        requests.get(f"http://{LOGGING_SERVICE_HOST}:{LOGGING_SERVICE_PORT}/health").raise_for_status()
-        requests.get(f"http://{ALERTING_SERVICE_HOST}:{ALERTING_SERVICE_PORT}/health").raise_for_status()
-        requests.get(f"http://{AUTOMATION_SERVICE_HOST}:{AUTOMATION_SERVICE_PORT}/health").raise_for_status()
+        for name in ('logging', 'alerting', 'automation'):
+            http_clients[name].get('/health', retries=0).raise_for_status()
         return jsonify({"status": "healthy", "message": "Monitoring service operational and connected to dependencies"}), 200
     except (pika.exceptions.AMQPConnectionError, requests.exceptions.RequestException) as e:
         return jsonify({"status": "unhealthy", "message": f"Monitoring service dependency issue: {e}"}), 500
 
 
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    return jsonify({
+        'consumer': consumer.stats() if CONSUMER_WORKERS > 0 else {'workers': 0},
+        'dispatcher': dispatcher.stats(),
+        'incidents': coalescer.stats(),
+        'http': {name: client.stats() for name, client in http_clients.items()},
+        'sensors': len(sensor_state),
+        'silence_wheel': silence_wheel.stats(),
+        'status_cache': fleet_status.stats(),
+        'thresholds': thresholds.stats(),
+        'snapshot': snapshotter.stats() if snapshotter else None,
+        'transitions': {'version': transitions.version, 'retained': len(transitions)},
+    }), 200
+
+
+@app.route('/config/thresholds', methods=['GET'])
+def get_thresholds():
+    return jsonify(thresholds.current.to_dict()), 200
+
+@app.route('/config/thresholds', methods=['POST'])
+def update_thresholds():
+    # Replaces the whole config. Send expected_version (the version from GET)
+    # to fail with 409 instead of overwriting a concurrent change.
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Invalid JSON"}), 400
+    expected_version = data.pop('expected_version', None)
+    try:
+        config = thresholds.update(data, source='api', expected_version=expected_version)
+    except VersionConflict as e:
+        return jsonify({"error": str(e), "version": e.current_version}), 409
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    print(f" [*] Threshold config updated via API to version {config.version}")
+    return jsonify(config.to_dict()), 200
+
 @app.route('/status', methods=['GET'])
 def status_check():
-    sensor_url = 'http://sensor-service:5000/reading'
-    checked_at = datetime.utcnow().isoformat() + 'Z'
+    # Fleet view from in-memory state. The top-level state/sensor_id/temp_f
+    # describe the worst sensor, which is what the alerting poller reads.
+    try:
+        limit = int(request.args.get('limit', STATUS_PAGE_DEFAULT))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= STATUS_PAGE_MAX:
+        return jsonify({"error": f"limit must be between 1 and {STATUS_PAGE_MAX}"}), 400
+    state_filter = request.args.get('state')
+    if state_filter is not None and state_filter not in ('OK', 'WARN', 'ALARM'):
+        return jsonify({"error": "state must be one of OK, WARN, ALARM"}), 400
+
+    summary = fleet_status.summary()
+    if summary.worst is None:
+        return jsonify({'service': 'monitoring-service', 'state': 'UNKNOWN', 'error': 'No sensor readings received yet', 'checked_at': summary.checked_at}), 503
+
+    sensors, next_cursor = fleet_status.page(request.args.get('cursor'), limit, state_filter)
+    worst = summary.worst
+    return jsonify({
+        'service': 'monitoring-service',
+        'sensor_id': worst.sensor_id,
+        'temp_f': worst.last_temp,
+        'state': worst.state,
+        'checked_at': summary.checked_at,
+        'sensor_count': len(summary.sensor_ids),
+        'counts': summary.counts,
+        'silent': summary.silent,
+        'sensors': sensors,
+        'next_cursor': next_cursor,
+    }), 200
+
+@app.route('/status/<sensor_id>', methods=['GET'])
+def sensor_status(sensor_id):
+    state = sensor_state.get(sensor_id)
+    if state is None:
+        return jsonify({"error": f"Unknown sensor {sensor_id}"}), 404
+    return jsonify(dict(state.to_dict(), service='monitoring-service')), 200
+
+def _parse_cursor(value):
+    # "epoch:version" as handed out in event ids; a bare version (no epoch)
+    # is still accepted but can never be resumed
+    if value in (None, ''):
+        return None
+    epoch, _, version = value.rpartition(':')
+    version = int(version)
+    if version < 0:
+        raise ValueError(value)
+    return epoch or None, version
+
+def _resumable(cursor):
+    # The version to resume after, or None if the cursor belongs to another
+    # process: versions start over on restart, so an old cursor below the new
+    # counter would otherwise silently skip the events in between
+    epoch, version = cursor
+    if epoch != STREAM_EPOCH or version > transitions.version:
+        return None
+    return version
+
+def _cursor(version):
+    return f"{STREAM_EPOCH}:{version}"
+
+def _sse(event, data, event_id=None):
+    frame = f"id: {event_id}\n" if event_id is not None else ''
+    return frame + f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/status/stream', methods=['GET'])
+def status_stream():
+    # Server-sent events. Resume with the Last-Event-ID header (sent by
+    # EventSource on reconnect) or ?cursor=; without either the stream starts
+    # at the current version and the client should sync from /status first.
+    # A cursor from another process (different epoch) gets a reset.
     try:
-        resp = requests.get(sensor_url, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
-        temp = float(data.get('temp_f'))
-        sensor_id = data.get('sensor_id')
-
-        # Determine state
-        if 68.0 <= temp <= 75.0:
-            state = 'OK'
-        elif (65.0 <= temp < 68.0) or (75.0 < temp <= 78.0):
-            state = 'WARN'
+        cursor = _parse_cursor(request.headers.get('Last-Event-ID', request.args.get('cursor')))
+    except ValueError:
+        return jsonify({"error": "cursor must be an 'epoch:version' event id"}), 400
+
+    def generate(cursor):
+        version = None if cursor is None else _resumable(cursor)
+        if cursor is not None and version is None:
+            # Cursor from before a restart; versions started over
+            version = transitions.version
+            yield _sse('reset', {'version': version, 'epoch': STREAM_EPOCH}, _cursor(version))
         else:
-            state = 'ALARM'
-
-        return jsonify({
-            'service': 'monitoring-service',
-            'sensor_url': sensor_url,
-            'sensor_id': sensor_id,
-            'temp_f': temp,
-            'state': state,
-            'checked_at': checked_at
-        }), 200
-    except requests.exceptions.RequestException as e:
-        return jsonify({'service': 'monitoring-service', 'state': 'UNKNOWN', 'error': str(e), 'checked_at': checked_at}), 503
-    except (ValueError, KeyError) as e:
-        return jsonify({'service': 'monitoring-service', 'state': 'UNKNOWN', 'error': f'Invalid sensor response: {e}', 'checked_at': checked_at}), 503
+            version = transitions.version if version is None else version
+            yield _sse('hello', {'version': version, 'epoch': STREAM_EPOCH}, _cursor(version))
+        # Ends when the server shuts down; clients reconnect with Last-Event-ID
+        while not transitions.closed:
+            events, truncated = transitions.wait(version, STATUS_STREAM_HEARTBEAT_SECONDS)
+            if transitions.closed:
+                return
+            if truncated:
+                # Missed events fell out of the backlog; client must resync
+                version = transitions.version
+                yield _sse('reset', {'version': version, 'epoch': STREAM_EPOCH}, _cursor(version))
+                continue
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                yield _sse('transition', event, _cursor(event['version']))
+            version = events[-1]['version']
+
+    return Response(generate(cursor), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/status/changes', methods=['GET'])
+def status_changes():
+    # Long-poll fallback for clients that cannot hold an SSE stream open.
+    # Pass the returned cursor back as ?cursor=.
+    try:
+        cursor = _parse_cursor(request.args.get('cursor'))
+        timeout = min(float(request.args.get('timeout', STATUS_CHANGES_MAX_WAIT)), STATUS_CHANGES_MAX_WAIT)
+    except ValueError:
+        return jsonify({"error": "cursor must be an 'epoch:version' cursor and timeout a number"}), 400
+
+    def body(version, events=(), reset=False):
+        return jsonify({'version': version, 'epoch': STREAM_EPOCH, 'cursor': _cursor(version),
+                        'events': list(events), 'reset': reset}), 200
+
+    version = None if cursor is None else _resumable(cursor)
+    if version is None:
+        return body(transitions.version, reset=cursor is not None)
+    events, truncated = transitions.wait(version, max(timeout, 0))
+    if truncated:
+        return body(transitions.version, reset=True)
+    return body(events[-1]['version'] if events else version, events)
+
+def restore_state():
+    # Load the last snapshot before consuming, then re-arm silence detection
+    header = snapshotter.restore() if snapshotter else None
+    if header:
+        for sensor_id, incident_type in header['dropped_incidents']:
+            state = sensor_state.get(sensor_id)
+            if incident_type == 'Sensor Silent' and state is not None:
+                # Its incident was dropped (no logging id); raise it again
+                state.silent = False
+        schedule_silence_deadlines(thresholds.current)
+        fleet_status.invalidate()
+
+def start_background():
+    # Run by __main__ below, or by serving.py in exactly one worker
+    restore_state()
+    if snapshotter:
+        snapshot_thread = threading.Thread(target=snapshotter.run, daemon=True)
+        snapshot_thread.start()
 
-if __name__ == '__main__':
     # Start consumer in a separate thread
     consumer_thread = threading.Thread(target=start_monitoring_consumer, daemon=True)
     consumer_thread.start()
@@ -220,4 +651,24 @@ if __name__ == '__main__':
     silence_monitor_thread = threading.Thread(target=monitor_sensor_silence, daemon=True)
     silence_monitor_thread.start()
 
+    # Pick up threshold config changes without a restart
+    if THRESHOLDS_FILE:
+        threshold_watch_thread = threading.Thread(target=thresholds.watch_file, args=(THRESHOLDS_FILE, THRESHOLDS_POLL_SECONDS), daemon=True)
+        threshold_watch_thread.start()
+
+def stop_background():
+    # Final snapshot on shutdown
+    if snapshotter:
+        snapshotter.stop()
+
+def begin_shutdown():
+    # End open /status/stream and /status/changes requests so the worker
+    # drains at once instead of waiting out the graceful timeout
+    transitions.close()
+
+if __name__ == '__main__':
+    start_background()
+    # SIGTERM (docker stop) exits via atexit
+    atexit.register(stop_background)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     app.run(host='0.0.0.0', port=os.getenv('PORT', 5001))
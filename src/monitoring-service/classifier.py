@@ -0,0 +1,123 @@
+from collections import namedtuple
+
+import numpy as np
+
+# State codes double as severity, so the worst sensor is the highest code
+STATES = ('UNKNOWN', 'OK', 'WARN', 'ALARM')
+UNKNOWN, OK, WARN, ALARM = range(len(STATES))
+STATE_CODES = {name: code for code, name in enumerate(STATES)}
+
+# Inclusive bounds: [ok_low, ok_high] is OK, anything else inside
+# [warn_low, warn_high] is WARN, everything outside is ALARM
+Bands = namedtuple('Bands', ('ok_low', 'ok_high', 'warn_low', 'warn_high'))
+DEFAULT_BANDS = Bands(68.0, 75.0, 65.0, 78.0)
+
+# Below this many readings a plain loop beats building arrays
+VECTORIZE_MIN = 32
+
+
+def _bands(spec, base):
+    if isinstance(spec, Bands):
+        bands = spec
+    else:
+        unknown = set(spec) - set(Bands._fields)
+        if unknown:
+            raise ValueError(f"Unknown band field(s) {sorted(unknown)}. Must be one of {list(Bands._fields)}")
+        bands = base._replace(**{k: float(v) for k, v in spec.items()})
+    if not bands.warn_low <= bands.ok_low <= bands.ok_high <= bands.warn_high:
+        raise ValueError(f"Bands must satisfy warn_low <= ok_low <= ok_high <= warn_high, got {dict(bands._asdict())}")
+    return bands
+
+
+class BandTable:
+    """OK/WARN/ALARM band configuration resolved per sensor.
+
+    Each sensor uses its own override if it has one, else its zone's bands,
+    else the default. Overrides are compiled up front into one sensor ->
+    row lookup over a (rows, 4) bounds array. classify() can then gather
+    every reading's bounds with a single fancy index and compare in one
+    NumPy pass.
+    """
+
+    def __init__(self, default=DEFAULT_BANDS, zones=None, sensor_zones=None, sensors=None):
+        default = _bands(default, DEFAULT_BANDS)
+        rows = [default]
+        zone_rows = {}
+        for zone, spec in (zones or {}).items():
+            zone_rows[zone] = len(rows)
+            rows.append(_bands(spec, default))
+        index = {}
+        for sensor_id, zone in (sensor_zones or {}).items():
+            if zone not in zone_rows:
+                raise ValueError(f"Sensor {sensor_id} is mapped to unknown zone '{zone}'")
+            index[sensor_id] = zone_rows[zone]
+        for sensor_id, spec in (sensors or {}).items():
+            base = rows[index.get(sensor_id, 0)]
+            index[sensor_id] = len(rows)
+            rows.append(_bands(spec, base))
+        self.default = default
+        self._rows = rows
+        self._index = index
+        self._bounds = np.array(rows, dtype=np.float64)
+
+    @classmethod
+    def from_config(cls, config):
+        """Build from {'default': {...}, 'zones': {...}, 'sensor_zones': {...}, 'sensors': {...}}."""
+        config = config or {}
+        return cls(
+            default=_bands(config.get('default', {}), DEFAULT_BANDS),
+            zones=config.get('zones'),
+            sensor_zones=config.get('sensor_zones'),
+            sensors=config.get('sensors'),
+        )
+
+    def bands_for(self, sensor_id):
+        return self._rows[self._index.get(sensor_id, 0)]
+
+    def classify_one(self, temp, sensor_id=None):
+        """Scalar classification, for the per-message consumer path."""
+        if temp is None or temp != temp:
+            return 'UNKNOWN'
+        bands = self._rows[self._index.get(sensor_id, 0)] if self._index else self.default
+        if bands.ok_low <= temp <= bands.ok_high:
+            return 'OK'
+        elif bands.warn_low <= temp <= bands.warn_high:
+            return 'WARN'
+        return 'ALARM'
+
+    def _bounds_for(self, sensor_ids, count):
+        if not self._index or sensor_ids is None:
+            return self._bounds[0]
+        index = self._index
+        rows = np.fromiter((index.get(s, 0) for s in sensor_ids), dtype=np.intp, count=count)
+        return self._bounds[rows].T
+
+    def classify(self, temps, sensor_ids=None):
+        """Classify an array of readings; returns int8 state codes (see STATES).
+
+        NaN temperatures come back as UNKNOWN.
+        """
+        temps = np.asarray(temps, dtype=np.float64)
+        ok_low, ok_high, warn_low, warn_high = self._bounds_for(sensor_ids, len(temps))
+        codes = np.full(temps.shape, ALARM, dtype=np.int8)
+        codes[(temps >= warn_low) & (temps <= warn_high)] = WARN
+        codes[(temps >= ok_low) & (temps <= ok_high)] = OK
+        codes[np.isnan(temps)] = UNKNOWN
+        return codes
+
+    def deviation(self, temps, sensor_ids=None):
+        """Degrees outside each reading's OK band (0 inside it, NaN stays NaN)."""
+        temps = np.asarray(temps, dtype=np.float64)
+        ok_low, ok_high, _, _ = self._bounds_for(sensor_ids, len(temps))
+        return np.maximum(np.maximum(ok_low - temps, temps - ok_high), 0.0)
+
+    def classify_labels(self, temps, sensor_ids=None):
+        """State names for a batch, vectorized once the batch is big enough."""
+        if len(temps) < VECTORIZE_MIN:
+            if sensor_ids is None:
+                return [self.classify_one(t) for t in temps]
+            return [self.classify_one(t, s) for t, s in zip(temps, sensor_ids)]
+        return [STATES[c] for c in self.classify(temps, sensor_ids)]
+
+    def __len__(self):
+        return len(self._rows)
@@ -0,0 +1,167 @@
+import threading
+import time
+
+OPEN = 'open'          # first occurrence: log, alert and automate
+REFIRE = 'refire'      # still happening after the cooldown: alert and automate again
+SUPPRESS = 'suppress'  # folded into the open incident
+
+
+class OpenIncident:
+    __slots__ = ('sensor_id', 'incident_type', 'incident_id', 'opened_at', 'last_at', 'last_fanout_at',
+                 'last_synced_at', 'count', 'peak', 'last_value', 'dirty', 'closed', 'sticky')
+
+    def __init__(self, sensor_id, incident_type, value, now, sticky=False):
+        self.sensor_id = sensor_id
+        self.incident_type = incident_type
+        self.incident_id = None      # logging-service id, set once the create call returns
+        self.opened_at = now
+        self.last_at = now
+        self.last_fanout_at = now
+        self.last_synced_at = now
+        self.count = 1
+        self.peak = value if _numeric(value) else None
+        self.last_value = value
+        self.dirty = False           # count/peak changed since the last sync
+        self.closed = False
+        self.sticky = sticky         # only closes via resolve(), never by going quiet
+
+    def summary(self):
+        return {
+            'occurrences': self.count,
+            'peak_value': self.peak,
+            'last_value': self.last_value,
+            'first_seen': self.opened_at,
+            'last_seen': self.last_at,
+        }
+
+
+def _numeric(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class IncidentCoalescer:
+    """Collapses repeats of the same (sensor, incident type) into one incident.
+
+    The first occurrence opens an incident and is fanned out. Repeats only
+    bump its occurrence count, peak and last value, unless `cooldown`
+    seconds have passed since the last fan-out, in which case alert and
+    automation run again (REFIRE). An incident closes when the caller
+    resolves it (condition cleared) or, unless it was opened sticky, after
+    `resolve_after` seconds with no new occurrence. sweep() reports which open incidents need their count
+    and peak written back, at most every `update_interval` seconds each.
+
+    The logging-service id arrives asynchronously (attach_id). An incident
+    that closes before its id is known is handed back by attach_id instead
+    of resolve()/sweep(), so the final write happens exactly once.
+
+    Open incidents and their ids go into the warm-restart snapshot
+    (open_incidents/restore), so a restarted process still resolves what
+    it opened instead of logging it again.
+    """
+
+    def __init__(self, cooldown=300.0, resolve_after=120.0, update_interval=30.0):
+        self.cooldown = cooldown
+        self.resolve_after = resolve_after
+        self.update_interval = update_interval
+        self._open = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.suppressed = 0
+        self.refired = 0
+        self.resolved = 0
+
+    def record(self, sensor_id, incident_type, value, now=None, sticky=False):
+        """Register an occurrence; returns (OPEN | REFIRE | SUPPRESS, incident)."""
+        now = time.time() if now is None else now
+        key = (sensor_id, incident_type)
+        with self._lock:
+            incident = self._open.get(key)
+            if incident is None:
+                incident = self._open[key] = OpenIncident(sensor_id, incident_type, value, now, sticky)
+                self.opened += 1
+                return OPEN, incident
+            incident.count += 1
+            incident.last_at = now
+            incident.last_value = value
+            if _numeric(value) and (incident.peak is None or abs(value) > abs(incident.peak)):
+                incident.peak = value
+            incident.dirty = True
+            if now - incident.last_fanout_at >= self.cooldown:
+                incident.last_fanout_at = now
+                self.refired += 1
+                return REFIRE, incident
+            self.suppressed += 1
+            return SUPPRESS, incident
+
+    def attach_id(self, incident, incident_id):
+        """Record the logging-service id; returns True if the incident already closed."""
+        with self._lock:
+            incident.incident_id = incident_id
+            return incident.closed
+
+    def _close(self, incident):
+        # Caller holds the lock. True if the final write can go out now.
+        incident.closed = True
+        self.resolved += 1
+        return incident.incident_id is not None
+
+    def is_open(self, sensor_id, incident_type):
+        # Lock-free probe for the per-reading hot path
+        return (sensor_id, incident_type) in self._open
+
+    def resolve(self, sensor_id, incident_type):
+        """Close the incident if open; returns it if its final write is due now."""
+        with self._lock:
+            incident = self._open.pop((sensor_id, incident_type), None)
+            if incident is not None and self._close(incident):
+                return incident
+            return None
+
+    def resolve_sensor(self, sensor_id):
+        """Close every incident open for a sensor; returns those whose final write is due now."""
+        with self._lock:
+            keys = [key for key in self._open if key[0] == sensor_id]
+            return [incident for incident in (self._open.pop(key) for key in keys) if self._close(incident)]
+
+    def sweep(self, now=None):
+        """Return (to_update, to_resolve); closed incidents are removed."""
+        now = time.time() if now is None else now
+        to_update, to_resolve = [], []
+        with self._lock:
+            for key, incident in list(self._open.items()):
+                if not incident.sticky and now - incident.last_at >= self.resolve_after:
+                    del self._open[key]
+                    if self._close(incident):
+                        to_resolve.append(incident)
+                elif incident.dirty and incident.incident_id is not None \
+                        and now - incident.last_synced_at >= self.update_interval:
+                    incident.dirty = False
+                    incident.last_synced_at = now
+                    to_update.append(incident)
+        return to_update, to_resolve
+
+    def open_incidents(self):
+        """The currently open incidents, for the warm-restart snapshot."""
+        with self._lock:
+            return list(self._open.values())
+
+    def restore(self, incident):
+        """Reopen an incident loaded from a snapshot."""
+        with self._lock:
+            self._open[(incident.sensor_id, incident.incident_type)] = incident
+
+    def clear(self):
+        with self._lock:
+            self._open.clear()
+
+    def __len__(self):
+        return len(self._open)
+
+    def stats(self):
+        return {
+            'open': len(self._open),
+            'opened': self.opened,
+            'suppressed': self.suppressed,
+            'refired': self.refired,
+            'resolved': self.resolved,
+        }
@@ -0,0 +1,212 @@
+import json
+import queue
+import threading
+import zlib
+
+ACK = 'ack'
+REJECT = 'reject'    # nack, drop (poison message)
+REQUEUE = 'requeue'  # nack, let the broker redeliver
+
+
+def partition_for(key, partitions):
+    # crc32 rather than hash() so the mapping is stable across processes
+    return zlib.crc32(key.encode('utf-8')) % partitions
+
+
+class AckTracker:
+    """Turns out-of-order message completions into ordered ack/nack frames.
+
+    Partitions finish messages in any order, but a multi-ack for tag N covers
+    every outstanding delivery <= N. Completed tags are therefore held until
+    they form a contiguous run from the last settled tag. The run is then
+    released as (tag, outcome) pairs in delivery order.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._settled_through = 0
+            self._done = {}
+
+    def settle(self, tag, outcome):
+        with self._lock:
+            self._done[tag] = outcome
+            return len(self._done)
+
+    def pending(self):
+        with self._lock:
+            return len(self._done)
+
+    def drain(self):
+        """Pop the contiguous run of completed tags, in delivery order."""
+        run = []
+        with self._lock:
+            tag = self._settled_through + 1
+            while tag in self._done:
+                run.append((tag, self._done.pop(tag)))
+                tag += 1
+            self._settled_through = tag - 1
+        return run
+
+
+class PartitionedConsumer:
+    """Fans `sensor_data` deliveries out to N worker threads by sensor_id.
+
+    Every reading for a given sensor lands on the same partition and is
+    handled in delivery order, so per-sensor detection state is never touched
+    by two threads at once. The pika I/O thread only parses and routes. Acks
+    are batched: a multi-ack goes out once `ack_batch` messages have
+    completed, or every `ack_interval` seconds. Failed messages are nacked
+    individually, in order, before any multi-ack that would cover them.
+
+    With a `prepare` callback, a worker drains up to `max_batch` queued
+    messages at a time and calls prepare(list_of_data) once. Each message is
+    then handled as handler(data, prepared[i]). If prepare fails, the
+    messages fall back to handler(data).
+
+    pika's BlockingConnection is not thread-safe, so every frame is sent from
+    the connection's own thread via add_callback_threadsafe.
+    """
+
+    def __init__(self, handler, workers=4, ack_batch=50, ack_interval=0.2, prepare=None, max_batch=1):
+        self.handler = handler
+        self.prepare = prepare
+        self.max_batch = max(1, max_batch)
+        self.workers = max(1, workers)
+        self.ack_batch = max(1, ack_batch)
+        self.ack_interval = ack_interval
+        self._queues = [queue.Queue() for _ in range(self.workers)]
+        self._threads = []
+        self._tracker = AckTracker()
+        self._connection = None
+        self._channel = None
+        self._epoch = 0
+        self._flush_scheduled = threading.Event()
+        self._lock = threading.Lock()
+        self.processed = [0] * self.workers
+        self.batches = [0] * self.workers
+        self.acked = 0
+        self.nacked = 0
+        self.ack_frames = 0
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, args=(i,), name=f'consumer-partition-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def bind(self, connection, channel):
+        """Attach to a fresh connection/channel; delivery tags restart at 1."""
+        self.start()
+        with self._lock:
+            self._epoch += 1
+            self._connection = connection
+            self._channel = channel
+        # Anything still queued from the old channel will be redelivered
+        for q in self._queues:
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+        self._tracker.reset()
+        self._flush_scheduled.clear()
+        connection.call_later(self.ack_interval, self._periodic_flush)
+
+    def on_message(self, ch, method, properties, body):
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError:
+            print(f" [!] Invalid JSON received: {body}")
+            self._settle(self._epoch, method.delivery_tag, REJECT)
+            return
+        sensor_id = data.get('sensor_id') if isinstance(data, dict) else None
+        partition = partition_for(str(sensor_id), self.workers)
+        self._queues[partition].put((self._epoch, method.delivery_tag, data))
+
+    def _work(self, partition):
+        q = self._queues[partition]
+        while True:
+            batch = [q.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            prepared = None
+            if self.prepare is not None:
+                try:
+                    prepared = self.prepare([data for _, _, data in batch])
+                except Exception as e:
+                    print(f" [!] Error preparing batch: {e}")
+            self.batches[partition] += 1
+            for i, (epoch, tag, data) in enumerate(batch):
+                try:
+                    if prepared is None:
+                        self.handler(data)
+                    else:
+                        self.handler(data, prepared[i])
+                    outcome = ACK
+                except Exception as e:
+                    print(f" [!] Error processing message: {e}")
+                    outcome = REQUEUE
+                self.processed[partition] += 1
+                self._settle(epoch, tag, outcome)
+
+    def _settle(self, epoch, tag, outcome):
+        if epoch != self._epoch:
+            return  # delivered on a channel that has since closed
+        done = self._tracker.settle(tag, outcome)
+        if (outcome != ACK or done >= self.ack_batch) and not self._flush_scheduled.is_set():
+            self._flush_scheduled.set()
+            connection = self._connection
+            try:
+                connection.add_callback_threadsafe(self.flush)
+            except Exception:
+                # Connection is closing; the broker will redeliver
+                pass
+
+    def _periodic_flush(self):
+        self.flush()
+        if self._connection is not None and self._connection.is_open:
+            self._connection.call_later(self.ack_interval, self._periodic_flush)
+
+    def flush(self):
+        """Send pending acks/nacks. Must run on the connection's thread."""
+        self._flush_scheduled.clear()
+        channel = self._channel
+        if channel is None or not channel.is_open:
+            return
+        last_ack = None
+        for tag, outcome in self._tracker.drain():
+            if outcome == ACK:
+                last_ack = tag
+                self.acked += 1
+                continue
+            if last_ack is not None:
+                channel.basic_ack(delivery_tag=last_ack, multiple=True)
+                self.ack_frames += 1
+                last_ack = None
+            channel.basic_nack(delivery_tag=tag, requeue=(outcome == REQUEUE))
+            self.nacked += 1
+        if last_ack is not None:
+            channel.basic_ack(delivery_tag=last_ack, multiple=True)
+            self.ack_frames += 1
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'partition_depth': [q.qsize() for q in self._queues],
+            'processed': list(self.processed),
+            'batches': list(self.batches),
+            'pending_acks': self._tracker.pending(),
+            'acked': self.acked,
+            'nacked': self.nacked,
+            'ack_frames': self.ack_frames,
+        }
@@ -0,0 +1,91 @@
+import math
+import threading
+
+
+class DeadlineWheel:
+    """Hashed timer wheel keyed by deadline bucket.
+
+    Keys are dropped into the bucket `ceil(deadline / resolution)` and
+    expire() pops every bucket that has come due since the last call, so a
+    tick costs O(expired keys) rather than O(tracked keys).
+
+    Invalidation is lazy: a key is held in at most one bucket, and pushing
+    its deadline back does not move it. The caller re-checks the real
+    deadline when the key comes out and reschedules it if it is not
+    actually due yet.
+    """
+
+    def __init__(self, resolution=1.0):
+        self.resolution = resolution
+        self._buckets = {}    # bucket index -> set of keys
+        self._scheduled = {}  # key -> bucket index
+        self._cursor = None   # last bucket index expired
+        self._lock = threading.Lock()
+        self.expired = 0
+
+    def _bucket_for(self, deadline):
+        return math.ceil(deadline / self.resolution)
+
+    def schedule(self, key, deadline):
+        """Arrange for key to come out of expire() once deadline passes.
+
+        A key that is already scheduled keeps its earlier slot.
+        """
+        bucket = self._bucket_for(deadline)
+        with self._lock:
+            if self._cursor is not None and bucket <= self._cursor:
+                bucket = self._cursor + 1  # already past; fire on the next tick
+            current = self._scheduled.get(key)
+            if current is not None:
+                if current <= bucket:
+                    return
+                self._buckets[current].discard(key)
+            self._scheduled[key] = bucket
+            self._buckets.setdefault(bucket, set()).add(key)
+
+    def cancel(self, key):
+        with self._lock:
+            bucket = self._scheduled.pop(key, None)
+            if bucket is not None:
+                self._buckets[bucket].discard(key)
+
+    def expire(self, now):
+        """Pop and return every key whose bucket is due at `now`."""
+        due_through = math.floor(now / self.resolution)
+        expired = []
+        with self._lock:
+            if self._cursor is not None and due_through - self._cursor <= len(self._buckets):
+                due = range(self._cursor + 1, due_through + 1)
+            else:
+                # First tick or a long stall: walk the occupied buckets instead
+                due = sorted(b for b in self._buckets if b <= due_through)
+            for bucket in due:
+                keys = self._buckets.pop(bucket, None)
+                if keys:
+                    for key in keys:
+                        del self._scheduled[key]
+                    expired.extend(keys)
+            if self._cursor is None or due_through > self._cursor:
+                self._cursor = due_through
+            self.expired += len(expired)
+        return expired
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._scheduled.clear()
+            self._cursor = None
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    def __contains__(self, key):
+        return key in self._scheduled
+
+    def stats(self):
+        with self._lock:
+            return {
+                'scheduled': len(self._scheduled),
+                'buckets': len(self._buckets),
+                'expired': self.expired,
+            }
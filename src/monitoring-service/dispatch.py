@@ -0,0 +1,101 @@
+import queue
+import threading
+
+
+class IncidentDispatcher:
+    """Runs incident side effects on a bounded worker pool.
+
+    The AMQP callback only classifies readings; the blocking HTTP calls to
+    logging, alerting and automation are queued here and run concurrently by
+    `workers` threads. The queue holds at most `max_queue` tasks. When it is
+    full, submit() blocks for up to `submit_timeout` seconds, which holds back
+    the consumer (and, through prefetch, the broker) instead of growing memory
+    without bound. Tasks still not accepted after that are dropped and
+    counted.
+
+    workers=0 runs every task inline on the caller's thread.
+    """
+
+    def __init__(self, workers=8, max_queue=1000, submit_timeout=10.0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.submit_timeout = submit_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._busy = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'incident-dispatch-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, fn, *args, **kwargs):
+        with self._lock:
+            self.submitted += 1
+        if self.workers <= 0:
+            self._run(fn, args, kwargs)
+            return True
+        if not self._threads:
+            self.start()
+        try:
+            self._queue.put((fn, args, kwargs), timeout=self.submit_timeout)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            print(f" [!] Incident dispatch queue full ({self.max_queue}); dropping {getattr(fn, '__name__', fn)}")
+            return False
+
+    def _run(self, fn, args, kwargs):
+        with self._lock:
+            self._busy += 1
+        try:
+            fn(*args, **kwargs)
+            ok = True
+        except Exception as e:
+            print(f" [!] Incident side effect {getattr(fn, '__name__', fn)} failed: {e}")
+            ok = False
+        with self._lock:
+            self._busy -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def _work(self):
+        while True:
+            fn, args, kwargs = self._queue.get()
+            try:
+                self._run(fn, args, kwargs)
+            finally:
+                self._queue.task_done()
+
+    def join(self):
+        """Block until every queued task has run."""
+        self._queue.join()
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_depth': self._queue.qsize(),
+                'queue_max': self.max_queue,
+                'busy': self._busy,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'dropped': self.dropped,
+            }
@@ -0,0 +1,96 @@
+import bisect
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from classifier import STATES, BandTable
+
+class FleetSummary:
+    __slots__ = ('counts', 'silent', 'worst', 'sensor_ids', 'computed_at', 'checked_at')
+
+    def __init__(self, counts, silent, worst, sensor_ids, computed_at):
+        self.counts = counts
+        self.silent = silent
+        self.worst = worst
+        self.sensor_ids = sensor_ids   # sorted, the keyset for pagination
+        self.computed_at = computed_at
+        self.checked_at = datetime.utcfromtimestamp(computed_at).isoformat() + 'Z'
+
+
+class FleetStatus:
+    """Read-side view of the sensor state store for /status.
+
+    The fleet summary (per-state counts, worst sensor, sorted id list) is
+    rebuilt from a store snapshot at most once every `ttl` seconds, so a
+    burst of dashboard/poller requests costs one pass over the fleet. The
+    rebuild classifies every sensor's last reading in one vectorized call.
+    Pages are keyset-paginated over the sorted ids and read each sensor's
+    live state, so a page is never staler than the sensor itself.
+    """
+
+    def __init__(self, store, ttl=1.0, bands=None):
+        self.store = store
+        self.bands = bands or BandTable()
+        self.ttl = ttl
+        self._summary = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def summary(self):
+        summary = self._summary
+        now = time.time()
+        if summary is not None and now - summary.computed_at < self.ttl:
+            return summary
+        with self._lock:
+            summary = self._summary
+            if summary is None or time.time() - summary.computed_at >= self.ttl:
+                summary = self._summary = self._build()
+        return summary
+
+    def invalidate(self):
+        self._summary = None
+
+    def _build(self):
+        states = self.store.snapshot()
+        count = len(states)
+        ids = [state.sensor_id for state in states]
+        temps = np.fromiter((np.nan if state.last_temp is None else state.last_temp for state in states),
+                            dtype=np.float64, count=count)
+        codes = self.bands.classify(temps, ids)
+        per_state = np.bincount(codes, minlength=len(STATES))
+        counts = {name: int(per_state[code]) for code, name in enumerate(STATES)}
+        silent = sum(1 for state in states if state.silent)
+        worst = None
+        if count:
+            # Highest severity first, then furthest outside the OK band
+            deviation = np.nan_to_num(self.bands.deviation(temps, ids))
+            worst = states[int(np.lexsort((deviation, codes))[-1])]
+        ids.sort()
+        self.rebuilds += 1
+        return FleetSummary(counts, silent, worst, ids, time.time())
+
+    def page(self, cursor=None, limit=100, state=None):
+        """Return (sensors, next_cursor) for ids strictly after cursor."""
+        ids = self.summary().sensor_ids
+        start = bisect.bisect_right(ids, cursor) if cursor else 0
+        sensors = []
+        next_cursor = None
+        for index in range(start, len(ids)):
+            entry = self.store.get(ids[index])
+            if entry is None or (state is not None and entry.state != state):
+                continue
+            if len(sensors) == limit:
+                next_cursor = sensors[-1]['sensor_id']
+                break
+            sensors.append(entry.to_dict())
+        return sensors, next_cursor
+
+    def stats(self):
+        summary = self._summary
+        return {
+            'ttl_seconds': self.ttl,
+            'rebuilds': self.rebuilds,
+            'age_seconds': round(time.time() - summary.computed_at, 3) if summary else None,
+        }
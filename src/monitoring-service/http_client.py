@@ -0,0 +1,142 @@
+import bisect
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus-style
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RETRY_STATUSES = (502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            if error:
+                self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            count, total, errors = self.count, self.sum, self.errors
+        # Cumulative counts per upper bound, like a Prometheus histogram
+        cumulative = {}
+        running = 0
+        for bound, n in zip(list(self.buckets) + ['+Inf'], counts):
+            running += n
+            cumulative[str(bound)] = running
+        return {
+            'count': count,
+            'errors': errors,
+            'sum_seconds': round(total, 6),
+            'avg_ms': round(total / count * 1000.0, 3) if count else None,
+            'buckets': cumulative,
+        }
+
+
+def _never_sent(error):
+    # True only if the connection itself failed, so the request cannot have
+    # reached the server. A dropped connection ('Connection aborted',
+    # RemoteDisconnected) may come after the body was sent and processed.
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError):
+        return False
+    reason = error.args[0] if error.args else None
+    reason = getattr(reason, 'reason', reason)  # requests wraps urllib3's MaxRetryError
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+class ServiceClient:
+    """Keep-alive HTTP client for one downstream service.
+
+    Wraps a requests.Session with its own connection pool, so repeated calls
+    reuse TCP connections instead of opening one per request. Every request
+    gets explicit (connect, read) timeouts unless the caller overrides them.
+
+    Failed attempts are retried up to `retries` times with full-jitter
+    exponential backoff. Idempotent methods are retried on any connection
+    error, timeout or 502/503/504 response. Other methods (POST) are retried
+    only when the connection could not be opened, so a request the server
+    may already have applied is never replayed. Each attempt's latency is
+    recorded in a per-target histogram.
+    """
+
+    def __init__(self, name, base_url, pool_size=10, connect_timeout=2.0, read_timeout=5.0,
+                 retries=2, backoff=0.1):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.latency = LatencyHistogram()
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def _sleep_before_retry(self, attempt):
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def request(self, method, path, retries=None, **kwargs):
+        method = method.upper()
+        retries = self.retries if retries is None else retries
+        idempotent = method in IDEMPOTENT_METHODS
+        kwargs.setdefault('timeout', self.timeout)
+        url = self.url(path)
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.latency.observe(time.perf_counter() - start, error=True)
+                retryable = idempotent or _never_sent(e)
+                if attempt < retries and retryable:
+                    self._sleep_before_retry(attempt)
+                    attempt += 1
+                    continue
+                raise
+            self.latency.observe(time.perf_counter() - start, error=response.status_code >= 500)
+            if response.status_code in RETRY_STATUSES and idempotent and attempt < retries:
+                self._sleep_before_retry(attempt)
+                attempt += 1
+                continue
+            return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def stats(self):
+        return {
+            'base_url': self.base_url,
+            'timeout': {'connect': self.timeout[0], 'read': self.timeout[1]},
+            'retries': self.retries,
+            'latency': self.latency.snapshot(),
+        }
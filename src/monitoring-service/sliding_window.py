@@ -0,0 +1,75 @@
+from collections import deque
+
+
+class SlidingWindow:
+    """Time-based sliding window with running min/max.
+
+    Readings older than `window_seconds` relative to the newest one are
+    evicted as new readings arrive. Alongside the readings it keeps two
+    monotonic deques (ascending for min, descending for max), so add() and
+    eviction are amortized O(1) and min/max are O(1) reads.
+
+    Timestamps are expected to be non-decreasing; a late reading is treated
+    as arriving at the newest timestamp seen so far.
+    """
+
+    __slots__ = ('window_seconds', '_items', '_min', '_max')
+
+    def __init__(self, window_seconds):
+        self.window_seconds = window_seconds
+        self._items = deque()  # (timestamp, value)
+        self._min = deque()    # values ascending from the front
+        self._max = deque()    # values descending from the front
+
+    def add(self, timestamp, value, window_seconds=None):
+        if window_seconds is not None:
+            self.window_seconds = window_seconds
+        if self._items and timestamp < self._items[-1][0]:
+            timestamp = self._items[-1][0]
+        entry = (timestamp, value)
+        self._items.append(entry)
+
+        min_q = self._min
+        while min_q and min_q[-1][1] >= value:
+            min_q.pop()
+        min_q.append(entry)
+
+        max_q = self._max
+        while max_q and max_q[-1][1] <= value:
+            max_q.pop()
+        max_q.append(entry)
+
+        self.evict(timestamp - self.window_seconds)
+
+    def evict(self, cutoff):
+        """Drop readings with timestamp <= cutoff."""
+        for q in (self._items, self._min, self._max):
+            while q and q[0][0] <= cutoff:
+                q.popleft()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else None
+
+    @property
+    def span_seconds(self):
+        if not self._items:
+            return 0
+        return self._items[-1][0] - self._items[0][0]
+
+    @property
+    def swing(self):
+        """Largest temperature difference between any two readings in the window."""
+        if not self._items:
+            return 0.0
+        return self._max[0][1] - self._min[0][1]
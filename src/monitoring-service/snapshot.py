@@ -0,0 +1,277 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+from classifier import STATE_CODES, STATES
+from coalescer import OpenIncident
+
+MAGIC = b'HVSS'
+FORMAT_VERSION = 2
+# Version 1 has no open incidents section; it still loads
+READABLE_VERSIONS = (1, 2)
+
+# magic, format version, sensor count, written at (epoch seconds)
+HEADER = struct.Struct('<4sHId')
+# id length, last_seen, last_temp, high_temp_start, reported_temp, state, silent, window length
+RECORD = struct.Struct('<HddddBBH')
+WINDOW_ENTRY = struct.Struct('<dd')
+# After the sensors (version 2+): open incident count, then per incident
+# sensor id length, type length, logging id (-1: not known yet), opened_at,
+# last_at, last_fanout_at, last_synced_at, count, peak, dirty, sticky,
+# last value length (JSON)
+INCIDENT_COUNT = struct.Struct('<I')
+INCIDENT = struct.Struct('<HHqddddIdBBH')
+# crc32 of everything before it
+TRAILER = struct.Struct('<I')
+
+NAN = float('nan')
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _pack_number(value):
+    return NAN if value is None else float(value)
+
+
+def _unpack_number(value):
+    if value != value:
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def _window_items(window):
+    # The owning consumer partition may append while we copy; just retry
+    for _ in range(3):
+        try:
+            return list(window)
+        except RuntimeError:
+            continue
+    return []
+
+
+def write_snapshot(store, path, coalescer=None):
+    """Write every sensor's state to path atomically; returns the sensor count.
+
+    The snapshot is written to a temp file in the same directory, fsynced and
+    then renamed over path, so readers only ever see a complete snapshot.
+    The coalescer's open incidents are written after the sensors.
+    """
+    states = store.snapshot()
+    crc = 0
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        def emit(chunk):
+            nonlocal crc
+            crc = zlib.crc32(chunk, crc)
+            f.write(chunk)
+
+        emit(HEADER.pack(MAGIC, FORMAT_VERSION, len(states), time.time()))
+        for state in states:
+            sensor_id = state.sensor_id.encode('utf-8')
+            window = _window_items(state.window)
+            emit(RECORD.pack(
+                len(sensor_id),
+                _pack_number(state.last_seen),
+                _pack_number(state.last_temp),
+                _pack_number(state.high_temp_start),
+                _pack_number(state.reported_temp),
+                STATE_CODES.get(state.state, 0),
+                1 if state.silent else 0,
+                len(window),
+            ))
+            emit(sensor_id)
+            if window:
+                emit(b''.join(WINDOW_ENTRY.pack(ts, value) for ts, value in window))
+        incidents = coalescer.open_incidents() if coalescer is not None else []
+        emit(INCIDENT_COUNT.pack(len(incidents)))
+        for incident in incidents:
+            sensor_id = incident.sensor_id.encode('utf-8')
+            incident_type = incident.incident_type.encode('utf-8')
+            last_value = json.dumps(incident.last_value).encode('utf-8')
+            emit(INCIDENT.pack(
+                len(sensor_id),
+                len(incident_type),
+                -1 if incident.incident_id is None else incident.incident_id,
+                incident.opened_at,
+                incident.last_at,
+                incident.last_fanout_at,
+                incident.last_synced_at,
+                incident.count,
+                _pack_number(incident.peak),
+                1 if incident.dirty else 0,
+                1 if incident.sticky else 0,
+                len(last_value),
+            ))
+            emit(sensor_id + incident_type + last_value)
+        f.write(TRAILER.pack(crc))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # Make the rename itself durable
+    dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+    return len(states)
+
+
+def _load_incidents(data, offset, coalescer):
+    # Returns (restored, dropped, offset). An incident whose create call was
+    # still in flight has no logging id, so it could never be updated or
+    # resolved; it is dropped and the condition, if it persists, opens a new one
+    (count,) = INCIDENT_COUNT.unpack_from(data, offset)
+    offset += INCIDENT_COUNT.size
+    restored, dropped = 0, []
+    for _ in range(count):
+        (id_len, type_len, incident_id, opened_at, last_at, last_fanout_at, last_synced_at, occurrences, peak,
+         dirty, sticky, value_len) = INCIDENT.unpack_from(data, offset)
+        offset += INCIDENT.size
+        sensor_id = data[offset:offset + id_len].decode('utf-8')
+        offset += id_len
+        incident_type = data[offset:offset + type_len].decode('utf-8')
+        offset += type_len
+        last_value = json.loads(data[offset:offset + value_len].decode('utf-8'))
+        offset += value_len
+        if coalescer is None:
+            continue
+        if incident_id < 0:
+            dropped.append((sensor_id, incident_type))
+            continue
+        incident = OpenIncident(sensor_id, incident_type, last_value, opened_at, bool(sticky))
+        incident.incident_id = incident_id
+        incident.last_at = last_at
+        incident.last_fanout_at = last_fanout_at
+        incident.last_synced_at = last_synced_at
+        incident.count = occurrences
+        incident.peak = _unpack_number(peak)
+        incident.dirty = bool(dirty)
+        coalescer.restore(incident)
+        restored += 1
+    return restored, dropped, offset
+
+
+def load_snapshot(store, path, coalescer=None):
+    """Restore sensor state from path into store; returns the snapshot header.
+
+    The file is memory-mapped and decoded record by record with
+    struct.unpack_from, so nothing but the restored state is copied.
+    Open incidents are restored into coalescer, if given; those never
+    assigned a logging id are listed as (sensor_id, incident_type) under
+    'dropped_incidents' instead. Raises
+    SnapshotError if the file is truncated, corrupt or from an unknown
+    format version.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER.size + TRAILER.size:
+            raise SnapshotError(f"{path} is truncated")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            body_end = size - TRAILER.size
+            (expected_crc,) = TRAILER.unpack_from(data, body_end)
+            with memoryview(data) as view, view[:body_end] as body:
+                crc = zlib.crc32(body)
+            if crc != expected_crc:
+                raise SnapshotError(f"{path} failed its checksum")
+            magic, version, count, written_at = HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version not in READABLE_VERSIONS:
+                raise SnapshotError(f"{path} is not a version {FORMAT_VERSION} state snapshot")
+            offset = HEADER.size
+            for _ in range(count):
+                id_len, last_seen, last_temp, high_temp_start, reported_temp, state_code, silent, window_len = \
+                    RECORD.unpack_from(data, offset)
+                offset += RECORD.size
+                sensor_id = data[offset:offset + id_len].decode('utf-8')
+                offset += id_len
+                state = store.touch(sensor_id)
+                state.last_seen = _unpack_number(last_seen)
+                state.last_temp = _unpack_number(last_temp)
+                state.high_temp_start = _unpack_number(high_temp_start)
+                state.reported_temp = _unpack_number(reported_temp)
+                state.state = STATES[state_code] if state_code < len(STATES) else 'UNKNOWN'
+                state.silent = bool(silent)
+                for ts, value in WINDOW_ENTRY.iter_unpack(data[offset:offset + window_len * WINDOW_ENTRY.size]):
+                    state.window.add(_unpack_number(ts), value)
+                offset += window_len * WINDOW_ENTRY.size
+            incidents, dropped = 0, []
+            if version >= 2:
+                incidents, dropped, offset = _load_incidents(data, offset, coalescer)
+            if offset != body_end:
+                raise SnapshotError(f"{path} has {body_end - offset} unexpected trailing bytes")
+    return {'sensors': count, 'incidents': incidents, 'dropped_incidents': dropped, 'written_at': written_at}
+
+
+class Snapshotter:
+    """Periodically writes the state store (and open incidents) to disk for warm restarts."""
+
+    def __init__(self, store, path, interval=30.0, coalescer=None):
+        self.store = store
+        self.path = path
+        self.coalescer = coalescer
+        self.interval = interval
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self.writes = 0
+        self.failures = 0
+        self.last_sensors = 0
+        self.last_duration_ms = None
+        self.last_written_at = None
+
+    def write(self):
+        start = time.perf_counter()
+        try:
+            with self._write_lock:
+                count = write_snapshot(self.store, self.path, self.coalescer)
+        except OSError as e:
+            self.failures += 1
+            print(f" [!] Failed to write state snapshot {self.path}: {e}")
+            return False
+        self.writes += 1
+        self.last_sensors = count
+        self.last_duration_ms = round((time.perf_counter() - start) * 1000.0, 3)
+        self.last_written_at = time.time()
+        return True
+
+    def restore(self):
+        """Load the last snapshot, if any; a bad snapshot is skipped, not fatal."""
+        if not os.path.exists(self.path):
+            return None
+        start = time.perf_counter()
+        try:
+            header = load_snapshot(self.store, self.path, self.coalescer)
+        except (OSError, ValueError, struct.error, SnapshotError) as e:
+            print(f" [!] Ignoring state snapshot {self.path}: {e}")
+            self.store.clear()
+            if self.coalescer is not None:
+                self.coalescer.clear()
+            return None
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        print(f" [*] Restored {header['sensors']} sensors and {header['incidents']} open incidents "
+              f"from {self.path} ({time.time() - header['written_at']:.0f}s old) in {elapsed_ms:.1f} ms")
+        return header
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        """Stop the periodic loop and write a final snapshot."""
+        self._stop.set()
+        self.write()
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'interval_seconds': self.interval,
+            'writes': self.writes,
+            'failures': self.failures,
+            'last_sensors': self.last_sensors,
+            'last_duration_ms': self.last_duration_ms,
+            'last_written_at': self.last_written_at,
+        }
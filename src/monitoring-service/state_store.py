@@ -0,0 +1,109 @@
+import threading
+
+from sliding_window import SlidingWindow
+
+
+class SensorState:
+    """Everything the detectors track for one sensor.
+
+    __slots__ keeps each entry to a fixed set of attributes with no
+    per-instance dict, which matters once the fleet reaches six figures.
+    """
+
+    __slots__ = ('sensor_id', 'last_seen', 'last_temp', 'state', 'high_temp_start', 'silent', 'window',
+                 'reported_temp')
+
+    def __init__(self, sensor_id, window_seconds):
+        self.sensor_id = sensor_id
+        self.last_seen = None        # epoch seconds of the newest reading
+        self.last_temp = None
+        self.state = 'UNKNOWN'       # OK / WARN / ALARM band of last_temp
+        self.high_temp_start = None  # start of the current above-threshold run
+        self.silent = False          # a Sensor Silent incident is open
+        self.window = SlidingWindow(window_seconds)
+        self.reported_temp = None    # temp_f of the last published transition
+
+    def to_dict(self):
+        return {
+            'sensor_id': self.sensor_id,
+            'last_seen': self.last_seen,
+            'temp_f': self.last_temp,
+            'state': self.state,
+            'high_temp_start': self.high_temp_start,
+            'silent': self.silent,
+        }
+
+
+class SensorStateStore:
+    """Per-sensor state table shared by the consumer, silence monitor and API.
+
+    Readers and the partitioned consumer workers look sensors up without
+    locking (a single dict probe). Structural changes (insert, evict) take
+    the store lock. Detection state is only mutated by the consumer
+    partition that owns the sensor, so entries need no lock of their own.
+    The exceptions are last_seen and silent, which the silence monitor
+    also acts on from its own thread: both only change through seen() and
+    mark_silent(), under a second store lock, so a silence is never
+    declared on a sensor whose reading is being handled at that moment.
+    """
+
+    def __init__(self, window_seconds):
+        self.window_seconds = window_seconds
+        self._states = {}
+        self._lock = threading.Lock()
+        self._silence_lock = threading.Lock()   # last_seen / silent transitions
+
+    def get(self, sensor_id):
+        return self._states.get(sensor_id)
+
+    def touch(self, sensor_id):
+        """Return the state for sensor_id, creating it on first sight."""
+        state = self._states.get(sensor_id)
+        if state is None:
+            with self._lock:
+                state = self._states.get(sensor_id)
+                if state is None:
+                    state = self._states[sensor_id] = SensorState(sensor_id, self.window_seconds)
+        return state
+
+    def seen(self, state, timestamp):
+        """Record a reading's timestamp; returns True if the sensor was silent."""
+        with self._silence_lock:
+            state.last_seen = timestamp
+            was_silent, state.silent = state.silent, False
+        return was_silent
+
+    def mark_silent(self, state, cutoff):
+        """Flag the sensor silent if its last reading is older than cutoff; returns whether it was."""
+        with self._silence_lock:
+            if state.silent or state.last_seen is None or state.last_seen >= cutoff:
+                return False
+            state.silent = True
+        return True
+
+    def remove(self, sensor_id):
+        with self._lock:
+            return self._states.pop(sensor_id, None)
+
+    def evict_retired(self, cutoff):
+        """Drop sensors whose last reading is older than cutoff; returns their ids."""
+        with self._lock:
+            retired = [sid for sid, state in self._states.items()
+                       if state.last_seen is not None and state.last_seen < cutoff]
+            for sensor_id in retired:
+                del self._states[sensor_id]
+        return retired
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._states.values())
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+    def __len__(self):
+        return len(self._states)
+
+    def __contains__(self, sensor_id):
+        return sensor_id in self._states
@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from classifier import BandTable
+
+# Detection limits that can be set fleet-wide and overridden per sensor
+Limits = namedtuple('Limits', (
+    'high_temp_threshold',
+    'high_temp_duration_seconds',
+    'silence_threshold_seconds',
+    'erratic_change_threshold',
+    'erratic_window_seconds',
+))
+
+
+class VersionConflict(ValueError):
+    def __init__(self, current_version):
+        super().__init__(f"Threshold config is at version {current_version}")
+        self.current_version = current_version
+
+
+def _limits(spec, base, where):
+    if not isinstance(spec, dict):
+        raise ValueError(f"{where} must be an object")
+    unknown = set(spec) - set(Limits._fields)
+    if unknown:
+        raise ValueError(f"Unknown threshold(s) {sorted(unknown)} in {where}. Must be one of {list(Limits._fields)}")
+    values = {}
+    for field, value in spec.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"{where}.{field} must be a positive number")
+        values[field] = float(value)
+    return base._replace(**values)
+
+
+class Thresholds:
+    """One immutable, versioned set of detection thresholds.
+
+    Per-sensor overrides are merged over the fleet defaults once, at compile
+    time, so for_sensor() is a single dict lookup on the hot path.
+    """
+
+    __slots__ = ('version', 'source', 'loaded_at', 'config', 'defaults', 'bands', '_overrides')
+
+    def __init__(self, config, defaults, version=0, source='defaults'):
+        if not isinstance(config, dict):
+            raise ValueError("Threshold config must be a JSON object")
+        unknown = set(config) - set(Limits._fields) - {'version', 'bands', 'sensors'}
+        if unknown:
+            raise ValueError(f"Unknown config key(s) {sorted(unknown)}")
+        fleet = {k: v for k, v in config.items() if k in Limits._fields}
+        self.defaults = _limits(fleet, defaults, 'config')
+        overrides = config.get('sensors', {})
+        if not isinstance(overrides, dict):
+            raise ValueError("sensors must be an object of sensor_id -> thresholds")
+        self._overrides = {
+            sensor_id: _limits(spec, self.defaults, f'sensors.{sensor_id}')
+            for sensor_id, spec in overrides.items()
+        }
+        if not isinstance(config.get('bands', {}), dict):
+            raise ValueError("bands must be an object")
+        self.bands = BandTable.from_config(config.get('bands'))
+        self.config = config
+        self.version = version
+        self.source = source
+        self.loaded_at = datetime.utcnow().isoformat() + 'Z'
+
+    def for_sensor(self, sensor_id):
+        return self._overrides.get(sensor_id, self.defaults)
+
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'config_version': self.config.get('version'),
+            'source': self.source,
+            'loaded_at': self.loaded_at,
+            'defaults': self.defaults._asdict(),
+            'overrides': len(self._overrides),
+            'config': self.config,
+        }
+
+
+class ThresholdConfig:
+    """Holds the live Thresholds and swaps in new versions atomically.
+
+    Readers take `config.current` once per reading and use that object
+    throughout, so a reload never mixes old and new values mid-reading.
+    Replacing the reference is the whole swap; no per-sensor state is
+    touched. Sources are a JSON file, watched by mtime, and update() for
+    the API. An invalid config is rejected and the running version stays
+    in place. Listeners run after each swap with the new Thresholds.
+    """
+
+    def __init__(self, defaults):
+        self._defaults = defaults
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._file_signature = None
+        self.current = Thresholds({}, defaults)
+        self.reloads = 0
+        self.rejected = 0
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def update(self, config, source='api', expected_version=None):
+        """Compile and install config; raises ValueError if it is invalid."""
+        with self._lock:
+            if expected_version is not None and expected_version != self.current.version:
+                raise VersionConflict(self.current.version)
+            try:
+                thresholds = Thresholds(config, self._defaults, self.current.version + 1, source)
+            except (TypeError, ValueError):
+                self.rejected += 1
+                raise
+            self.current = thresholds
+            self.reloads += 1
+        for callback in self._listeners:
+            callback(thresholds)
+        return thresholds
+
+    def load_file(self, path):
+        with open(path) as f:
+            config = json.load(f)
+        return self.update(config, source=path)
+
+    def check_file(self, path):
+        """Reload path if it changed since the last check; returns True on reload."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._file_signature:
+            return False
+        self._file_signature = signature
+        try:
+            thresholds = self.load_file(path)
+        except (OSError, ValueError) as e:
+            print(f" [!] Rejected threshold config {path}: {e}. Keeping version {self.current.version}.")
+            return False
+        print(f" [*] Loaded threshold config {path} as version {thresholds.version}")
+        return True
+
+    def watch_file(self, path, interval=5.0):
+        while True:
+            self.check_file(path)
+            time.sleep(interval)
+
+    def stats(self):
+        return {
+            'version': self.current.version,
+            'source': self.current.source,
+            'reloads': self.reloads,
+            'rejected': self.rejected,
+        }
+
@@ -0,0 +1,69 @@
+import threading
+from collections import deque
+
+
+class TransitionLog:
+    """Bounded, versioned log of sensor state transitions.
+
+    Every event gets the next version number; subscribers hold the last
+    version they saw and ask for anything newer. Only the newest `maxlen`
+    events are kept. A cursor older than that is reported as truncated so
+    the subscriber can resync from /status instead of silently missing
+    transitions. close() wakes every waiter for good, so streams can end
+    when the process shuts down.
+    """
+
+    def __init__(self, maxlen=10000):
+        self._events = deque(maxlen=maxlen)
+        self._version = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def append(self, event):
+        with self._cond:
+            self._version += 1
+            event['version'] = self._version
+            self._events.append(event)
+            self._cond.notify_all()
+        return event['version']
+
+    def _since(self, cursor):
+        if cursor >= self._version:
+            return [], False
+        oldest = self._events[0]['version'] if self._events else self._version + 1
+        truncated = cursor < oldest - 1
+        # Versions are contiguous, so the first wanted event sits at a known offset
+        start = max(0, cursor + 1 - oldest)
+        return [self._events[i] for i in range(start, len(self._events))], truncated
+
+    def since(self, cursor):
+        """Return (events newer than cursor, truncated)."""
+        with self._cond:
+            return self._since(cursor)
+
+    def wait(self, cursor, timeout):
+        """Like since(), but block up to timeout seconds for something new."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._version > cursor or self._closed, timeout=timeout)
+            return self._since(cursor)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def clear(self):
+        with self._cond:
+            self._events.clear()
+            self._version = 0
+
+    def __len__(self):
+        return len(self._events)
@@ -1,11 +1,18 @@
+import atexit
 import os
+import signal
+import sys
 import time
-import json
 import random
+import threading
 from datetime import datetime
 
 import pika
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
+
+from publisher import BatchingPublisher, PublishBufferFull, RabbitPublisher
+from readings import BatchFormatError, parse_batch, validate_batch
+from simulator import FleetSimulator, parse_profile_mix
 
 app = Flask(__name__)
 
@@ -13,31 +20,74 @@ MESSAGE_QUEUE_HOST = os.getenv('MESSAGE_QUEUE_HOST', 'localhost')
 MESSAGE_QUEUE_PORT = int(os.getenv('MESSAGE_QUEUE_PORT', 5672))
 QUEUE_NAME = 'sensor_data'
 
+# PUBLISH_MODE selects how readings reach the broker:
+# - direct (default): one basic_publish per message on a shared connection
+# - batched: buffered, flushed every PUBLISH_BATCH_SIZE messages or
+#   PUBLISH_LINGER_MS, with asynchronous publisher confirms
+PUBLISH_MODE = os.getenv('PUBLISH_MODE', 'direct').lower()
+PUBLISH_BATCH_SIZE = int(os.getenv('PUBLISH_BATCH_SIZE', 100))
+PUBLISH_LINGER_MS = float(os.getenv('PUBLISH_LINGER_MS', 50))
+# How long a stopping worker waits for buffered readings to be confirmed
+PUBLISH_CLOSE_TIMEOUT_SECONDS = float(os.getenv('PUBLISH_CLOSE_TIMEOUT_SECONDS', 5))
+
+# Upper bound on readings accepted by a single POST /readings/batch
+READINGS_BATCH_MAX = int(os.getenv('READINGS_BATCH_MAX', 5000))
+# Per-item errors echoed back in the batch response
+READINGS_BATCH_MAX_ERRORS = 100
+
+# Fleet simulator for load testing. SIM_SENSORS > 0 replaces the 1-3 s
+# single-reading generator with SIM_SENSORS virtual sensors publishing
+# SIM_RATE readings/sec in total. SIM_FAULT_MIX assigns fault profiles to a
+# fraction of the fleet, e.g. "hot:0.01,erratic:0.02,drift:0.01,silent:0.005";
+# the rest use SENSOR_FAULT_MODE.
+SIM_SENSORS = int(os.getenv('SIM_SENSORS', 0))
+SIM_RATE = float(os.getenv('SIM_RATE', 1000))
+SIM_BATCH_SIZE = int(os.getenv('SIM_BATCH_SIZE', 500))
+SIM_FAULT_MIX = os.getenv('SIM_FAULT_MIX', '')
+if SIM_SENSORS > 0 and not (SIM_RATE > 0 and SIM_BATCH_SIZE > 0):
+    # Fail at startup rather than in the simulator thread, where it goes unseen
+    raise ValueError(f"SIM_RATE ({SIM_RATE}) and SIM_BATCH_SIZE ({SIM_BATCH_SIZE}) must be positive")
+SIM_PROFILE_MIX = parse_profile_mix(SIM_FAULT_MIX)
+
+simulator = None
+
+# One long-lived connection per process, shared by request threads and the
+# background generator (see publisher.py)
+if PUBLISH_MODE == 'batched':
+    publisher = BatchingPublisher(
+        MESSAGE_QUEUE_HOST,
+        MESSAGE_QUEUE_PORT,
+        QUEUE_NAME,
+        batch_size=PUBLISH_BATCH_SIZE,
+        linger_ms=PUBLISH_LINGER_MS,
+    )
+else:
+    publisher = RabbitPublisher(MESSAGE_QUEUE_HOST, MESSAGE_QUEUE_PORT, QUEUE_NAME)
+
 def publish_message(message):
     try:
-        connection = pika.BlockingConnection(
-            pika.ConnectionParameters(
-                host=MESSAGE_QUEUE_HOST,
-                port=MESSAGE_QUEUE_PORT,
-            )
-        )
-        channel = connection.channel()
-        channel.queue_declare(queue=QUEUE_NAME, durable=True)
-        channel.basic_publish(
-            exchange='',
-            routing_key=QUEUE_NAME,
-            body=json.dumps(message),
-            properties=pika.BasicProperties(
-                delivery_mode=2,  # make message persistent
-            )
-        )
+        publisher.publish(message)
         print(f" [x] Sent '{message}'")
-        connection.close()
     except pika.exceptions.AMQPConnectionError as e:
         print(f" [!] Failed to connect to RabbitMQ: {e}. Retrying...")
         time.sleep(5)  # Wait before retrying
         # In a real application, you'd want a more robust retry mechanism or
         # circuit breaker
+    except pika.exceptions.AMQPError as e:
+        print(f" [!] Failed to publish to RabbitMQ: {e}")
+    except PublishBufferFull as e:
+        print(f" [!] Dropping reading, {e}")
+
+def publish_batch(messages):
+    try:
+        publisher.publish_many(messages)
+    except pika.exceptions.AMQPConnectionError as e:
+        print(f" [!] Failed to connect to RabbitMQ: {e}. Retrying...")
+        time.sleep(5)
+    except pika.exceptions.AMQPError as e:
+        print(f" [!] Failed to publish batch to RabbitMQ: {e}")
+    except PublishBufferFull as e:
+        print(f" [!] Dropping {len(messages)} readings, {e}")
 
 
 
@@ -63,6 +113,42 @@ def generate_data():
 
 
 
+@app.route('/readings/batch', methods=['POST'])
+def ingest_readings_batch():
+    # Accepts a JSON array or NDJSON (Content-Type: application/x-ndjson) of
+    # {sensor_id, temperature, timestamp} and publishes the valid readings in
+    # one pass over the shared broker channel.
+    try:
+        items = parse_batch(request.get_data(), request.content_type)
+    except BatchFormatError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if len(items) > READINGS_BATCH_MAX:
+        return jsonify({"error": f"Batch too large: {len(items)} readings (max {READINGS_BATCH_MAX})"}), 413
+
+    accepted, errors = validate_batch(items)
+    if accepted:
+        try:
+            publisher.publish_many(accepted)
+        except (pika.exceptions.AMQPError, PublishBufferFull) as e:
+            print(f" [!] Failed to publish batch of {len(accepted)} readings: {e}")
+            return jsonify({
+                "status": "error",
+                "message": f"Failed to publish readings: {e}",
+                "accepted": 0,
+                "rejected": len(items),
+            }), 503
+        print(f" [x] Sent batch of {len(accepted)} readings")
+
+    return jsonify({
+        "status": "success",
+        "accepted": len(accepted),
+        "rejected": len(errors),
+        "errors": errors[:READINGS_BATCH_MAX_ERRORS],
+    }), 200
+
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     # Basic health check: try to connect to RabbitMQ
@@ -88,6 +174,14 @@ def health_check():
 
 
 
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    stats = {'publisher': publisher.stats()}
+    if simulator is not None:
+        stats['simulator'] = simulator.stats()
+    return jsonify(stats), 200
+
+
 @app.route('/reading', methods=['GET'])
 def get_reading():
     # Support a fault mode for testing via env var SENSOR_FAULT_MODE: normal
@@ -109,17 +203,44 @@ def get_reading():
 
     return jsonify(data), 200
 
-if __name__ == '__main__':
-    # Simulate continuous data generation in a separate thread/process for local
+def continuous_generation():
+    while True:
+        with app.app_context():
+            generate_data()
+        time.sleep(random.uniform(1, 3)) # Generate data every 1-3 seconds
+
+def start_background():
+    # Simulate continuous data generation in a separate thread for local
     # testing. In a production microservice, this would likely be a scheduled
-    # task or triggered externally.
-    import threading
-    def continuous_generation():
-        while True:
-            with app.app_context():
-                generate_data()
-            time.sleep(random.uniform(1, 3)) # Generate data every 1-3 seconds
+    # task or triggered externally. serving.py runs this in one worker only.
+    global simulator
+    if SIM_SENSORS > 0:
+        simulator = FleetSimulator(
+            SIM_SENSORS,
+            SIM_RATE,
+            batch_size=SIM_BATCH_SIZE,
+            profile_mix=SIM_PROFILE_MIX,
+            default_profile=os.getenv('SENSOR_FAULT_MODE', 'normal').lower(),
+        )
+        print(f" [*] Simulating {SIM_SENSORS} sensors at {SIM_RATE} readings/sec: {simulator.profile_counts()}")
+        threading.Thread(target=simulator.run, args=(publish_batch,), daemon=True).start()
+    else:
+        threading.Thread(target=continuous_generation, daemon=True).start()
+
+def stop_background():
+    # Stop producing before the worker's publisher is closed
+    if simulator is not None:
+        simulator.stop()
 
-    threading.Thread(target=continuous_generation, daemon=True).start()
+def stop_worker():
+    # Every worker publishes (POST /readings, the simulator in one of them);
+    # send what is still buffered before the process exits
+    publisher.close(PUBLISH_CLOSE_TIMEOUT_SECONDS)
 
+if __name__ == '__main__':
+    start_background()
+    # SIGTERM (docker stop) exits via atexit
+    atexit.register(stop_worker)
+    atexit.register(stop_background)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     app.run(host='0.0.0.0', port=os.getenv('PORT', 5000))
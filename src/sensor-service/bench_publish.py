@@ -0,0 +1,78 @@
+"""Publish throughput benchmark: connection-per-message vs. the shared publishers.
+
+Needs a reachable RabbitMQ broker, e.g. `docker-compose up message-queue`:
+
+    python bench_publish.py --messages 2000
+
+Messages go to a scratch queue that is deleted afterwards so the monitoring
+consumer never sees them.
+"""
+import argparse
+import json
+import os
+import time
+
+import pika
+
+from publisher import BatchingPublisher, RabbitPublisher
+
+
+def publish_per_call(host, port, queue_name, message):
+    # Mirrors the original publish_message: one TCP + AMQP handshake per message
+    connection = pika.BlockingConnection(pika.ConnectionParameters(host=host, port=port))
+    channel = connection.channel()
+    channel.queue_declare(queue=queue_name, durable=True)
+    channel.basic_publish(
+        exchange='',
+        routing_key=queue_name,
+        body=json.dumps(message),
+        properties=pika.BasicProperties(delivery_mode=2),
+    )
+    connection.close()
+
+
+def run(label, publish, count):
+    message = {'sensor_id': 'bench-1', 'temperature': 72.0, 'timestamp': int(time.time()), 'status': 'normal'}
+    start = time.perf_counter()
+    for _ in range(count):
+        publish(message)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {count:>7} msgs  {elapsed:8.3f}s  {count / elapsed:10.1f} msgs/sec")
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=os.getenv('MESSAGE_QUEUE_HOST', 'localhost'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('MESSAGE_QUEUE_PORT', 5672)))
+    parser.add_argument('--queue', default='sensor_data_bench')
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    per_call = run('per-call', lambda m: publish_per_call(args.host, args.port, args.queue, m), args.messages)
+
+    publisher = RabbitPublisher(args.host, args.port, args.queue)
+    persistent = run('persistent', publisher.publish, args.messages)
+    publisher.close()
+
+    # Batched throughput only counts once every message has been confirmed
+    batching = BatchingPublisher(args.host, args.port, args.queue, batch_size=args.batch_size)
+    start = time.perf_counter()
+    run('batched', batching.publish, args.messages)
+    batching.close(timeout=30)
+    elapsed = time.perf_counter() - start
+    batched = args.messages / elapsed
+    stats = batching.stats()
+    print(f"{'confirmed':<12} {stats['confirmed']:>7} msgs  {elapsed:8.3f}s  {batched:10.1f} msgs/sec")
+    print(f"batch latency ms: {stats['batch_latency_ms']}  unconfirmed: {stats['unconfirmed']}  nacked: {stats['nacked']}")
+
+    print(f"speedup: persistent {persistent / per_call:.1f}x, batched {batched / per_call:.1f}x")
+
+    connection = pika.BlockingConnection(pika.ConnectionParameters(host=args.host, port=args.port))
+    connection.channel().queue_delete(queue=args.queue)
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
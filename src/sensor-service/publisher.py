@@ -0,0 +1,391 @@
+import collections
+import json
+import threading
+import time
+
+import pika
+
+
+class RabbitPublisher:
+    """Long-lived RabbitMQ publisher shared by every caller in the process.
+
+    One connection and channel are opened lazily on first use and kept open
+    across calls. pika's BlockingConnection is not thread-safe, so all broker
+    I/O is serialized behind a lock; the Flask request threads and the
+    background generator can share a single instance.
+    """
+
+    def __init__(self, host, port, queue_name):
+        self.host = host
+        self.port = port
+        self.queue_name = queue_name
+        self._lock = threading.Lock()
+        self._connection = None
+        self._channel = None
+        self._properties = pika.BasicProperties(
+            delivery_mode=2,  # make message persistent
+        )
+        self.published = 0
+        self.connects = 0
+
+    def _connect(self):
+        self._connection = pika.BlockingConnection(
+            pika.ConnectionParameters(
+                host=self.host,
+                port=self.port,
+            )
+        )
+        self._channel = self._connection.channel()
+        # Declare once per connection instead of once per message
+        self._channel.queue_declare(queue=self.queue_name, durable=True)
+        self.connects += 1
+
+    def _reset(self):
+        connection = self._connection
+        self._connection = None
+        self._channel = None
+        if connection is not None:
+            try:
+                if connection.is_open:
+                    connection.close()
+            except pika.exceptions.AMQPError:
+                pass
+
+    def _publish_bodies(self, bodies):
+        for body in bodies:
+            self._channel.basic_publish(
+                exchange='',
+                routing_key=self.queue_name,
+                body=body,
+                properties=self._properties,
+            )
+
+    def publish(self, message):
+        self.publish_many([message])
+
+    def publish_many(self, messages):
+        # Serialize outside the lock so concurrent callers only contend on I/O
+        bodies = [json.dumps(message) for message in messages]
+        with self._lock:
+            reused = self._channel is not None and self._channel.is_open
+            if not reused:
+                self._reset()
+                self._connect()
+            try:
+                self._publish_bodies(bodies)
+            except pika.exceptions.AMQPError:
+                self._reset()
+                if not reused:
+                    raise
+                # An idle connection may have been dropped by the broker
+                # (missed heartbeats); reconnect once and retry the batch.
+                self._connect()
+                self._publish_bodies(bodies)
+            self.published += len(bodies)
+
+    def close(self, timeout=None):
+        # Nothing is buffered; timeout keeps the signature of BatchingPublisher.close
+        with self._lock:
+            self._reset()
+
+    def stats(self):
+        return {
+            'queue': self.queue_name,
+            'mode': 'direct',
+            'connected': self._channel is not None and self._channel.is_open,
+            'published': self.published,
+            'connects': self.connects,
+        }
+
+
+class PublishBufferFull(Exception):
+    pass
+
+
+class _Batch:
+    __slots__ = ('bodies', 'first_tag', 'outstanding', 'started_at')
+
+    def __init__(self, bodies, first_tag, started_at):
+        self.bodies = bodies
+        self.first_tag = first_tag
+        self.outstanding = set(range(first_tag, first_tag + len(bodies)))
+        self.started_at = started_at
+
+
+class ConfirmTracker:
+    """Maps broker delivery tags back to the batches they were published in.
+
+    Tags are assigned sequentially per channel starting at 1, which is how
+    RabbitMQ numbers messages once confirm mode is enabled. ack/nack return
+    the batches that became fully confirmed and the bodies that were nacked.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._batches = collections.deque()
+        self.next_tag = 1
+        self.pending = 0
+
+    def add_batch(self, bodies, started_at):
+        batch = _Batch(bodies, self.next_tag, started_at)
+        self.next_tag += len(bodies)
+        self.pending += len(bodies)
+        self._batches.append(batch)
+        return batch
+
+    def _settle(self, tag, multiple):
+        settled = []
+        for batch in self._batches:
+            if batch.first_tag > tag:
+                break
+            if multiple:
+                tags = [t for t in batch.outstanding if t <= tag]
+            else:
+                tags = [tag] if tag in batch.outstanding else []
+            for t in tags:
+                batch.outstanding.discard(t)
+                settled.append(batch.bodies[t - batch.first_tag])
+        self.pending -= len(settled)
+        completed = []
+        while self._batches and not self._batches[0].outstanding:
+            completed.append(self._batches.popleft())
+        return completed, settled
+
+    def ack(self, tag, multiple=False):
+        completed, settled = self._settle(tag, multiple)
+        return completed, len(settled)
+
+    def nack(self, tag, multiple=False):
+        return self._settle(tag, multiple)
+
+    def drain(self):
+        # Connection lost: everything still outstanding is unconfirmed
+        bodies = [batch.bodies[t - batch.first_tag] for batch in self._batches for t in sorted(batch.outstanding)]
+        self.reset()
+        return bodies
+
+
+class BatchingPublisher:
+    """Buffers messages and publishes them in batches with publisher confirms.
+
+    Messages are flushed once `batch_size` are buffered or every `linger_ms`,
+    whichever comes first. Publishing runs on a dedicated thread that owns a
+    pika SelectConnection, so confirms are handled asynchronously and many
+    batches can be in flight at once instead of waiting on a broker round trip
+    per message. Nacked messages, and messages still unconfirmed when the
+    connection drops, are put back at the front of the buffer and re-sent.
+    """
+
+    def __init__(self, host, port, queue_name, batch_size=100, linger_ms=50,
+                 max_buffer=50000, reconnect_delay=5.0):
+        self.host = host
+        self.port = port
+        self.queue_name = queue_name
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000.0
+        self.max_buffer = max_buffer
+        self.reconnect_delay = reconnect_delay
+        self._lock = threading.Lock()
+        self._buffer = collections.deque()
+        self._tracker = ConfirmTracker()
+        self._properties = pika.BasicProperties(
+            delivery_mode=2,  # make message persistent
+        )
+        self._connection = None
+        self._channel = None
+        self._ready = False
+        self._flush_requested = False
+        self._stopping = False
+        self._thread = None
+        self._latencies = collections.deque(maxlen=100)
+        self.batches = 0
+        self.published = 0
+        self.confirmed = 0
+        self.nacked = 0
+        self.unconfirmed = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='batching-publisher', daemon=True)
+        self._thread.start()
+
+    def publish(self, message):
+        self.publish_many([message])
+
+    def publish_many(self, messages):
+        bodies = [json.dumps(message) for message in messages]
+        with self._lock:
+            if len(self._buffer) + len(bodies) > self.max_buffer:
+                raise PublishBufferFull(f"publish buffer full ({len(self._buffer)} messages waiting)")
+            self._buffer.extend(bodies)
+            flush = len(self._buffer) >= self.batch_size and not self._flush_requested
+            if flush:
+                self._flush_requested = True
+        if self._thread is None:
+            self.start()
+        if flush:
+            self._request_flush()
+
+    def _request_flush(self):
+        connection = self._connection
+        if connection is not None:
+            try:
+                connection.ioloop.add_callback_threadsafe(self._flush)
+            except Exception:
+                # The IO loop is shutting down; the next connection flushes
+                pass
+
+    # --- IO thread -------------------------------------------------------
+
+    def _run(self):
+        while not self._stopping:
+            self._connection = pika.SelectConnection(
+                pika.ConnectionParameters(host=self.host, port=self.port),
+                on_open_callback=self._on_connection_open,
+                on_open_error_callback=self._on_connection_open_error,
+                on_close_callback=self._on_connection_closed,
+            )
+            self._connection.ioloop.start()
+            if not self._stopping:
+                time.sleep(self.reconnect_delay)
+        self._connection = None
+
+    def _on_connection_open(self, connection):
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_open_error(self, connection, error):
+        print(f" [!] Batching publisher failed to connect to RabbitMQ: {error}. Retrying...")
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection, reason):
+        self._ready = False
+        self._channel = None
+        lost = self._tracker.drain()
+        if lost:
+            print(f" [!] RabbitMQ connection closed with {len(lost)} unconfirmed messages; re-queueing")
+            self.unconfirmed += len(lost)
+            self._requeue(lost)
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel):
+        self._channel = channel
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.queue_declare(queue=self.queue_name, durable=True, callback=self._on_queue_declared)
+
+    def _on_channel_closed(self, channel, reason):
+        self._ready = False
+        if self._connection is not None and self._connection.is_open:
+            self._connection.close()
+
+    def _on_queue_declared(self, frame):
+        self._channel.confirm_delivery(ack_nack_callback=self._on_confirm, callback=self._on_confirm_selected)
+
+    def _on_confirm_selected(self, frame):
+        self._tracker.reset()
+        self._ready = True
+        self._flush()
+        self._schedule_linger()
+
+    def _schedule_linger(self):
+        if self._ready and not self._stopping:
+            self._connection.ioloop.call_later(self.linger, self._on_linger)
+
+    def _on_linger(self):
+        self._flush()
+        self._schedule_linger()
+
+    def _flush(self):
+        with self._lock:
+            self._flush_requested = False
+            if not self._ready or not self._buffer:
+                return
+            pending = list(self._buffer)
+            self._buffer.clear()
+        now = time.monotonic()
+        for i in range(0, len(pending), self.batch_size):
+            bodies = pending[i:i + self.batch_size]
+            self._tracker.add_batch(bodies, now)
+            for body in bodies:
+                self._channel.basic_publish(
+                    exchange='',
+                    routing_key=self.queue_name,
+                    body=body,
+                    properties=self._properties,
+                )
+            self.batches += 1
+            self.published += len(bodies)
+
+    def _on_confirm(self, frame):
+        method = frame.method
+        if isinstance(method, pika.spec.Basic.Ack):
+            completed, acked = self._tracker.ack(method.delivery_tag, method.multiple)
+            self.confirmed += acked
+        else:
+            completed, nacked = self._tracker.nack(method.delivery_tag, method.multiple)
+            if nacked:
+                print(f" [!] Broker nacked {len(nacked)} messages; re-queueing")
+                self.nacked += len(nacked)
+                self._requeue(nacked)
+        now = time.monotonic()
+        for batch in completed:
+            self._latencies.append(now - batch.started_at)
+
+    def _requeue(self, bodies):
+        with self._lock:
+            self._buffer.extendleft(reversed(bodies))
+
+    def _shutdown(self, deadline):
+        self._flush()
+        if self._tracker.pending and time.monotonic() < deadline:
+            self._connection.ioloop.call_later(0.05, lambda: self._shutdown(deadline))
+            return
+        self._ready = False
+        if self._connection.is_open:
+            self._connection.close()
+        else:
+            # Still connecting; nothing was published on this connection
+            self._connection.ioloop.stop()
+
+    # ---------------------------------------------------------------------
+
+    def close(self, timeout=5.0):
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping = True
+        connection = self._connection
+        if connection is not None:
+            deadline = time.monotonic() + timeout
+            try:
+                connection.ioloop.add_callback_threadsafe(lambda: self._shutdown(deadline))
+            except Exception:
+                pass
+        thread.join(timeout + 1.0)
+        self._thread = None
+
+    def stats(self):
+        latencies = list(self._latencies)
+        return {
+            'queue': self.queue_name,
+            'mode': 'batched',
+            'connected': self._ready,
+            'batch_size': self.batch_size,
+            'linger_ms': self.linger * 1000.0,
+            'buffered': len(self._buffer),
+            'batches': self.batches,
+            'published': self.published,
+            'confirmed': self.confirmed,
+            'nacked': self.nacked,
+            'unconfirmed': self.unconfirmed,
+            'pending_confirms': self._tracker.pending,
+            'batch_latency_ms': {
+                'last': round(latencies[-1] * 1000.0, 3) if latencies else None,
+                'avg': round(sum(latencies) / len(latencies) * 1000.0, 3) if latencies else None,
+                'max': round(max(latencies) * 1000.0, 3) if latencies else None,
+            },
+        }
@@ -0,0 +1,78 @@
+import json
+import math
+
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+class BatchFormatError(ValueError):
+    pass
+
+
+def validate_reading(item):
+    """Return (reading, None) for a valid item or (None, reason) otherwise.
+
+    Plain type checks and dict lookups only, so validating a large batch stays
+    cheap; no schema library on the hot path.
+    """
+    if type(item) is not dict:
+        return None, 'reading must be an object'
+    sensor_id = item.get('sensor_id')
+    if type(sensor_id) is not str or not sensor_id:
+        return None, 'sensor_id must be a non-empty string'
+    temperature = item.get('temperature')
+    if type(temperature) not in (float, int) or not math.isfinite(temperature):
+        return None, 'temperature must be a finite number'
+    timestamp = item.get('timestamp')
+    if type(timestamp) is float and timestamp.is_integer():
+        timestamp = int(timestamp)
+    if type(timestamp) is not int or timestamp < 0:
+        return None, 'timestamp must be a non-negative integer (epoch seconds)'
+    return {
+        'sensor_id': sensor_id,
+        'temperature': temperature,
+        'timestamp': timestamp,
+        'status': item.get('status', 'normal'),
+    }, None
+
+
+def parse_batch(body, content_type):
+    """Split a request body into a list of (index, item, parse_error) tuples.
+
+    A JSON array is parsed in one call. NDJSON is parsed line by line so a
+    single malformed line only rejects that reading, not the whole batch.
+    """
+    mimetype = (content_type or '').split(';', 1)[0].strip().lower()
+    try:
+        text = body.decode('utf-8') if isinstance(body, bytes) else body
+    except UnicodeDecodeError:
+        raise BatchFormatError('Body is not valid UTF-8')
+
+    if mimetype in NDJSON_CONTENT_TYPES:
+        items = []
+        for index, line in enumerate(line for line in text.splitlines() if line.strip()):
+            try:
+                items.append((index, json.loads(line), None))
+            except json.JSONDecodeError:
+                items.append((index, None, 'invalid JSON'))
+        return items
+
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError:
+        raise BatchFormatError('Invalid JSON')
+    if not isinstance(payload, list):
+        raise BatchFormatError('Expected a JSON array of readings')
+    return [(index, item, None) for index, item in enumerate(payload)]
+
+
+def validate_batch(items):
+    accepted = []
+    errors = []
+    for index, item, error in items:
+        if error is None:
+            reading, error = validate_reading(item)
+            if error is None:
+                accepted.append(reading)
+                continue
+        errors.append({'index': index, 'error': error})
+    return accepted, errors
@@ -0,0 +1,165 @@
+import threading
+import time
+
+import numpy as np
+
+# Fault profiles a virtual sensor can run with. hot/cold/normal use the same
+# ranges as GET /reading with SENSOR_FAULT_MODE.
+PROFILES = ('normal', 'hot', 'cold', 'erratic', 'drift', 'silent')
+NORMAL, HOT, COLD, ERRATIC, DRIFT, SILENT = range(len(PROFILES))
+
+RANGES = {
+    NORMAL: (68.0, 75.0),
+    HOT: (83.0, 87.0),
+    COLD: (58.0, 62.0),
+    ERRATIC: (55.0, 95.0),  # swings well past ERRATIC_CHANGE_THRESHOLD
+}
+DRIFT_STEP_F = 0.05  # mean warming per reading for drifting sensors
+
+
+def parse_profile_mix(spec):
+    """Parse "hot:0.01,erratic:0.02" into {profile: fraction}."""
+    mix = {}
+    for part in (spec or '').split(','):
+        if not part.strip():
+            continue
+        name, _, fraction = part.partition(':')
+        name = name.strip().lower()
+        if name not in PROFILES:
+            raise ValueError(f"Unknown fault profile '{name}'. Must be one of {list(PROFILES)}")
+        mix[name] = float(fraction)
+        if not 0.0 <= mix[name] <= 1.0:
+            raise ValueError(f"Fault profile fraction for '{name}' must be between 0 and 1, got {fraction}")
+    if sum(mix.values()) > 1.0:
+        raise ValueError("Fault profile fractions must add up to at most 1.0")
+    return mix
+
+
+class FleetSimulator:
+    """Generates readings for a fleet of virtual sensors in vectorized batches.
+
+    Each sensor gets a fault profile up front: `default_profile` for the
+    fleet, with `profile_mix` fractions reassigned at random. Batches walk the
+    fleet round-robin and draw every temperature for the batch with a single
+    NumPy call per profile. Silent sensors report normally for
+    `silence_after` seconds and then stop, so the monitoring service sees
+    them go quiet.
+    """
+
+    def __init__(self, sensor_count, rate, batch_size=500, profile_mix=None,
+                 default_profile='normal', silence_after=60.0, id_prefix='sim-sensor', seed=None):
+        if not float(rate) > 0:
+            raise ValueError(f"Simulator rate must be positive, got {rate}")
+        if int(batch_size) <= 0:
+            raise ValueError(f"Simulator batch size must be positive, got {batch_size}")
+        if default_profile not in PROFILES:
+            default_profile = 'normal'
+        self.rate = float(rate)
+        self.batch_size = int(batch_size)
+        self.silence_after = silence_after
+        self._rng = np.random.default_rng(seed)
+        self.sensor_ids = np.array([f"{id_prefix}-{i}" for i in range(1, sensor_count + 1)], dtype=object)
+        self.profiles = np.full(sensor_count, PROFILES.index(default_profile), dtype=np.int8)
+
+        # Reassign disjoint random subsets of the fleet to each mixed profile
+        order = self._rng.permutation(sensor_count)
+        start = 0
+        for name, fraction in (profile_mix or {}).items():
+            count = int(round(fraction * sensor_count))
+            self.profiles[order[start:start + count]] = PROFILES.index(name)
+            start += count
+
+        self._all = np.arange(sensor_count)
+        self._not_silent = np.flatnonzero(self.profiles != SILENT)
+        self._drift = np.zeros(sensor_count)
+        self._cursor = 0
+        self._started_at = None
+        self._stop = threading.Event()
+        self.sent = 0
+
+    def profile_counts(self):
+        counts = np.bincount(self.profiles, minlength=len(PROFILES))
+        return {name: int(counts[code]) for code, name in enumerate(PROFILES)}
+
+    def _reporting(self, now):
+        if self._started_at is None:
+            self._started_at = now
+        if now - self._started_at < self.silence_after:
+            return self._all
+        return self._not_silent
+
+    def next_batch(self, size=None, now=None):
+        now = time.time() if now is None else now
+        size = self.batch_size if size is None else size
+        reporting = self._reporting(now)
+        if size <= 0 or len(reporting) == 0:
+            return []
+
+        positions = (self._cursor + np.arange(size)) % len(reporting)
+        self._cursor = int((self._cursor + size) % len(reporting))
+        idx = reporting[positions]
+        codes = self.profiles[idx]
+
+        low, high = RANGES[NORMAL]
+        temps = self._rng.uniform(low, high, size)
+        for code in (HOT, COLD, ERRATIC):
+            mask = codes == code
+            n = int(mask.sum())
+            if n:
+                low, high = RANGES[code]
+                temps[mask] = self._rng.uniform(low, high, n)
+
+        mask = codes == DRIFT
+        if mask.any():
+            drifting = idx[mask]
+            np.add.at(self._drift, drifting, self._rng.normal(DRIFT_STEP_F, DRIFT_STEP_F / 2, len(drifting)))
+            temps[mask] = 71.5 + self._drift[drifting] + self._rng.normal(0.0, 0.3, len(drifting))
+
+        temps = np.round(temps, 2)
+        timestamp = int(now)
+        return [
+            {'sensor_id': sensor_id, 'temperature': temp, 'timestamp': timestamp, 'status': 'simulated'}
+            for sensor_id, temp in zip(self.sensor_ids[idx].tolist(), temps.tolist())
+        ]
+
+    def run(self, publish_many):
+        """Publish batches at `rate` readings/sec until stop() is called."""
+        self._stop.clear()
+        start = time.monotonic()
+        scheduled = 0
+        while not self._stop.is_set():
+            due = int((time.monotonic() - start) * self.rate) - scheduled
+            if due <= 0:
+                # Sleep until the next full batch is due
+                self._stop.wait(min(self.batch_size / self.rate, 1.0))
+                continue
+            size = min(due, self.batch_size)
+            batch = self.next_batch(size)
+            if batch:
+                publish_many(batch)
+                self.sent += len(batch)
+            scheduled += size
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            'sensors': len(self.sensor_ids),
+            'target_rate': self.rate,
+            'batch_size': self.batch_size,
+            'sent': self.sent,
+            'profiles': self.profile_counts(),
+        }
+
+
+if __name__ == '__main__':
+    # Generation-only throughput check: python simulator.py [sensors] [batches]
+    import sys
+    sensors = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    batches = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    sim = FleetSimulator(sensors, rate=sensors, profile_mix={'hot': 0.01, 'erratic': 0.01, 'drift': 0.01, 'silent': 0.01})
+    start = time.perf_counter()
+    total = sum(len(sim.next_batch()) for _ in range(batches))
+    elapsed = time.perf_counter() - start
+    print(f"{total} readings from {sensors} sensors in {elapsed:.3f}s ({total / elapsed:,.0f} readings/sec)")
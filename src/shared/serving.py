@@ -0,0 +1,173 @@
+"""Production HTTP server shared by every service.
+
+Each service image copies this file next to its app.py and runs
+`python serving.py`, which serves app:app with gunicorn's threaded
+workers instead of Flask's single-process dev server.
+
+Configuration (environment):
+    PORT                            listen port (8000)
+    SERVER_WORKERS                  worker processes (2). Services that keep
+                                    their state in process memory (monitoring,
+                                    alerting, automation) set this to 1 in their
+                                    Dockerfile
+    SERVER_THREADS                  request threads per worker (8)
+    SERVER_KEEPALIVE_SECONDS        idle keep-alive per connection (5)
+    SERVER_TIMEOUT_SECONDS          a silent worker is restarted after this (60)
+    SERVER_GRACEFUL_TIMEOUT_SECONDS in-flight requests get this long to finish
+                                    on SIGTERM before workers are killed (30)
+    SERVER_MAX_REQUESTS             recycle a worker after this many requests (0: never)
+    SERVER_LOCK_DIR                 where the background-task lock file lives
+
+The app module may define four hooks:
+    start_background()  starts the service's background threads (consumer,
+                        pollers, simulators, maintenance). It runs in exactly
+                        one worker of the process group at a time.
+    stop_background()   called when that worker exits, e.g. for a final flush.
+    begin_shutdown()    called in every worker as soon as it is told to stop,
+                        while in-flight requests drain. Long-lived responses
+                        (event streams, long-polls) should end here, or they
+                        hold the worker, and stop_background(), for up to
+                        SERVER_GRACEFUL_TIMEOUT_SECONDS.
+    stop_worker()       called in every worker as it exits, after
+                        stop_background() in the worker that ran it. Flush
+                        per-process state here, such as publish buffers.
+
+The container's stop grace period must be longer than
+SERVER_GRACEFUL_TIMEOUT_SECONDS, or the worker is killed before
+stop_background() runs.
+"""
+import fcntl
+import importlib
+import os
+import tempfile
+import threading
+import time
+
+from gunicorn.app.base import BaseApplication
+
+
+def server_options(environ=None):
+    environ = os.environ if environ is None else environ
+
+    def get(name, default):
+        return int(environ.get(name, default))
+
+    max_requests = get('SERVER_MAX_REQUESTS', 0)
+    return {
+        'bind': f"0.0.0.0:{get('PORT', 8000)}",
+        'workers': max(1, get('SERVER_WORKERS', 2)),
+        'worker_class': 'gthread',
+        'threads': max(1, get('SERVER_THREADS', 8)),
+        'keepalive': get('SERVER_KEEPALIVE_SECONDS', 5),
+        'timeout': get('SERVER_TIMEOUT_SECONDS', 60),
+        'graceful_timeout': get('SERVER_GRACEFUL_TIMEOUT_SECONDS', 30),
+        'max_requests': max_requests,
+        'max_requests_jitter': max_requests // 10,
+        'accesslog': None,
+        'errorlog': '-',
+    }
+
+
+class BackgroundLeader:
+    """Elects the one worker that runs the background threads.
+
+    Every worker starts a thread that blocks on an exclusive flock() of a
+    shared lock file; the first to get it starts the background tasks and
+    keeps the lock until it exits. The kernel drops the lock when that
+    process dies, whether it is recycled, killed by the timeout or crashes,
+    and one of the waiting workers takes over. A takeover waits
+    `takeover_delay` seconds first, so when the whole server is stopping
+    the waiting workers see their own shutdown and never start the tasks.
+    """
+
+    def __init__(self, path, takeover_delay=2.0):
+        self.path = path
+        self.takeover_delay = takeover_delay
+        self.running = False        # this process started the background tasks
+        self._fd = None
+
+    def acquire(self, blocking=True):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self.running = False
+
+    def run(self, start, alive=lambda: True):
+        if not self.acquire(blocking=False):
+            self.acquire()
+            deadline = time.monotonic() + self.takeover_delay
+            while time.monotonic() < deadline and alive():
+                time.sleep(0.1)
+        if not alive():
+            self.release()
+            return
+        print(f" [*] Worker {os.getpid()} is running the background tasks")
+        self.running = True
+        start()
+
+
+def watch_shutdown(worker, shutdown, interval=0.2):
+    # gunicorn's SIGTERM handler only clears worker.alive; act on it from a
+    # thread rather than from inside the signal handler
+    while worker.alive:
+        time.sleep(interval)
+    shutdown()
+
+
+class ServiceApplication(BaseApplication):
+    def __init__(self, app_uri='app:app', options=None):
+        self.app_uri = app_uri
+        self.options = options or {}
+        self.module_name = app_uri.split(':', 1)[0]
+        self.leader = None
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+        self.cfg.set('post_worker_init', self.post_worker_init)
+        self.cfg.set('worker_exit', self.worker_exit)
+
+    def load(self):
+        module_name, _, attr = self.app_uri.partition(':')
+        return getattr(importlib.import_module(module_name), attr or 'app')
+
+    def post_worker_init(self, worker):
+        # Runs in each worker once the app is imported
+        module = importlib.import_module(self.module_name)
+        shutdown = getattr(module, 'begin_shutdown', None)
+        if shutdown is not None:
+            threading.Thread(target=watch_shutdown, args=(worker, shutdown), name='shutdown-watch', daemon=True).start()
+        start = getattr(module, 'start_background', None)
+        if start is None:
+            return
+        # One lock per service directory, so services sharing a host don't contend
+        lock_dir = os.getenv('SERVER_LOCK_DIR', tempfile.gettempdir())
+        name = f"{os.path.basename(os.getcwd())}-{self.module_name}-background.lock"
+        self.leader = BackgroundLeader(os.path.join(lock_dir, name))
+        threading.Thread(target=self.leader.run, args=(start, lambda: worker.alive), name='background-leader', daemon=True).start()
+
+    def worker_exit(self, server, worker):
+        module = importlib.import_module(self.module_name)
+        if self.leader is not None and self.leader.running:
+            stop = getattr(module, 'stop_background', None)
+            if stop is not None:
+                stop()
+            self.leader.release()
+        stop_worker = getattr(module, 'stop_worker', None)
+        if stop_worker is not None:
+            stop_worker()
+
+
+if __name__ == '__main__':
+    ServiceApplication(os.getenv('SERVER_APP', 'app:app'), server_options()).run()
@@ -42,12 +42,13 @@ def test_e2e_high_temperature_incident_flow():
     # 1. Clear existing incidents for a clean test run
     # (This would ideally be an admin endpoint or direct DB access in a test setup)
     # For now, we'll just fetch and print to see the state.
-    initial_incidents = requests.get(f"{LOGGING_SERVICE_URL}/incidents").json()
+    sensor_id = "e2e-sensor-high-temp"
+    test_start = int(time.time())
+    initial_incidents = requests.get(f"{LOGGING_SERVICE_URL}/incidents", params={'component': sensor_id}).json()
     print(f"Initial incidents: {len(initial_incidents)}")
 
     # 2. Simulate high temperature data from sensor-service
     print("Simulating high temperature data...")
-    sensor_id = "e2e-sensor-high-temp"
     high_temp_value = 85.0
     for _ in range(10): # Send multiple readings to ensure monitoring picks it up consistently
         requests.post(f"{SENSOR_SERVICE_URL}/generate_data", json={
@@ -67,7 +68,8 @@ def test_e2e_high_temperature_incident_flow():
     timeout = 60 # seconds
 
     while time.time() - start_time < timeout:
-        incidents = requests.get(f"{LOGGING_SERVICE_URL}/incidents").json()
+        incidents = requests.get(f"{LOGGING_SERVICE_URL}/incidents", params={
+            'component': sensor_id, 'type': 'High Temperature', 'since': test_start}).json()
         for incident in incidents:
             if incident['type'] == 'High Temperature' and incident['component'] == sensor_id:
                 incident_found = True
@@ -97,6 +99,7 @@ def test_e2e_sensor_silence_incident_flow():
     print("\n--- Starting E2E Sensor Silence Incident Flow Test ---")
 
     sensor_id = "e2e-sensor-silent"
+    test_start = int(time.time())
     # 1. Send initial data to register the sensor
     print(f"Sending initial data for {sensor_id}...")
     requests.post(f"{SENSOR_SERVICE_URL}/generate_data", json={
@@ -118,7 +121,8 @@ def test_e2e_sensor_silence_incident_flow():
     timeout = 180 # seconds (longer for silence detection)
 
     while time.time() - start_time < timeout:
-        incidents = requests.get(f"{LOGGING_SERVICE_URL}/incidents").json()
+        incidents = requests.get(f"{LOGGING_SERVICE_URL}/incidents", params={
+            'component': sensor_id, 'type': 'Sensor Silent', 'since': test_start}).json()
         for incident in incidents:
             if incident['type'] == 'Sensor Silent' and incident['component'] == sensor_id:
                 incident_found = True
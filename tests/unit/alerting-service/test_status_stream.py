@@ -0,0 +1,112 @@
+import importlib.util
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip('flask')
+
+spec = importlib.util.spec_from_file_location(
+    "alerting_stream_app",
+    str(Path(__file__).resolve().parents[3] / 'src' / 'alerting-service' / 'app.py')
+)
+alerting_app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(alerting_app)
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    alerting_app.LAST_ALERT = None
+    alerting_app.LAST_ALERT_TS = 0.0
+    alerting_app.ACTIVE_ALARMS.clear()
+    alerting_app.STREAM_CURSOR = None
+    yield
+
+
+def test_iter_sse_parses_frames_and_keepalives():
+    lines = ['id: 3', 'event: transition', 'data: {"a": 1}', '', ': keepalive', '', 'data: x', '']
+    assert list(alerting_app.iter_sse(lines)) == [
+        ('transition', '{"a": 1}', '3'), ('keepalive', None, None), ('message', 'x', None)]
+
+
+def test_transition_into_alarm_alerts_once():
+    event = {'sensor_id': 's1', 'state': 'ALARM', 'temp_f': 90.0, 'silent': False}
+    alerting_app.handle_stream_event('transition', event, 'http://m/status')
+    alerting_app.handle_stream_event('transition', dict(event, temp_f=90.5), 'http://m/status')
+    assert alerting_app.LAST_ALERT['temp_f'] == 90.0
+    assert 's1' in alerting_app.ACTIVE_ALARMS
+
+    alerting_app.handle_stream_event('transition', dict(event, state='OK', temp_f=70.0), 'http://m/status')
+    assert 's1' not in alerting_app.ACTIVE_ALARMS
+
+
+def test_keepalive_re_alerts_active_alarm_after_60s():
+    event = {'sensor_id': 's1', 'state': 'ALARM', 'temp_f': 90.0, 'silent': False}
+    alerting_app.handle_stream_event('transition', event, 'http://m/status')
+    first = alerting_app.LAST_ALERT
+    alerting_app.handle_stream_event('keepalive', {}, 'http://m/status')
+    assert alerting_app.LAST_ALERT is first
+    alerting_app.LAST_ALERT_TS -= 61
+    alerting_app.handle_stream_event('keepalive', {}, 'http://m/status')
+    assert alerting_app.LAST_ALERT is not first
+
+
+def test_reset_resyncs_from_status():
+    alerting_app.ACTIVE_ALARMS['stale'] = {}
+    with patch.object(alerting_app, 'poll_once') as poll_once:
+        alerting_app.handle_stream_event('hello', {'version': 5}, 'http://m/status')
+        poll_once.assert_not_called()
+        alerting_app.handle_stream_event('reset', {'version': 0}, 'http://m/status')
+        poll_once.assert_called_once_with('http://m/status')
+    assert alerting_app.ACTIVE_ALARMS == {}
+
+
+class _StreamResponse:
+    status_code = 200
+    headers = {'Content-Type': 'text/event-stream; charset=utf-8'}
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_stream_tracks_cursor_and_sends_it_on_reconnect():
+    lines = ['id: e1:7', 'event: hello', 'data: {"version": 7, "epoch": "e1"}', '',
+             'id: e1:8', 'event: transition', 'data: {"sensor_id": "s1", "state": "ALARM", "temp_f": 91.0}', '']
+    with patch.object(alerting_app.requests, 'get', return_value=_StreamResponse(lines)) as get, \
+            patch.object(alerting_app, 'poll_once') as poll_once:
+        alerting_app.stream_monitoring('http://m/status/stream', 'http://m/status', 45)
+        poll_once.assert_called_once()  # first connect syncs from /status
+        assert alerting_app.STREAM_CURSOR == 'e1:8'
+        assert alerting_app.LAST_ALERT['sensor_id'] == 's1'
+
+        get.return_value = _StreamResponse([])
+        alerting_app.stream_monitoring('http://m/status/stream', 'http://m/status', 45)
+        assert get.call_args.kwargs['headers']['Last-Event-ID'] == 'e1:8'
+        poll_once.assert_called_once()
+
+
+def test_reconnect_after_monitoring_restart_resyncs():
+    # Monitoring restarted: it answers the old cursor with a reset under its
+    # new epoch, and alerting takes a full snapshot instead of skipping ahead
+    alerting_app.STREAM_CURSOR = 'e1:2'
+    alerting_app.ACTIVE_ALARMS['stale'] = {}
+    lines = ['id: e2:5', 'event: reset', 'data: {"version": 5, "epoch": "e2"}', '']
+    with patch.object(alerting_app.requests, 'get', return_value=_StreamResponse(lines)) as get, \
+            patch.object(alerting_app, 'poll_once') as poll_once:
+        alerting_app.stream_monitoring('http://m/status/stream', 'http://m/status', 45)
+    assert get.call_args.kwargs['headers']['Last-Event-ID'] == 'e1:2'
+    poll_once.assert_called_once_with('http://m/status')
+    assert alerting_app.ACTIVE_ALARMS == {}
+    assert alerting_app.STREAM_CURSOR == 'e2:5'
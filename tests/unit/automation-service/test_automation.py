@@ -17,8 +17,12 @@ def test_remediate_high_temperature(mock_sleep, client):
         'value': '85.0'
     }
     response = client.post('/remediate', json=incident_data)
-    assert response.status_code == 200
-    data = json.loads(response.data)
+    assert response.status_code == 202
+    job_id = json.loads(response.data)['job_id']
+    assert response.headers['Location'] == f'/jobs/{job_id}'
+    data = json.loads(client.get(f'/jobs/{job_id}?wait=5').data)
+    assert data['status'] == 'succeeded'
+    data = data['result']
     assert data['status'] == 'success'
     assert data['action'] == 'cooling_applied'
     mock_sleep.assert_called_once_with(2)
@@ -32,8 +36,12 @@ def test_remediate_sensor_silent(mock_requests_post, mock_sleep, client):
         'value': 'N/A'
     }
     response = client.post('/remediate', json=incident_data)
-    assert response.status_code == 200
-    data = json.loads(response.data)
+    assert response.status_code == 202
+    job_id = json.loads(response.data)['job_id']
+    assert response.headers['Location'] == f'/jobs/{job_id}'
+    data = json.loads(client.get(f'/jobs/{job_id}?wait=5').data)
+    assert data['status'] == 'succeeded'
+    data = data['result']
     assert data['status'] == 'success'
     assert data['action'] == 'sensor_service_restarted'
     mock_sleep.assert_called_once_with(3)
@@ -48,8 +56,12 @@ def test_remediate_erratic_sensor_data(mock_requests_post, mock_sleep, client):
         'value': '70.0 -> 90.0'
     }
     response = client.post('/remediate', json=incident_data)
-    assert response.status_code == 200
-    data = json.loads(response.data)
+    assert response.status_code == 202
+    job_id = json.loads(response.data)['job_id']
+    assert response.headers['Location'] == f'/jobs/{job_id}'
+    data = json.loads(client.get(f'/jobs/{job_id}?wait=5').data)
+    assert data['status'] == 'succeeded'
+    data = data['result']
     assert data['status'] == 'success'
     assert data['action'] == 'sensor_service_restarted'
     mock_sleep.assert_called_once_with(3)
@@ -0,0 +1,179 @@
+import importlib.util
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'automation-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from jobs import FAILED, QUEUED, SUCCEEDED, JobRunner, QueueFull  # noqa: E402
+
+
+def test_submit_returns_before_the_job_runs():
+    runner = JobRunner(workers=2)
+    release = threading.Event()
+
+    start = time.monotonic()
+    job, created = runner.submit('sensor-1', 'cooling_logic', release.wait, 5)
+    assert created
+    assert time.monotonic() - start < 1.0
+    assert runner.get(job.id).status in (QUEUED, 'running')
+
+    release.set()
+    assert runner.wait(job.id, 5).status == SUCCEEDED
+    assert job.result is True
+
+
+def test_one_remediation_at_a_time_per_sensor():
+    runner = JobRunner(workers=4)
+    lock = threading.Lock()
+    running = {}
+    overlaps = []
+    order = []
+
+    def remediate(sensor_id, n):
+        with lock:
+            if running.get(sensor_id):
+                overlaps.append(sensor_id)
+            running[sensor_id] = True
+        time.sleep(0.02)
+        with lock:
+            running[sensor_id] = False
+            order.append((sensor_id, n))
+        return {'status': 'success'}
+
+    submitted = []
+    for n in range(3):
+        for sensor_id in ('sensor-1', 'sensor-2'):
+            job, _ = runner.submit(sensor_id, f'action-{n}', remediate, sensor_id, n)
+            submitted.append(job)
+    for job in submitted:
+        assert runner.wait(job.id, 5).status == SUCCEEDED
+
+    assert overlaps == []
+    assert [n for s, n in order if s == 'sensor-1'] == [0, 1, 2]
+    assert [n for s, n in order if s == 'sensor-2'] == [0, 1, 2]
+
+
+def test_different_sensors_run_in_parallel():
+    runner = JobRunner(workers=4)
+    barrier = threading.Barrier(3, timeout=5)
+
+    jobs = [runner.submit(f'sensor-{i}', 'cooling_logic', barrier.wait)[0] for i in range(3)]
+    for job in jobs:
+        assert runner.wait(job.id, 5).status == SUCCEEDED
+
+
+def test_queued_duplicate_action_is_not_queued_twice():
+    runner = JobRunner(workers=1)
+    release = threading.Event()
+    running, _ = runner.submit('sensor-1', 'sensor_restart', release.wait, 5)
+    time.sleep(0.05)
+
+    queued, created = runner.submit('sensor-1', 'sensor_restart', lambda: 'first')
+    again, created_again = runner.submit('sensor-1', 'sensor_restart', lambda: 'second')
+    other, created_other = runner.submit('sensor-1', 'cooling_logic', lambda: 'cool')
+
+    assert created and not created_again and created_other
+    assert again is queued and queued is not running
+    assert runner.stats()['deduplicated'] == 1
+
+    release.set()
+    assert runner.wait(other.id, 5).status == SUCCEEDED
+    assert queued.result == 'first'
+
+
+def test_pending_cap_raises_queue_full():
+    runner = JobRunner(workers=1, max_pending=2)
+    release = threading.Event()
+    first, _ = runner.submit('sensor-1', 'a', release.wait, 5)
+    runner.submit('sensor-2', 'a', release.wait, 5)
+
+    with pytest.raises(QueueFull):
+        runner.submit('sensor-3', 'a', release.wait, 5)
+    assert runner.stats()['rejected'] == 1
+
+    release.set()
+    runner.wait(first.id, 5)
+
+
+def test_exceptions_and_failed_results_mark_the_job_failed():
+    runner = JobRunner(workers=1)
+
+    def boom():
+        raise RuntimeError('controller unreachable')
+
+    raised, _ = runner.submit('sensor-1', 'a', boom)
+    reported, _ = runner.submit('sensor-1', 'b', lambda: {'status': 'failed', 'error': 'nope'})
+    after, _ = runner.submit('sensor-1', 'c', lambda: {'status': 'success'})
+
+    assert runner.wait(after.id, 5).status == SUCCEEDED
+    assert raised.status == FAILED and 'controller unreachable' in raised.error
+    assert reported.status == FAILED and reported.result['error'] == 'nope'
+    assert runner.stats()['failed'] == 2
+
+
+def test_list_is_newest_first_and_filters():
+    runner = JobRunner(workers=2)
+    jobs = [runner.submit(f'sensor-{i % 2}', f'action-{i}', lambda: None)[0] for i in range(4)]
+    for job in jobs:
+        runner.wait(job.id, 5)
+
+    assert [j.id for j in runner.list()] == [j.id for j in reversed(jobs)]
+    assert [j.id for j in runner.list(sensor_id='sensor-1')] == [jobs[3].id, jobs[1].id]
+    assert runner.list(status=FAILED) == []
+    assert len(runner.list(limit=1)) == 1
+
+
+def test_finished_history_is_bounded():
+    runner = JobRunner(workers=1, history=3)
+    jobs = [runner.submit('sensor-1', f'action-{i}', lambda: None)[0] for i in range(6)]
+    runner.wait(jobs[-1].id, 5)
+
+    assert runner.get(jobs[0].id) is None
+    assert [j.id for j in runner.list()] == [j.id for j in reversed(jobs[3:])]
+    assert runner.wait('missing', 0.01) is None
+
+
+@pytest.fixture
+def client():
+    pytest.importorskip('flask')
+    automation_app = sys.modules.get('automation_app')
+    if automation_app is None:
+        spec = importlib.util.spec_from_file_location("automation_app", str(SERVICE_DIR / 'app.py'))
+        automation_app = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(automation_app)
+        sys.modules['automation_app'] = automation_app
+    automation_app.app.config['TESTING'] = True
+    with automation_app.app.test_client() as client:
+        yield client, automation_app
+
+
+def test_job_endpoints(client):
+    client, automation_app = client
+    release = threading.Event()
+    original = automation_app.REMEDIATIONS['cooling_logic']
+    automation_app.REMEDIATIONS['cooling_logic'] = lambda sensor_id, value: release.wait(5) and {'status': 'success'}
+    try:
+        response = client.post('/remediate', json={'incident_type': 'High Temperature', 'sensor_id': 'sensor-9', 'value': '90'})
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+
+        pending = client.get(f'/jobs/{job_id}').get_json()
+        assert pending['status'] in ('queued', 'running') and not pending['finished']
+
+        release.set()
+        done = client.get(f'/jobs/{job_id}?wait=5').get_json()
+        assert done['finished'] and done['result'] == {'status': 'success'}
+
+        listed = client.get('/jobs?sensor_id=sensor-9').get_json()
+        assert [j['job_id'] for j in listed] == [job_id]
+        assert client.get('/jobs?limit=0').status_code == 400
+        assert client.get('/jobs/unknown').status_code == 404
+        assert client.get('/stats').get_json()['jobs']['submitted'] >= 1
+    finally:
+        automation_app.REMEDIATIONS['cooling_logic'] = original
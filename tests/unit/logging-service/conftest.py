@@ -0,0 +1,59 @@
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'logging-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+
+def load_app():
+    """Import app.py once per session as `logging_app`, on in-memory SQLite.
+
+    DATABASE_URL only has to be set while the module is executed; it is put
+    back afterwards so nothing else in the session sees it.
+    """
+    module = sys.modules.get('logging_app')
+    if module is not None:
+        return module
+    previous = os.environ.get('DATABASE_URL')
+    os.environ['DATABASE_URL'] = 'sqlite://'
+    try:
+        spec = importlib.util.spec_from_file_location("logging_app", str(SERVICE_DIR / 'app.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules['logging_app'] = module
+    finally:
+        if previous is None:
+            del os.environ['DATABASE_URL']
+        else:
+            os.environ['DATABASE_URL'] = previous
+    return module
+
+
+# Test modules `import logging_app` after pytest.importorskip('flask_sqlalchemy')
+try:
+    import flask_sqlalchemy  # noqa: F401
+except ModuleNotFoundError:
+    pass
+else:
+    load_app()
+
+
+@pytest.fixture
+def client():
+    # Fresh schema and in-process caches for every test
+    logging_app = sys.modules['logging_app']
+    app, db = logging_app.app, logging_app.db
+    app.config['TESTING'] = True
+    logging_app.stats_cache.clear()
+    logging_app.last_health['result'] = None
+    with app.app_context():
+        logging_app.create_tables()
+        with app.test_client() as client:
+            yield client
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_sqlalchemy')
+
+import logging_app  # noqa: E402  (loaded by conftest.py)
+
+app, db = logging_app.app, logging_app.db
+
+
+def test_postgres_engine_options():
+    options = logging_app.engine_options('postgresql://user:password@db:5432/hvac_logs')
+    assert options['pool_size'] == logging_app.DB_POOL_SIZE
+    assert options['max_overflow'] == logging_app.DB_MAX_OVERFLOW
+    assert options['pool_pre_ping'] is logging_app.DB_POOL_PRE_PING
+    assert options['connect_args'] == {'options': f'-c statement_timeout={logging_app.DB_STATEMENT_TIMEOUT_MS}'}
+
+
+def test_sqlite_keeps_default_pool():
+    options = logging_app.engine_options('sqlite://')
+    assert 'pool_size' not in options and 'connect_args' not in options
+
+
+def test_health_result_is_cached_for_ttl(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'HEALTH_CACHE_SECONDS', 60)
+    assert client.get('/health').status_code == 200
+    with patch.object(db.session, 'execute', side_effect=Exception('DB Error')) as execute:
+        cached = client.get('/health')
+        assert cached.status_code == 200 and execute.call_count == 0
+
+        monkeypatch.setitem(app.config, 'HEALTH_CACHE_SECONDS', 0)
+        fresh = client.get('/health')
+        assert fresh.status_code == 500 and execute.call_count == 1
+        assert 'DB connection failed' in fresh.get_json()['message']
+
+
+def test_init_db_command_creates_schema():
+    with app.app_context():
+        db.drop_all()
+        result = app.test_cli_runner().invoke(args=['init-db'])
+        assert result.exit_code == 0 and 'up to date' in result.output
+        assert 'incident' in db.inspect(db.engine).get_table_names()
+        db.drop_all()
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_sqlalchemy')
+
+import logging_app  # noqa: E402  (loaded by conftest.py)
+
+app, db, Incident = logging_app.app, logging_app.db, logging_app.Incident
+
+
+def incident(i):
+    return {'timestamp': 1000 + i, 'type': 'High Temp', 'component': f'sensor-{i}', 'value': str(80 + i)}
+
+
+def test_json_array_batch_returns_ids_in_order(client):
+    response = client.post('/incidents/batch', json=[incident(i) for i in range(50)])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['count'] == 50 and len(body['ids']) == 50
+
+    with app.app_context():
+        for i, incident_id in enumerate(body['ids']):
+            stored = db.session.get(Incident, incident_id)
+            assert stored.component == f'sensor-{i}'
+            assert stored.status == 'active' and stored.severity == 'critical' and stored.details == {}
+
+
+def test_ndjson_batch(client):
+    payload = '\n'.join(json.dumps(incident(i)) for i in range(3)) + '\n\n'
+    response = client.post('/incidents/batch', data=payload, content_type='application/x-ndjson')
+    assert response.status_code == 201
+    assert response.get_json()['count'] == 3
+    assert len(client.get('/incidents').get_json()) == 3
+
+
+def test_invalid_item_rejects_whole_batch(client):
+    response = client.post('/incidents/batch', json=[incident(0), {'type': 'High Temp'}])
+    assert response.status_code == 400
+    assert 'Incident 1' in response.get_json()['error']
+    assert client.get('/incidents').get_json() == []
+
+
+@pytest.mark.parametrize('bad, message', [
+    ({'type': None}, "'type'"),
+    ({'component': ''}, "'component'"),
+    ({'timestamp': 'abc'}, "'timestamp'"),
+    ({'timestamp': 12.5}, "'timestamp'"),
+    ({'severity': 3}, "'severity'"),
+    ({'details': ['x']}, "'details'"),
+])
+def test_invalid_fields_are_rejected_before_insert(client, bad, message):
+    response = client.post('/incidents/batch', json=[incident(0), {**incident(1), **bad}])
+    assert response.status_code == 400
+    error = response.get_json()['error']
+    assert 'Incident 1' in error and message in error
+    assert client.get('/incidents').get_json() == []
+
+
+def test_single_incident_is_validated(client):
+    response = client.post('/incidents', json={**incident(0), 'timestamp': 'abc'})
+    assert response.status_code == 400 and "'timestamp'" in response.get_json()['error']
+    assert client.post('/incidents', json={**incident(0), 'type': None}).status_code == 400
+    assert client.get('/incidents').get_json() == []
+
+
+def test_malformed_bodies(client):
+    assert client.post('/incidents/batch', json={'type': 'High Temp'}).status_code == 400
+    assert client.post('/incidents/batch', json=[]).status_code == 400
+    response = client.post('/incidents/batch', data='{"type": 1}\nnot json',
+                           content_type='application/x-ndjson')
+    assert response.status_code == 400 and 'line 2' in response.get_json()['error']
+
+
+def test_oversized_batch(client, monkeypatch):
+    monkeypatch.setattr(logging_app, 'INCIDENTS_BATCH_MAX', 2)
+    response = client.post('/incidents/batch', json=[incident(i) for i in range(3)])
+    assert response.status_code == 413
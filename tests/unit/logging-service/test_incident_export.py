@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_sqlalchemy')
+
+import logging_app  # noqa: E402  (loaded by conftest.py)
+
+app, db = logging_app.app, logging_app.db
+
+
+@pytest.fixture
+def incidents(client):
+    rows = [{'timestamp': 1000 + i, 'type': 'High Temp' if i % 2 else 'Sensor Silent',
+             'component': f'sensor-{i}', 'value': str(80 + i), 'details': {'n': i}} for i in range(25)]
+    assert client.post('/incidents/batch', json=rows).status_code == 201
+    return rows
+
+
+def test_ndjson_export_streams_every_row_in_order(client, incidents, monkeypatch):
+    # Several cursor fetches per export
+    monkeypatch.setattr(logging_app, 'EXPORT_FETCH_SIZE', 4)
+    response = client.get('/incidents/export')
+    assert response.status_code == 200
+    assert response.is_streamed and response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['timestamp'] for row in lines] == [r['timestamp'] for r in incidents]
+    assert lines[3]['details'] == {'n': 3} and lines[3]['status'] == 'active'
+
+
+def test_csv_export_applies_filters(client, incidents):
+    response = client.get('/incidents/export?format=csv&type=High Temp&since=1010&until=1016')
+    assert response.status_code == 200 and response.mimetype == 'text/csv'
+    assert 'incidents.csv' in response.headers['Content-Disposition']
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [int(r['timestamp']) for r in rows] == [1011, 1013, 1015]
+    assert json.loads(rows[0]['details']) == {'n': 11}
+
+
+def test_empty_csv_export_has_header_only(client):
+    response = client.get('/incidents/export?format=csv')
+    assert response.get_data(as_text=True).strip() == ','.join(logging_app.EXPORT_COLUMNS)
+
+
+def test_bad_export_params(client):
+    assert client.get('/incidents/export?format=xml').status_code == 400
+    assert client.get('/incidents/export?since=abc').status_code == 400
@@ -0,0 +1,118 @@
+import gzip
+import json
+import os
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_sqlalchemy')
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+from sqlalchemy.schema import CreateTable  # noqa: E402
+
+import logging_app  # noqa: E402  (loaded by conftest.py)
+from partitions import PartitionManager  # noqa: E402
+
+app, db, Incident = logging_app.app, logging_app.db, logging_app.Incident
+DAY = 86400
+
+
+def read_archive(path):
+    with gzip.open(path, 'rt') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_postgres_table_is_range_partitioned_on_timestamp():
+    manager = PartitionManager(Incident.__table__, 7 * DAY)
+    ddl = str(CreateTable(manager._partitioned_table()).compile(dialect=postgresql.dialect()))
+    assert 'PRIMARY KEY (id, timestamp)' in ddl
+    assert 'PARTITION BY RANGE (timestamp)' in ddl
+    assert 'id SERIAL' in ddl
+    assert manager.partition_name(manager.period_start(10 * DAY + 5)) == f'incident_p{7 * DAY}'
+
+
+def test_retire_archives_whole_expired_periods_only(client, tmp_path):
+    now = 100 * DAY
+    rows = [
+        {'timestamp': 1 * DAY, 'type': 'High Temp', 'component': 'sensor-1', 'details': {'n': 1}},
+        {'timestamp': 2 * DAY, 'type': 'High Temp', 'component': 'sensor-2'},
+        {'timestamp': 40 * DAY, 'type': 'Sensor Silent', 'component': 'sensor-1'},
+        {'timestamp': 80 * DAY, 'type': 'High Temp', 'component': 'sensor-1'},   # expired, but its period is not whole
+        {'timestamp': 99 * DAY, 'type': 'High Temp', 'component': 'sensor-3'},
+    ]
+    client.post('/incidents/batch', json=rows)
+
+    manager = PartitionManager(Incident.__table__, 7 * DAY)
+    with app.app_context():
+        retired = manager.retire(db.engine, 20 * DAY, str(tmp_path), now=now)
+
+    assert [(r['start'], r['rows']) for r in retired] == [(0, 2), (35 * DAY, 1)]
+    first = read_archive(retired[0]['archive'])
+    assert [r['timestamp'] for r in first] == [DAY, 2 * DAY]
+    assert first[0]['details'] == {'n': 1} and first[0]['status'] == 'active'
+    remaining = [i['timestamp'] for i in client.get('/incidents?order=asc').get_json()]
+    assert remaining == [80 * DAY, 99 * DAY]
+    assert manager.stats()['retired_rows'] == 3
+
+    # Nothing left to retire; a later backfill gets its own archive file
+    with app.app_context():
+        assert manager.retire(db.engine, 20 * DAY, str(tmp_path), now=now) == []
+    client.post('/incidents', json={'timestamp': DAY + 1, 'type': 'High Temp', 'component': 'sensor-9'})
+    with app.app_context():
+        again = manager.retire(db.engine, 20 * DAY, str(tmp_path), now=now)
+    assert again[0]['archive'] != retired[0]['archive']
+    assert [r['component'] for r in read_archive(again[0]['archive'])] == ['sensor-9']
+
+
+def test_maintenance_honours_retention_setting(client, tmp_path, monkeypatch):
+    client.post('/incidents', json={'timestamp': DAY, 'type': 'High Temp', 'component': 'sensor-1'})
+    monkeypatch.setattr(logging_app, 'INCIDENT_ARCHIVE_DIR', str(tmp_path))
+    with app.app_context():
+        monkeypatch.setattr(logging_app, 'INCIDENT_RETENTION_DAYS', 0)
+        assert logging_app.maintain_storage(now=100 * DAY) == []
+        monkeypatch.setattr(logging_app, 'INCIDENT_RETENTION_DAYS', 30)
+        assert len(logging_app.maintain_storage(now=100 * DAY)) == 1
+    assert client.get('/incidents').get_json() == []
+    assert client.get('/stats').get_json()['storage']['retired_rows'] == 1
+
+
+@pytest.fixture
+def postgres_engine():
+    # Native partitioning needs a real Postgres; point LOGGING_TEST_DATABASE_URL at a scratch database
+    url = os.getenv('LOGGING_TEST_DATABASE_URL')
+    if not url:
+        pytest.skip('LOGGING_TEST_DATABASE_URL not set')
+    pytest.importorskip('psycopg2')
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text('DROP TABLE IF EXISTS incident CASCADE'))
+    yield engine
+    with engine.begin() as conn:
+        conn.execute(text('DROP TABLE IF EXISTS incident CASCADE'))
+    engine.dispose()
+
+
+def test_native_partitions_are_managed_without_create(postgres_engine, tmp_path):
+    # init-db creates the table; the server's own manager never ran create()
+    PartitionManager(Incident.__table__, 7 * DAY, premake=0).create(postgres_engine, now=0)
+    with postgres_engine.begin() as conn:
+        # Rows that landed in DEFAULT while their partition was missing
+        conn.execute(Incident.__table__.insert(), [
+            {'timestamp': 7 * DAY + 1, 'type': 'High Temp', 'component': 'sensor-1', 'severity': 'warning', 'status': 'active'},
+            {'timestamp': 30 * DAY, 'type': 'High Temp', 'component': 'sensor-2', 'severity': 'warning', 'status': 'active'},
+        ])
+
+    server = PartitionManager(Incident.__table__, 7 * DAY, premake=0)
+    assert server.ensure(postgres_engine, now=7 * DAY) == [f'incident_p{7 * DAY}']
+    assert server.stats()['native']
+    with postgres_engine.connect() as conn:
+        assert conn.execute(text('SELECT count(*) FROM incident_default')).scalar() == 1
+        assert conn.execute(text(f'SELECT count(*) FROM incident_p{7 * DAY}')).scalar() == 1
+
+    retired = server.retire(postgres_engine, DAY, str(tmp_path), now=20 * DAY)
+    assert [(r['start'], r['rows']) for r in retired] == [(0, 0), (7 * DAY, 1)]
+    assert [r['component'] for r in read_archive(retired[1]['archive'])] == ['sensor-1']
+    assert list(server.partitions(postgres_engine)) == []
+    with postgres_engine.connect() as conn:
+        assert conn.execute(text('SELECT count(*) FROM incident')).scalar() == 1
@@ -0,0 +1,101 @@
+import pytest
+
+from stats_cache import BucketCache
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_sqlalchemy')
+
+import logging_app  # noqa: E402  (loaded by conftest.py)
+
+app, db = logging_app.app, logging_app.db
+
+
+@pytest.fixture
+def incidents(client):
+    # Hour 0: sensor-1 x3 (one resolved), sensor-2 x1; hour 1: sensor-2 x2
+    rows = [
+        {'timestamp': 3600 * 0 + 10, 'type': 'High Temp', 'component': 'sensor-1'},
+        {'timestamp': 3600 * 0 + 20, 'type': 'High Temp', 'component': 'sensor-1'},
+        {'timestamp': 3600 * 0 + 30, 'type': 'Sensor Silent', 'component': 'sensor-1', 'severity': 'warning'},
+        {'timestamp': 3600 * 0 + 40, 'type': 'High Temp', 'component': 'sensor-2'},
+        {'timestamp': 3600 * 1 + 10, 'type': 'High Temp', 'component': 'sensor-2'},
+        {'timestamp': 3600 * 1 + 20, 'type': 'High Temp', 'component': 'sensor-2'},
+    ]
+    ids = client.post('/incidents/batch', json=rows).get_json()['ids']
+    client.put(f'/incidents/{ids[0]}', json={'status': 'resolved'})
+    return ids
+
+
+def test_bucket_cache_invalidates_by_timestamp():
+    cache = BucketCache(max_buckets=2)
+    cache.put('q', 60, 0, [{'count': 1}])
+    cache.put('q', 3600, 0, [{'count': 2}])
+    assert cache.get('q', 60, 0) == [{'count': 1}]
+    cache.invalidate([30])
+    assert cache.get('q', 60, 0) is None and cache.get('q', 3600, 0) is None
+
+    for start in (0, 60, 120):
+        cache.put('q', 60, start, [])
+    assert len(cache) == 2 and cache.get('q', 60, 0) is None
+
+
+def test_bucket_cache_entries_expire_after_ttl():
+    # Bounds staleness from writes handled by another worker
+    now = [1000.0]
+    cache = BucketCache(ttl=60, clock=lambda: now[0])
+    cache.put('q', 60, 0, [{'count': 1}])
+    now[0] += 59
+    assert cache.get('q', 60, 0) == [{'count': 1}]
+    now[0] += 1
+    assert cache.get('q', 60, 0) is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_group_by_component_busiest_first(client, incidents):
+    body = client.get('/incidents/stats?group_by=component').get_json()
+    assert body['total'] == 6
+    assert [(g['component'], g['count'], g['resolved']) for g in body['groups']] == \
+        [('sensor-1', 3, 1), ('sensor-2', 3, 0)]
+
+    top = client.get('/incidents/stats?group_by=component,type&top=1').get_json()
+    assert top['groups'][0]['component'] == 'sensor-2' and top['groups'][0]['count'] == 3
+    assert top['total'] == 6 and len(top['groups']) == 1
+
+
+def test_filters_apply_before_grouping(client, incidents):
+    body = client.get('/incidents/stats?group_by=severity&type=High Temp').get_json()
+    assert body['groups'] == [{'severity': 'critical', 'count': 5, 'resolved': 1,
+                               'first_seen': 10, 'last_seen': 3620}]
+
+
+def test_hourly_buckets_are_cached_once_closed(client, incidents):
+    url = '/incidents/stats?group_by=component&bucket=3600&since=0&until=10800'
+    first = client.get(url).get_json()
+    assert first['cached_buckets'] == 0
+    assert [(g['bucket'], g['component'], g['count']) for g in first['groups']] == \
+        [(0, 'sensor-1', 3), (0, 'sensor-2', 1), (3600, 'sensor-2', 2)]
+
+    second = client.get(url).get_json()
+    assert second['cached_buckets'] == 3 and second['groups'] == first['groups']
+
+    # A late write into hour 1 drops that bucket only
+    client.post('/incidents', json={'timestamp': 3600 + 50, 'type': 'High Temp', 'component': 'sensor-1'})
+    third = client.get(url).get_json()
+    assert third['cached_buckets'] == 1
+    assert [(g['bucket'], g['component'], g['count']) for g in third['groups'] if g['bucket'] == 3600] == \
+        [(3600, 'sensor-2', 2), (3600, 'sensor-1', 1)]
+
+
+def test_open_bucket_is_not_cached(client, monkeypatch):
+    monkeypatch.setattr(logging_app.time, 'time', lambda: 5400)
+    client.post('/incidents', json={'timestamp': 5000, 'type': 'High Temp', 'component': 'sensor-1'})
+    url = '/incidents/stats?bucket=3600&since=0'
+    client.get(url)
+    body = client.get(url).get_json()
+    assert body['until'] == 5400 and body['cached_buckets'] == 1
+    assert [(g['bucket'], g['count']) for g in body['groups']] == [(3600, 1)]
+
+
+def test_bad_stats_params(client):
+    for query in ('group_by=value', 'bucket=0', 'bucket=60&top=3', 'bucket=1&since=0&until=100000'):
+        assert client.get(f'/incidents/stats?{query}').status_code == 400, query
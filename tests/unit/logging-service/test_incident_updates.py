@@ -0,0 +1,99 @@
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('flask_sqlalchemy')
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+
+import logging_app  # noqa: E402  (loaded by conftest.py)
+
+app, db, Incident = logging_app.app, logging_app.db, logging_app.Incident
+
+
+def create(client, **fields):
+    body = {'timestamp': 100, 'type': 'High Temp', 'component': 'sensor-1', **fields}
+    return client.post('/incidents', json=body).get_json()
+
+
+def test_put_merges_details_and_bumps_version(client):
+    incident = create(client, details={'threshold': 80.0, 'notes': 'first'})
+    assert incident['version'] == 1
+
+    response = client.put(f"/incidents/{incident['id']}", json={
+        'status': 'resolved', 'details': {'notes': 'cooled', 'steps': [1, 2], 'extra': {'a': None}}})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['status'] == 'resolved' and body['version'] == 2
+    assert body['details'] == {'threshold': 80.0, 'notes': 'cooled', 'steps': [1, 2], 'extra': {'a': None}}
+
+
+def test_put_on_null_details_starts_from_empty_object(client):
+    with app.app_context():
+        incident = Incident(timestamp=1, type='High Temp', component='s1', severity='critical')
+        db.session.add(incident)
+        db.session.commit()
+        incident_id = incident.id
+    response = client.put(f'/incidents/{incident_id}', json={'details': {'k': 'v'}})
+    assert response.get_json()['details'] == {'k': 'v'}
+
+
+def test_put_is_a_single_update_statement(client):
+    incident_id = create(client, details={'a': 1})['id']
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.put(f'/incidents/{incident_id}', json={'details': {'b': 2}})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.get_json()['details'] == {'a': 1, 'b': 2}
+    assert statements == ['UPDATE']
+
+
+def test_expected_version_conflict(client):
+    incident_id = create(client)['id']
+    ok = client.put(f'/incidents/{incident_id}', json={'status': 'manual_intervention', 'expected_version': 1})
+    assert ok.status_code == 200
+
+    stale = client.put(f'/incidents/{incident_id}', json={'status': 'resolved', 'expected_version': 1})
+    assert stale.status_code == 409
+    assert stale.get_json()['incident']['status'] == 'manual_intervention'
+    assert client.put('/incidents/999', json={'status': 'resolved'}).status_code == 404
+    assert client.put(f'/incidents/{incident_id}', json={'expected_version': 'x'}).status_code == 400
+    assert client.put(f'/incidents/{incident_id}', json={'details': ['x']}).status_code == 400
+
+
+def test_postgres_merge_is_jsonb_concatenation():
+    with app.app_context():
+        expression = logging_app.merged_details({'k': 1})
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(db.engine.dialect, 'name', 'postgresql')
+            expression = logging_app.merged_details({'k': 1})
+    sql = str(expression.compile(dialect=postgresql.dialect()))
+    assert '||' in sql and 'jsonb_typeof' in sql and 'AS JSONB' in sql
+
+
+def test_bulk_transition_resolves_matching_incidents(client):
+    a = create(client, component='sensor-1')['id']
+    b = create(client, component='sensor-1', type='Sensor Silent')['id']
+    other = create(client, component='sensor-2')['id']
+    client.put(f'/incidents/{b}', json={'status': 'manual_intervention'})
+
+    response = client.post('/incidents/transition?component=sensor-1&status=active,manual_intervention',
+                           json={'status': 'resolved', 'details': {'resolved_by': 'sre'}})
+    assert response.status_code == 200
+    assert response.get_json() == {'count': 2, 'ids': [a, b], 'status': 'resolved'}
+
+    resolved = client.get(f'/incidents/{b}').get_json()
+    assert resolved['status'] == 'resolved' and resolved['details'] == {'resolved_by': 'sre'}
+    assert resolved['version'] == 3
+    assert client.get(f'/incidents/{other}').get_json()['status'] == 'active'
+
+
+def test_bulk_transition_requires_a_filter_and_status(client):
+    assert client.post('/incidents/transition', json={'status': 'resolved'}).status_code == 400
+    assert client.post('/incidents/transition?component=sensor-1', json={}).status_code == 400
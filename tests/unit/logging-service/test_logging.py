@@ -7,6 +7,7 @@ from src.logging-service.app import app, db, Incident
 def client():
     app.config['TESTING'] = True
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:' # Use in-memory SQLite for testing
+    app.config['HEALTH_CACHE_SECONDS'] = 0 # Probe the DB on every /health call
     with app.app_context():
         db.create_all()
         yield app.test_client()
@@ -53,8 +54,9 @@ def test_get_incidents_with_data(client):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert len(data) == 2
-    assert data[0]['type'] == 'High Temp'
-    assert data[1]['type'] == 'Sensor Silent'
+    # Newest first
+    assert data[0]['type'] == 'Sensor Silent'
+    assert data[1]['type'] == 'High Temp'
 
 def test_get_single_incident(client):
     incident = Incident(timestamp=1, type='High Temp', component='s1', value='85', severity='critical')
@@ -0,0 +1,71 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from classifier import ALARM, OK, STATES, UNKNOWN, WARN, BandTable, Bands  # noqa: E402
+
+EDGES = [68.0, 75.0, 65.0, 67.9, 75.1, 78.0, 64.9, 78.1]
+EXPECTED = ['OK', 'OK', 'WARN', 'WARN', 'WARN', 'WARN', 'ALARM', 'ALARM']
+
+
+def test_default_bands_scalar_and_vector_agree():
+    table = BandTable()
+    assert [table.classify_one(t) for t in EDGES] == EXPECTED
+    assert [STATES[c] for c in table.classify(EDGES)] == EXPECTED
+    assert table.classify([float('nan')]).tolist() == [UNKNOWN]
+    assert table.classify_one(None) == 'UNKNOWN'
+
+
+def test_sensor_override_beats_zone_beats_default():
+    table = BandTable.from_config({
+        'default': {'ok_high': 76.0},
+        'zones': {'cold-store': {'ok_low': 30.0, 'ok_high': 40.0, 'warn_low': 25.0, 'warn_high': 45.0}},
+        'sensor_zones': {'c1': 'cold-store', 'c2': 'cold-store'},
+        'sensors': {'c2': {'ok_high': 42.0}},
+    })
+    assert table.bands_for('other') == Bands(68.0, 76.0, 65.0, 78.0)
+    assert table.bands_for('c1') == Bands(30.0, 40.0, 25.0, 45.0)
+    assert table.bands_for('c2') == Bands(30.0, 42.0, 25.0, 45.0)
+
+    ids = ['other', 'c1', 'c2', 'other']
+    temps = [75.5, 41.0, 41.0, 35.0]
+    assert table.classify(temps, ids).tolist() == [OK, WARN, OK, ALARM]
+    assert table.classify_labels(temps, ids) == [table.classify_one(t, s) for t, s in zip(temps, ids)]
+
+
+def test_invalid_config_is_rejected():
+    with pytest.raises(ValueError):
+        BandTable(default={'ok_low': 80.0})
+    with pytest.raises(ValueError):
+        BandTable(sensor_zones={'s1': 'nowhere'})
+    with pytest.raises(ValueError):
+        BandTable(default={'ok_lo': 60.0})
+
+
+def test_deviation_outside_ok_band():
+    table = BandTable()
+    assert table.deviation([70.0, 80.0, 60.0]).tolist() == [0.0, 5.0, 8.0]
+
+
+def test_large_batch_matches_scalar_and_is_fast():
+    rng = np.random.default_rng(0)
+    ids = [f's{i}' for i in range(50_000)]
+    temps = rng.uniform(55.0, 95.0, size=len(ids))
+    table = BandTable(sensors={f's{i}': {'ok_high': 80.0, 'warn_high': 85.0} for i in range(0, 50_000, 7)})
+
+    start = time.perf_counter()
+    codes = table.classify(temps, ids)
+    elapsed = time.perf_counter() - start
+
+    sample = range(0, 50_000, 997)
+    assert [STATES[codes[i]] for i in sample] == [table.classify_one(temps[i], ids[i]) for i in sample]
+    assert set(np.unique(codes).tolist()) <= {OK, WARN, ALARM}
+    assert elapsed < 0.5
@@ -0,0 +1,166 @@
+import importlib.util
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from coalescer import OPEN, REFIRE, SUPPRESS, IncidentCoalescer  # noqa: E402
+
+
+def test_repeats_are_suppressed_until_cooldown():
+    coalescer = IncidentCoalescer(cooldown=60, resolve_after=30)
+    decision, incident = coalescer.record('s1', 'Erratic Sensor Data', 85.0, now=1000)
+    assert decision == OPEN
+    assert coalescer.record('s1', 'Erratic Sensor Data', 92.0, now=1010)[0] == SUPPRESS
+    assert coalescer.record('s1', 'Erratic Sensor Data', 60.0, now=1020)[0] == SUPPRESS
+    assert coalescer.record('s2', 'Erratic Sensor Data', 70.0, now=1020)[0] == OPEN
+    assert coalescer.record('s1', 'Erratic Sensor Data', 80.0, now=1060)[0] == REFIRE
+    assert coalescer.record('s1', 'Erratic Sensor Data', 80.0, now=1061)[0] == SUPPRESS
+
+    summary = incident.summary()
+    assert summary['occurrences'] == 5
+    assert summary['peak_value'] == 92.0
+    assert summary['last_value'] == 80.0
+    assert coalescer.stats() == {'open': 2, 'opened': 2, 'suppressed': 3, 'refired': 1, 'resolved': 0}
+
+
+def test_quiet_incidents_resolve_but_sticky_ones_wait_for_resolve():
+    coalescer = IncidentCoalescer(cooldown=60, resolve_after=30, update_interval=5)
+    _, erratic = coalescer.record('s1', 'Erratic Sensor Data', 85.0, now=1000)
+    _, silent = coalescer.record('s1', 'Sensor Silent', 'N/A', now=1000, sticky=True)
+    coalescer.attach_id(erratic, 11)
+    coalescer.attach_id(silent, 12)
+
+    assert coalescer.sweep(now=1029) == ([], [])
+    assert coalescer.sweep(now=1030) == ([], [erratic])
+    assert coalescer.is_open('s1', 'Sensor Silent')
+    assert coalescer.resolve('s1', 'Sensor Silent') is silent
+    assert coalescer.resolve('s1', 'Sensor Silent') is None
+    assert len(coalescer) == 0
+
+
+def test_sweep_syncs_changed_incidents_at_most_every_interval():
+    coalescer = IncidentCoalescer(cooldown=600, resolve_after=600, update_interval=10)
+    _, incident = coalescer.record('s1', 'Erratic Sensor Data', 85.0, now=1000)
+    coalescer.record('s1', 'Erratic Sensor Data', 86.0, now=1001)
+    assert coalescer.sweep(now=1011) == ([], [])  # no id yet
+    coalescer.attach_id(incident, 7)
+    assert coalescer.sweep(now=1011) == ([incident], [])
+    assert coalescer.sweep(now=1015) == ([], [])  # nothing new
+    coalescer.record('s1', 'Erratic Sensor Data', 87.0, now=1016)
+    assert coalescer.sweep(now=1018) == ([], [])  # too soon
+    assert coalescer.sweep(now=1021) == ([incident], [])
+
+
+def test_resolve_before_id_is_known_hands_final_write_to_attach():
+    coalescer = IncidentCoalescer()
+    _, incident = coalescer.record('s1', 'High Temperature', 85.0, now=1000, sticky=True)
+    assert coalescer.resolve('s1', 'High Temperature') is None
+    assert coalescer.attach_id(incident, 5) is True
+
+
+def test_resolve_sensor_closes_all_its_incidents():
+    coalescer = IncidentCoalescer()
+    _, silent = coalescer.record('s1', 'Sensor Silent', 'N/A', now=1000, sticky=True)
+    coalescer.attach_id(silent, 7)
+    coalescer.record('s1', 'High Temperature', 85.0, now=1000, sticky=True)   # create still in flight
+    coalescer.record('s2', 'Sensor Silent', 'N/A', now=1000, sticky=True)
+    assert coalescer.resolve_sensor('s1') == [silent]
+    assert not coalescer.is_open('s1', 'High Temperature') and coalescer.is_open('s2', 'Sensor Silent')
+
+
+def _load_app():
+    pytest.importorskip('flask')
+    pytest.importorskip('pika')
+    pytest.importorskip('numpy')
+    module = sys.modules.get('monitoring_app')
+    if module is None:
+        spec = importlib.util.spec_from_file_location("monitoring_app", str(SERVICE_DIR / 'app.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules['monitoring_app'] = module
+    return module
+
+
+def test_erratic_storm_fans_out_once_and_high_temp_resolves():
+    app = _load_app()
+    app.sensor_state.clear()
+    app.silence_wheel.clear()
+    app.coalescer.clear()
+    with patch.object(app, 'log_incident', return_value=42) as log, \
+            patch.object(app, 'update_incident') as update, \
+            patch.object(app, 'trigger_alert') as alert, \
+            patch.object(app, 'trigger_automation') as automation, \
+            patch.object(app.time, 'time', return_value=1000):
+        for i in range(200):
+            app.handle_reading({'sensor_id': 'flappy', 'temperature': 60.0 if i % 2 else 90.0, 'timestamp': 1000 + i / 100})
+        app.dispatcher.join()
+        assert log.call_count == 1 and alert.call_count == 1 and automation.call_count == 1
+        assert app.coalescer.stats()['suppressed'] == 198
+
+        app.handle_reading({'sensor_id': 'hot', 'temperature': 90.0, 'timestamp': 1000})
+        app.handle_reading({'sensor_id': 'hot', 'temperature': 90.0, 'timestamp': 1400})
+        app.handle_reading({'sensor_id': 'hot', 'temperature': 72.0, 'timestamp': 1401})
+        app.dispatcher.join()
+        update.assert_called_once()
+        assert update.call_args.args == (42,)
+        assert update.call_args.kwargs['status'] == 'resolved'
+        assert update.call_args.kwargs['details']['occurrences'] == 1
+
+
+def test_retired_sensor_that_returns_raises_silence_again():
+    app = _load_app()
+    app.sensor_state.clear()
+    app.silence_wheel.clear()
+    app.coalescer.clear()
+    threshold = app.SENSOR_SILENCE_THRESHOLD_SECONDS
+    with patch.object(app, 'log_incident', side_effect=[42, 43]) as log, \
+            patch.object(app, 'update_incident') as update, \
+            patch.object(app, 'trigger_alert'), \
+            patch.object(app, 'trigger_automation'):
+        app.handle_reading({'sensor_id': 'attic', 'temperature': 72.0, 'timestamp': 1000})
+        assert app.check_sensor_silence(1000 + threshold + 1) == 1
+        app.dispatcher.join()
+
+        assert app.retire_sensors(1000 + app.SENSOR_RETIRE_SECONDS + 1) == ['attic']
+        app.dispatcher.join()
+        assert update.call_args.args == (42,) and update.call_args.kwargs['status'] == 'resolved'
+        assert len(app.coalescer) == 0
+
+        back = 1000 + app.SENSOR_RETIRE_SECONDS + 10
+        app.handle_reading({'sensor_id': 'attic', 'temperature': 72.0, 'timestamp': back})
+        assert app.check_sensor_silence(back + threshold + 1) == 1
+        app.dispatcher.join()
+        assert log.call_count == 2
+
+
+def test_silence_without_logging_id_is_raised_again_after_restore(tmp_path):
+    from snapshot import Snapshotter, write_snapshot
+    from state_store import SensorStateStore
+
+    app = _load_app()
+    store, coalescer = SensorStateStore(window_seconds=10), IncidentCoalescer()
+    state = store.touch('attic')
+    state.last_seen, state.silent = 1000, True
+    coalescer.record('attic', 'Sensor Silent', 'N/A', now=1100, sticky=True)   # create still in flight
+    path = str(tmp_path / 'state.snap')
+    write_snapshot(store, path, coalescer)
+
+    app.sensor_state.clear()
+    app.silence_wheel.clear()
+    app.coalescer.clear()
+    snapshotter = Snapshotter(app.sensor_state, path, coalescer=app.coalescer)
+    with patch.object(app, 'snapshotter', snapshotter), \
+            patch.object(app, 'log_incident', return_value=9) as log, \
+            patch.object(app, 'trigger_alert'), \
+            patch.object(app, 'trigger_automation'):
+        app.restore_state()
+        assert not app.sensor_state.get('attic').silent
+        assert app.check_sensor_silence(1000 + app.SENSOR_SILENCE_THRESHOLD_SECONDS + 1) == 1
+        app.dispatcher.join()
+    log.assert_called_once()
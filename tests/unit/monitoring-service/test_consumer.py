@@ -0,0 +1,181 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from consumer import ACK, REQUEUE, AckTracker, PartitionedConsumer, partition_for  # noqa: E402
+
+
+class FakeConnection:
+    """Collects thread-safe callbacks so the test can play the pika I/O thread."""
+
+    def __init__(self):
+        self.callbacks = []
+        self.lock = threading.Lock()
+        self.is_open = True
+
+    def add_callback_threadsafe(self, callback):
+        with self.lock:
+            self.callbacks.append(callback)
+
+    def call_later(self, delay, callback):
+        pass
+
+    def run_pending(self):
+        with self.lock:
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def _deliver(consumer, tag, payload):
+    body = payload if isinstance(payload, bytes) else json.dumps(payload)
+    consumer.on_message(None, MagicMock(delivery_tag=tag), None, body)
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_ack_tracker_releases_only_contiguous_runs():
+    tracker = AckTracker()
+    tracker.settle(2, ACK)
+    tracker.settle(3, REQUEUE)
+    assert tracker.drain() == []
+
+    tracker.settle(1, ACK)
+    assert tracker.drain() == [(1, ACK), (2, ACK), (3, REQUEUE)]
+    tracker.settle(5, ACK)
+    assert tracker.drain() == []
+    assert tracker.pending() == 1
+
+
+def test_partition_for_is_stable():
+    assert partition_for('sensor-1', 8) == partition_for('sensor-1', 8)
+    assert {partition_for(f'sensor-{i}', 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_same_sensor_is_processed_in_order_on_one_thread():
+    seen = []
+
+    def handler(data):
+        seen.append((data['sensor_id'], data['n'], threading.current_thread().name))
+
+    consumer = PartitionedConsumer(handler, workers=4, ack_batch=1000)
+    connection, channel = FakeConnection(), MagicMock()
+    consumer.bind(connection, channel)
+
+    tag = 0
+    for n in range(50):
+        for sensor in ('a', 'b', 'c'):
+            tag += 1
+            _deliver(consumer, tag, {'sensor_id': sensor, 'n': n})
+    _wait_for(lambda: len(seen) == 150)
+
+    for sensor in ('a', 'b', 'c'):
+        mine = [(n, thread) for s, n, thread in seen if s == sensor]
+        assert [n for n, _ in mine] == list(range(50))
+        assert len({thread for _, thread in mine}) == 1
+
+
+def test_acks_are_batched_and_nacks_go_out_first():
+    def handler(data):
+        if data.get('fail'):
+            raise ValueError('bad reading')
+
+    consumer = PartitionedConsumer(handler, workers=2, ack_batch=1000)
+    connection, channel = FakeConnection(), MagicMock()
+    consumer.bind(connection, channel)
+
+    _deliver(consumer, 1, {'sensor_id': 's1'})
+    _deliver(consumer, 2, {'sensor_id': 's2'})
+    _deliver(consumer, 3, {'sensor_id': 's1', 'fail': True})
+    _deliver(consumer, 4, b'not json')
+    _deliver(consumer, 5, {'sensor_id': 's2'})
+    _wait_for(lambda: consumer._tracker.pending() == 5)
+    consumer.flush()
+
+    calls = [(c[0], c[2]) for c in channel.method_calls]
+    assert calls == [
+        ('basic_ack', {'delivery_tag': 2, 'multiple': True}),
+        ('basic_nack', {'delivery_tag': 3, 'requeue': True}),
+        ('basic_nack', {'delivery_tag': 4, 'requeue': False}),
+        ('basic_ack', {'delivery_tag': 5, 'multiple': True}),
+    ]
+    stats = consumer.stats()
+    assert (stats['acked'], stats['nacked'], stats['ack_frames']) == (3, 2, 2)
+
+
+def test_ack_batch_threshold_schedules_flush_on_io_thread():
+    consumer = PartitionedConsumer(lambda data: None, workers=1, ack_batch=3)
+    connection, channel = FakeConnection(), MagicMock()
+    consumer.bind(connection, channel)
+
+    for tag in range(1, 4):
+        _deliver(consumer, tag, {'sensor_id': 's1'})
+    _wait_for(lambda: connection.callbacks)
+
+    channel.basic_ack.assert_not_called()  # nothing sent off the I/O thread
+    connection.run_pending()
+    channel.basic_ack.assert_called_once_with(delivery_tag=3, multiple=True)
+
+
+def test_rebind_discards_completions_from_old_channel():
+    release = threading.Event()
+    consumer = PartitionedConsumer(lambda data: release.wait(2), workers=1, ack_batch=1000)
+    consumer.bind(FakeConnection(), MagicMock())
+    _deliver(consumer, 1, {'sensor_id': 's1'})
+
+    new_channel = MagicMock()
+    consumer.bind(FakeConnection(), new_channel)
+    release.set()
+    time.sleep(0.05)
+    consumer.flush()
+
+    new_channel.basic_ack.assert_not_called()
+    assert consumer._tracker.pending() == 0
+
+
+def test_prepare_runs_once_per_drained_batch():
+    release = threading.Event()
+    prepared, handled = [], []
+
+    def handler(data, label=None):
+        release.wait(2)
+        handled.append((data['n'], label))
+
+    def prepare(batch):
+        prepared.append(len(batch))
+        return [f"label-{data['n']}" for data in batch]
+
+    consumer = PartitionedConsumer(handler, workers=1, ack_batch=1000, prepare=prepare, max_batch=10)
+    consumer.bind(FakeConnection(), MagicMock())
+    for tag in range(1, 6):
+        _deliver(consumer, tag, {'sensor_id': 's1', 'n': tag})
+    release.set()
+    _wait_for(lambda: len(handled) == 5)
+
+    # The worker may grab the first message alone; the backlog behind it goes as one batch
+    assert sum(prepared) == 5 and len(prepared) <= 2
+    assert handled == [(n, f'label-{n}') for n in range(1, 6)]
+
+
+def test_failed_prepare_falls_back_to_plain_handler():
+    handled = []
+
+    def prepare(batch):
+        raise KeyError('temperature')
+
+    consumer = PartitionedConsumer(lambda data: handled.append(data['n']), workers=1, ack_batch=1000, prepare=prepare)
+    consumer.bind(FakeConnection(), MagicMock())
+    _deliver(consumer, 1, {'sensor_id': 's1', 'n': 1})
+    _wait_for(lambda: handled == [1])
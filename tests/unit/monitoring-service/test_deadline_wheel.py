@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from deadline_wheel import DeadlineWheel  # noqa: E402
+
+
+def test_keys_expire_once_deadline_passes():
+    wheel = DeadlineWheel(resolution=1)
+    wheel.schedule('a', 1005)
+    wheel.schedule('b', 1010)
+    assert wheel.expire(1004) == []
+    assert wheel.expire(1005) == ['a']
+    assert wheel.expire(1009) == []
+    assert wheel.expire(1010) == ['b']
+    assert len(wheel) == 0
+
+
+def test_fractional_deadline_rounds_up():
+    wheel = DeadlineWheel(resolution=1)
+    wheel.schedule('a', 1005.2)
+    assert wheel.expire(1005.9) == []
+    assert wheel.expire(1006) == ['a']
+
+
+def test_rescheduling_keeps_earlier_slot_and_moves_earlier():
+    wheel = DeadlineWheel(resolution=1)
+    wheel.schedule('a', 1005)
+    wheel.schedule('a', 1050)  # later: lazily ignored
+    assert wheel.expire(1005) == ['a']
+
+    wheel.schedule('b', 1050)
+    wheel.schedule('b', 1020)  # earlier: moved
+    assert wheel.expire(1020) == ['b']
+    assert wheel.expire(1100) == []
+
+
+def test_past_deadline_fires_on_next_tick():
+    wheel = DeadlineWheel(resolution=1)
+    wheel.expire(2000)
+    wheel.schedule('late', 1500)
+    assert wheel.expire(2000) == []
+    assert wheel.expire(2001) == ['late']
+
+
+def test_long_gap_between_ticks_collects_all_due_buckets():
+    wheel = DeadlineWheel(resolution=1)
+    wheel.expire(0)
+    for i in range(100):
+        wheel.schedule(f's{i}', 10 + i * 1000)
+    assert sorted(wheel.expire(50_000), key=lambda k: int(k[1:])) == [f's{i}' for i in range(50)]
+    assert len(wheel) == 50
+
+
+def test_cancel():
+    wheel = DeadlineWheel(resolution=1)
+    wheel.schedule('a', 10)
+    wheel.cancel('a')
+    wheel.cancel('missing')
+    assert 'a' not in wheel
+    assert wheel.expire(20) == []
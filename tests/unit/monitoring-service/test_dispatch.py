@@ -0,0 +1,65 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from dispatch import IncidentDispatcher  # noqa: E402
+
+
+def test_tasks_run_off_the_caller_thread():
+    dispatcher = IncidentDispatcher(workers=2, max_queue=10)
+    ran_on = []
+
+    dispatcher.submit(lambda: ran_on.append(threading.current_thread().name))
+    dispatcher.join()
+
+    assert ran_on and ran_on[0].startswith('incident-dispatch-')
+    assert dispatcher.stats()['completed'] == 1
+
+
+def test_slow_side_effects_do_not_block_submit():
+    dispatcher = IncidentDispatcher(workers=4, max_queue=10)
+    release = threading.Event()
+
+    start = time.monotonic()
+    for _ in range(4):
+        dispatcher.submit(release.wait, 5)
+    assert time.monotonic() - start < 1.0
+    assert dispatcher.stats()['submitted'] == 4
+
+    release.set()
+    dispatcher.join()
+    assert dispatcher.stats()['completed'] == 4
+
+
+def test_full_queue_applies_backpressure_then_drops():
+    dispatcher = IncidentDispatcher(workers=1, max_queue=1, submit_timeout=0.05)
+    release = threading.Event()
+    dispatcher.submit(release.wait, 5)   # occupies the only worker
+    time.sleep(0.05)
+    assert dispatcher.submit(lambda: None)  # fills the queue
+    assert dispatcher.depth == 1
+
+    start = time.monotonic()
+    assert dispatcher.submit(lambda: None) is False
+    assert time.monotonic() - start >= 0.05
+    assert dispatcher.stats()['dropped'] == 1
+
+    release.set()
+    dispatcher.join()
+
+
+def test_failures_are_counted_not_raised():
+    dispatcher = IncidentDispatcher(workers=0)
+
+    def boom():
+        raise RuntimeError('downstream exploded')
+
+    dispatcher.submit(boom)
+    stats = dispatcher.stats()
+    assert stats['failed'] == 1
+    assert stats['busy'] == 0
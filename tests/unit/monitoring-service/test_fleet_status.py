@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+import pytest  # noqa: E402
+
+pytest.importorskip('numpy')
+
+from classifier import BandTable  # noqa: E402
+from fleet_status import FleetStatus  # noqa: E402
+from state_store import SensorStateStore  # noqa: E402
+
+BANDS = BandTable()
+
+
+def _store(readings):
+    store = SensorStateStore(window_seconds=10)
+    for sensor_id, temp in readings.items():
+        state = store.touch(sensor_id)
+        state.last_seen, state.last_temp, state.state = 1000, temp, BANDS.classify_one(temp)
+    return store
+
+
+def test_summary_counts_and_worst_sensor():
+    store = _store({'a': 70.0, 'b': 76.0, 'c': 85.0, 'd': 90.0, 'e': 60.0})
+    store.get('a').silent = True
+    summary = FleetStatus(store).summary()
+    assert summary.counts == {'ALARM': 3, 'WARN': 1, 'OK': 1, 'UNKNOWN': 0}
+    assert summary.silent == 1
+    assert summary.worst.sensor_id == 'd'  # furthest outside the OK band
+    assert summary.sensor_ids == ['a', 'b', 'c', 'd', 'e']
+
+
+def test_summary_uses_per_sensor_bands():
+    store = _store({'a': 70.0, 'server-room': 60.0})
+    bands = BandTable(sensors={'server-room': {'ok_low': 55.0, 'warn_low': 50.0}})
+    summary = FleetStatus(store, bands=bands).summary()
+    assert summary.counts['OK'] == 2 and summary.counts['ALARM'] == 0
+
+
+def test_summary_is_cached_for_ttl():
+    store = _store({'a': 70.0})
+    status = FleetStatus(store, ttl=60)
+    first = status.summary()
+    store.touch('b')
+    assert status.summary() is first
+    status.invalidate()
+    assert status.summary().sensor_ids == ['a', 'b']
+    assert status.rebuilds == 2
+
+
+def test_keyset_pagination_and_state_filter():
+    store = _store({f's{i:02d}': (90.0 if i % 3 == 0 else 70.0) for i in range(10)})
+    status = FleetStatus(store)
+
+    page, cursor = status.page(limit=4)
+    assert [s['sensor_id'] for s in page] == ['s00', 's01', 's02', 's03'] and cursor == 's03'
+    page, cursor = status.page(cursor, limit=4)
+    assert [s['sensor_id'] for s in page] == ['s04', 's05', 's06', 's07'] and cursor == 's07'
+    page, cursor = status.page(cursor, limit=4)
+    assert [s['sensor_id'] for s in page] == ['s08', 's09'] and cursor is None
+
+    page, cursor = status.page(limit=10, state='ALARM')
+    assert [s['sensor_id'] for s in page] == ['s00', 's03', 's06', 's09'] and cursor is None
+    assert page[0] == {'sensor_id': 's00', 'last_seen': 1000, 'temp_f': 90.0, 'state': 'ALARM',
+                       'high_temp_start': None, 'silent': False}
+
+
+def test_page_skips_sensors_evicted_since_summary():
+    store = _store({'a': 70.0, 'b': 70.0})
+    status = FleetStatus(store, ttl=60)
+    status.summary()
+    store.remove('a')
+    page, _ = status.page(limit=10)
+    assert [s['sensor_id'] for s in page] == ['b']
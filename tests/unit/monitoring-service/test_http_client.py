@@ -0,0 +1,113 @@
+import sys
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from http_client import LatencyHistogram, ServiceClient  # noqa: E402
+
+
+def _refused():
+    # What requests raises when the TCP connect itself fails
+    from urllib3.exceptions import MaxRetryError, NewConnectionError
+    reason = NewConnectionError(None, 'Failed to establish a new connection: [Errno 111] Connection refused')
+    return requests.exceptions.ConnectionError(MaxRetryError(None, '/incidents', reason))
+
+
+def _response(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    return response
+
+
+@pytest.fixture
+def client():
+    c = ServiceClient('logging', 'http://logging-service:5002/', connect_timeout=1, read_timeout=3, retries=2)
+    with patch.object(c.session, 'request') as mock_request, \
+            patch('http_client.time.sleep', return_value=None):
+        c.mock_request = mock_request
+        yield c
+
+
+def test_requests_use_explicit_timeouts_and_base_url(client):
+    client.mock_request.return_value = _response(201)
+
+    response = client.post('/incidents', json={'type': 'x'})
+
+    assert response.status_code == 201
+    client.mock_request.assert_called_once_with(
+        'POST', 'http://logging-service:5002/incidents', json={'type': 'x'}, timeout=(1, 3))
+
+
+def test_connection_errors_are_retried_then_raised(client):
+    client.mock_request.side_effect = _refused()
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.post('/incidents', json={})
+
+    assert client.mock_request.call_count == 3
+    assert client.stats()['latency']['errors'] == 3
+
+
+def test_post_read_timeout_is_not_replayed(client):
+    client.mock_request.side_effect = requests.exceptions.ReadTimeout('slow')
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.post('/incidents', json={})
+
+    client.mock_request.assert_called_once()
+
+
+def test_post_dropped_after_sending_is_not_replayed(client):
+    # The server may have applied the POST before the connection dropped
+    client.mock_request.side_effect = requests.exceptions.ConnectionError(
+        ConnectionError('Connection aborted.', 'RemoteDisconnected'))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.post('/incidents', json={})
+
+    client.mock_request.assert_called_once()
+
+
+def test_post_connect_timeout_is_retried(client):
+    client.mock_request.side_effect = [requests.exceptions.ConnectTimeout('connect'), _response(201)]
+
+    assert client.post('/incidents', json={}).status_code == 201
+    assert client.mock_request.call_count == 2
+
+
+def test_get_retries_after_dropped_connection(client):
+    client.mock_request.side_effect = [requests.exceptions.ConnectionError('Connection aborted.'), _response(200)]
+
+    assert client.get('/health').status_code == 200
+    assert client.mock_request.call_count == 2
+
+
+def test_get_retries_on_503_then_succeeds(client):
+    client.mock_request.side_effect = [_response(503), _response(200)]
+
+    assert client.get('/health').status_code == 200
+    assert client.mock_request.call_count == 2
+
+
+def test_per_call_retry_override(client):
+    client.mock_request.side_effect = requests.exceptions.ConnectionError('refused')
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get('/health', retries=0)
+    client.mock_request.assert_called_once()
+
+
+def test_latency_histogram_buckets_are_cumulative():
+    histogram = LatencyHistogram(buckets=(0.01, 0.1, 1.0))
+    for seconds in (0.005, 0.05, 0.05, 2.0):
+        histogram.observe(seconds)
+
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 4
+    assert snapshot['buckets'] == {'0.01': 1, '0.1': 3, '1.0': 3, '+Inf': 4}
@@ -0,0 +1,64 @@
+import random
+import sys
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from sliding_window import SlidingWindow  # noqa: E402
+
+
+def test_evicts_readings_outside_window():
+    window = SlidingWindow(10)
+    window.add(1000, 70.0)
+    window.add(1005, 71.0)
+    window.add(1010, 72.0)  # 1000 is now exactly 10s old and drops out
+
+    assert list(window) == [(1005, 71.0), (1010, 72.0)]
+    assert window.span_seconds == 5
+
+
+def test_swing_catches_peak_in_the_middle_of_the_window():
+    window = SlidingWindow(10)
+    for ts, temp in [(1000, 70.0), (1002, 85.0), (1004, 71.0)]:
+        window.add(ts, temp)
+
+    # First vs. last differs by 1F, but the real swing is 15F
+    assert window.min == 70.0
+    assert window.max == 85.0
+    assert window.swing == 15.0
+
+
+def test_min_max_track_eviction():
+    window = SlidingWindow(3)
+    window.add(1, 90.0)
+    window.add(2, 60.0)
+    window.add(3, 75.0)
+    window.add(4, 74.0)  # evicts 90.0
+    assert (window.min, window.max) == (60.0, 75.0)
+    window.add(5, 73.0)  # evicts 60.0
+    assert (window.min, window.max) == (73.0, 75.0)
+
+
+def test_late_reading_is_clamped_to_newest_timestamp():
+    window = SlidingWindow(10)
+    window.add(1000, 70.0)
+    window.add(995, 71.0)
+    assert list(window)[-1] == (1000, 71.0)
+
+
+def test_matches_brute_force_on_random_stream():
+    rng = random.Random(7)
+    window = SlidingWindow(10)
+    history = []
+    ts = 0
+    for _ in range(2000):
+        ts += rng.choice([0, 1, 1, 2, 3])
+        temp = round(rng.uniform(55.0, 95.0), 2)
+        window.add(ts, temp)
+        history.append((ts, temp))
+        recent = [t for (s, t) in history if s > ts - 10]
+        assert window.min == min(recent)
+        assert window.max == max(recent)
+        assert len(window) == len(recent)
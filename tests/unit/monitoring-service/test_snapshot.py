@@ -0,0 +1,152 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('numpy')
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from coalescer import OPEN, SUPPRESS, IncidentCoalescer  # noqa: E402
+from snapshot import SnapshotError, Snapshotter, load_snapshot, write_snapshot  # noqa: E402
+from state_store import SensorStateStore  # noqa: E402
+
+
+def _populated_store():
+    store = SensorStateStore(window_seconds=10)
+    hot = store.touch('hot-1')
+    hot.last_seen, hot.last_temp, hot.state, hot.high_temp_start, hot.reported_temp = 1010, 85.5, 'ALARM', 900, 85.0
+    for ts, temp in ((1002, 80.0), (1005, 92.0), (1010, 85.5)):
+        hot.window.add(ts, temp)
+    quiet = store.touch('quiet-2')
+    quiet.last_seen, quiet.last_temp, quiet.state, quiet.silent = 500.5, 70.0, 'OK', True
+    store.touch('new-3')
+    return store
+
+
+def test_round_trip_restores_every_field(tmp_path):
+    path = str(tmp_path / 'state.snap')
+    assert write_snapshot(_populated_store(), path) == 3
+
+    restored = SensorStateStore(window_seconds=10)
+    header = load_snapshot(restored, path)
+    assert header['sensors'] == 3
+
+    hot = restored.get('hot-1')
+    assert (hot.last_seen, hot.last_temp, hot.state, hot.high_temp_start, hot.reported_temp, hot.silent) == \
+        (1010, 85.5, 'ALARM', 900, 85.0, False)
+    assert list(hot.window) == [(1002, 80.0), (1005, 92.0), (1010, 85.5)]
+    assert hot.window.swing == 12.0
+
+    quiet = restored.get('quiet-2')
+    assert (quiet.last_seen, quiet.silent, len(quiet.window)) == (500.5, True, 0)
+    new = restored.get('new-3')
+    assert (new.last_seen, new.last_temp, new.state) == (None, None, 'UNKNOWN')
+
+
+def test_open_incidents_survive_a_restart(tmp_path):
+    coalescer = IncidentCoalescer(cooldown=300, resolve_after=120)
+    _, silent = coalescer.record('quiet-2', 'Sensor Silent', 'N/A', now=500, sticky=True)
+    coalescer.attach_id(silent, 41)
+    _, hot = coalescer.record('hot-1', 'High Temperature', 91.0, now=950)
+    coalescer.attach_id(hot, 42)
+    coalescer.record('hot-1', 'High Temperature', 95.5, now=1000)
+    coalescer.record('new-3', 'Erratic Sensor Data', 12.0, now=1005)   # create still in flight
+    path = str(tmp_path / 'state.snap')
+    write_snapshot(_populated_store(), path, coalescer)
+
+    restored = IncidentCoalescer(cooldown=300, resolve_after=120)
+    header = load_snapshot(SensorStateStore(window_seconds=10), path, restored)
+    assert header['incidents'] == 2 and len(restored) == 2
+
+    # A repeat folds into the restored incident instead of opening a new row
+    decision, incident = restored.record('hot-1', 'High Temperature', 96.0, now=1010)
+    assert decision == SUPPRESS and incident.incident_id == 42
+    assert (incident.count, incident.peak, incident.opened_at) == (3, 96.0, 950)
+    # The silent sensor's incident can still be resolved in logging
+    incident = restored.resolve('quiet-2', 'Sensor Silent')
+    assert incident.incident_id == 41 and incident.sticky and incident.last_value == 'N/A'
+
+    # Its create never returned, so no id to resolve it by: dropped, and the
+    # next occurrence opens a fresh incident
+    assert header['dropped_incidents'] == [('new-3', 'Erratic Sensor Data')]
+    assert not restored.is_open('new-3', 'Erratic Sensor Data')
+    assert restored.record('new-3', 'Erratic Sensor Data', 12.0, now=1010)[0] == OPEN
+
+
+def test_snapshotter_restores_incidents_into_its_coalescer(tmp_path):
+    coalescer = IncidentCoalescer()
+    _, incident = coalescer.record('hot-1', 'High Temperature', 91.0, now=950)
+    coalescer.attach_id(incident, 7)
+    path = str(tmp_path / 'state.snap')
+    Snapshotter(_populated_store(), path, coalescer=coalescer).stop()
+
+    restored = IncidentCoalescer()
+    assert Snapshotter(SensorStateStore(window_seconds=10), path, coalescer=restored).restore()['incidents'] == 1
+    assert restored.resolve('hot-1', 'High Temperature').incident_id == 7
+
+
+def test_write_is_atomic_replace(tmp_path):
+    path = tmp_path / 'state.snap'
+    write_snapshot(_populated_store(), str(path))
+    write_snapshot(SensorStateStore(window_seconds=10), str(path))
+    assert not (tmp_path / 'state.snap.tmp').exists()
+    assert load_snapshot(SensorStateStore(window_seconds=10), str(path))['sensors'] == 0
+
+
+def test_corrupt_snapshot_is_rejected(tmp_path):
+    path = tmp_path / 'state.snap'
+    write_snapshot(_populated_store(), str(path))
+    data = bytearray(path.read_bytes())
+    data[20] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError):
+        load_snapshot(SensorStateStore(window_seconds=10), str(path))
+
+    path.write_bytes(b'HVSS')
+    with pytest.raises(SnapshotError):
+        load_snapshot(SensorStateStore(window_seconds=10), str(path))
+
+
+def test_snapshotter_skips_bad_snapshot_and_starts_cold(tmp_path, capsys):
+    path = tmp_path / 'state.snap'
+    path.write_bytes(b'garbage' * 10)
+    store = SensorStateStore(window_seconds=10)
+    snapshotter = Snapshotter(store, str(path))
+    assert snapshotter.restore() is None
+    assert len(store) == 0
+    assert 'Ignoring state snapshot' in capsys.readouterr().out
+    assert Snapshotter(store, str(tmp_path / 'missing.snap')).restore() is None
+
+
+def test_snapshotter_write_and_restore(tmp_path):
+    path = str(tmp_path / 'state.snap')
+    snapshotter = Snapshotter(_populated_store(), path, interval=60)
+    snapshotter.stop()
+    assert snapshotter.stats()['writes'] == 1 and snapshotter.stats()['last_sensors'] == 3
+
+    store = SensorStateStore(window_seconds=10)
+    assert Snapshotter(store, path).restore()['sensors'] == 3
+    assert store.get('hot-1').high_temp_start == 900
+
+
+def test_large_fleet_round_trip_is_fast(tmp_path):
+    store = SensorStateStore(window_seconds=10)
+    for i in range(50_000):
+        state = store.touch(f'sensor-{i}')
+        state.last_seen, state.last_temp, state.state = 1000 + i, 70.0, 'OK'
+        state.window.add(1000 + i, 70.0)
+    path = str(tmp_path / 'state.snap')
+
+    start = time.perf_counter()
+    write_snapshot(store, path)
+    restored = SensorStateStore(window_seconds=10)
+    load_snapshot(restored, path)
+    elapsed = time.perf_counter() - start
+
+    assert len(restored) == 50_000
+    assert restored.get('sensor-49999').last_seen == 50999
+    assert elapsed < 5.0
@@ -0,0 +1,100 @@
+import sys
+import threading
+from pathlib import Path
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from state_store import SensorState, SensorStateStore  # noqa: E402
+
+
+def test_touch_creates_once_and_returns_same_entry():
+    store = SensorStateStore(window_seconds=10)
+    state = store.touch('sensor-1')
+    assert store.touch('sensor-1') is state
+    assert store.get('sensor-1') is state
+    assert store.get('sensor-2') is None
+    assert 'sensor-1' in store and len(store) == 1
+    assert state.state == 'UNKNOWN' and state.window.window_seconds == 10
+
+
+def test_state_has_no_instance_dict():
+    state = SensorState('sensor-1', 10)
+    assert not hasattr(state, '__dict__')
+
+
+def test_evict_retired_drops_only_stale_sensors():
+    store = SensorStateStore(window_seconds=10)
+    store.touch('old').last_seen = 100
+    store.touch('fresh').last_seen = 5000
+    store.touch('never-reported')
+
+    assert store.evict_retired(cutoff=1000) == ['old']
+    assert 'old' not in store
+    assert {s.sensor_id for s in store.snapshot()} == {'fresh', 'never-reported'}
+
+
+def test_concurrent_touch_creates_single_entry():
+    store = SensorStateStore(window_seconds=10)
+    results = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        results.append(store.touch('sensor-1'))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(s) for s in results}) == 1
+
+
+def test_to_dict():
+    store = SensorStateStore(window_seconds=10)
+    state = store.touch('sensor-1')
+    state.last_seen, state.last_temp, state.state = 1000, 72.5, 'OK'
+    assert state.to_dict() == {
+        'sensor_id': 'sensor-1', 'last_seen': 1000, 'temp_f': 72.5, 'state': 'OK',
+        'high_temp_start': None, 'silent': False,
+    }
+
+
+def test_silence_is_only_marked_on_a_stale_sensor():
+    store = SensorStateStore(window_seconds=10)
+    state = store.touch('sensor-1')
+    assert not store.mark_silent(state, cutoff=1000)      # never reported
+    assert store.seen(state, 900) is False
+    assert not store.mark_silent(state, cutoff=900)
+    assert store.mark_silent(state, cutoff=1000) and state.silent
+    assert not store.mark_silent(state, cutoff=1000)      # already silent
+    assert store.seen(state, 1005) is True and not state.silent
+
+
+def test_reading_during_silence_check_is_never_lost():
+    # The monitor thread's mark_silent and a consumer's seen() race; either
+    # the reading lands first (no silence) or it sees and clears the flag
+    store = SensorStateStore(window_seconds=10)
+    for _ in range(200):
+        state = store.touch('sensor-1')
+        store.seen(state, 100)
+        barrier, outcome = threading.Barrier(2), {}
+
+        def monitor():
+            barrier.wait()
+            outcome['marked'] = store.mark_silent(state, cutoff=150)
+
+        def consumer():
+            barrier.wait()
+            outcome['cleared'] = store.seen(state, 200)
+
+        threads = [threading.Thread(target=monitor), threading.Thread(target=consumer)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not state.silent
+        assert outcome['marked'] == outcome['cleared']
+        store.clear()
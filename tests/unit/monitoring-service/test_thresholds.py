@@ -0,0 +1,121 @@
+import importlib.util
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('pika')
+pytest.importorskip('numpy')
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from thresholds import Limits, ThresholdConfig, VersionConflict  # noqa: E402
+
+# Load the app once per session; other test modules share the same instance
+monitoring_app = sys.modules.get('monitoring_app')
+if monitoring_app is None:
+    spec = importlib.util.spec_from_file_location("monitoring_app", str(SERVICE_DIR / 'app.py'))
+    monitoring_app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(monitoring_app)
+    sys.modules['monitoring_app'] = monitoring_app
+
+DEFAULTS = Limits(80.0, 300.0, 120.0, 10.0, 10.0)
+
+
+@pytest.fixture
+def app_thresholds():
+    monitoring_app.sensor_state.clear()
+    monitoring_app.silence_wheel.clear()
+    monitoring_app.transitions.clear()
+    monitoring_app.coalescer.clear()
+    yield monitoring_app.thresholds
+    monitoring_app.thresholds.update({}, source='test-reset')
+
+
+def test_overrides_compile_over_fleet_defaults():
+    config = ThresholdConfig(DEFAULTS)
+    current = config.update({'high_temp_threshold': 85, 'sensors': {'s1': {'silence_threshold_seconds': 30}}})
+    assert current.version == 1
+    assert current.for_sensor('other') == DEFAULTS._replace(high_temp_threshold=85.0)
+    assert current.for_sensor('s1') == DEFAULTS._replace(high_temp_threshold=85.0, silence_threshold_seconds=30.0)
+
+
+@pytest.mark.parametrize('bad', [
+    {'high_temp_threshhold': 85},
+    {'high_temp_threshold': -1},
+    {'high_temp_threshold': 'hot'},
+    {'sensors': {'s1': {'nope': 1}}},
+    {'bands': {'default': {'ok_low': 90}}},
+    {'bands': []},
+])
+def test_invalid_config_keeps_current_version(bad):
+    config = ThresholdConfig(DEFAULTS)
+    before = config.current
+    with pytest.raises(ValueError):
+        config.update(bad)
+    assert config.current is before and config.rejected == 1
+
+
+def test_expected_version_guards_concurrent_updates():
+    config = ThresholdConfig(DEFAULTS)
+    config.update({}, expected_version=0)
+    with pytest.raises(VersionConflict):
+        config.update({}, expected_version=0)
+
+
+def test_file_is_reloaded_only_when_changed(tmp_path, capsys):
+    path = tmp_path / 'thresholds.json'
+    path.write_text(json.dumps({'high_temp_threshold': 90}))
+    config = ThresholdConfig(DEFAULTS)
+    assert config.check_file(str(path)) is True
+    assert config.check_file(str(path)) is False
+    assert config.current.defaults.high_temp_threshold == 90.0
+
+    path.write_text('{"high_temp_threshold": ')
+    os.utime(path, ns=(1, 1))
+    assert config.check_file(str(path)) is False
+    assert config.current.defaults.high_temp_threshold == 90.0
+    assert 'Rejected threshold config' in capsys.readouterr().out
+    assert config.check_file(str(tmp_path / 'missing.json')) is False
+
+
+def test_reload_preserves_state_and_applies_new_limits(app_thresholds):
+    with patch.object(monitoring_app, 'log_incident') as log, \
+            patch.object(monitoring_app, 'trigger_alert'), patch.object(monitoring_app, 'trigger_automation'):
+        monitoring_app.handle_reading({'sensor_id': 's1', 'temperature': 82.0, 'timestamp': 1000})
+        state = monitoring_app.sensor_state.get('s1')
+        assert state.high_temp_start == 1000
+
+        # Raise the limit above the reading: the in-progress run ends
+        app_thresholds.update({'sensors': {'s1': {'high_temp_threshold': 85}}})
+        assert monitoring_app.sensor_state.get('s1') is state
+        monitoring_app.handle_reading({'sensor_id': 's1', 'temperature': 82.0, 'timestamp': 1001})
+        assert state.high_temp_start is None
+
+        # Shorter silence threshold takes effect for already-scheduled sensors
+        app_thresholds.update({'sensors': {'s1': {'silence_threshold_seconds': 5}}})
+        assert monitoring_app.check_sensor_silence(1001 + 6) == 1
+        monitoring_app.dispatcher.join()
+        log.assert_called_once_with('Sensor Silent', 's1', 'N/A', details={'last_seen': 1001})
+
+
+def test_thresholds_endpoints(app_thresholds):
+    client = monitoring_app.app.test_client()
+    version = client.get('/config/thresholds').json['version']
+
+    response = client.post('/config/thresholds', json={'expected_version': version, 'erratic_change_threshold': 15,
+                                                       'bands': {'default': {'ok_high': 76}}})
+    assert response.status_code == 200
+    assert response.json['version'] == version + 1
+    assert response.json['defaults']['erratic_change_threshold'] == 15.0
+    assert monitoring_app.fleet_status.bands.default.ok_high == 76.0
+
+    assert client.post('/config/thresholds', json={'expected_version': version}).status_code == 409
+    assert client.post('/config/thresholds', json={'silence_threshold_seconds': 0}).status_code == 400
+    assert client.post('/config/thresholds', data='nope', content_type='application/json').status_code == 400
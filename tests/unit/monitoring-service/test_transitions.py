@@ -0,0 +1,143 @@
+import importlib.util
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('pika')
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'monitoring-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from transitions import TransitionLog  # noqa: E402
+
+# Load the app once per session; other test modules share the same instance
+monitoring_app = sys.modules.get('monitoring_app')
+if monitoring_app is None:
+    spec = importlib.util.spec_from_file_location("monitoring_app", str(SERVICE_DIR / 'app.py'))
+    monitoring_app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(monitoring_app)
+    sys.modules['monitoring_app'] = monitoring_app
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    monitoring_app.sensor_state.clear()
+    monitoring_app.silence_wheel.clear()
+    monitoring_app.transitions.clear()
+    monitoring_app.coalescer.clear()
+    yield
+
+
+def _reading(sensor_id, temperature, timestamp=1000):
+    monitoring_app.handle_reading({'sensor_id': sensor_id, 'temperature': temperature, 'timestamp': timestamp})
+
+
+def test_log_versions_and_cursor():
+    log = TransitionLog(maxlen=3)
+    for n in range(5):
+        log.append({'n': n})
+    assert log.version == 5
+    events, truncated = log.since(3)
+    assert [e['n'] for e in events] == [3, 4] and not truncated
+    events, truncated = log.since(0)
+    assert [e['version'] for e in events] == [3, 4, 5] and truncated
+    assert log.since(5) == ([], False)
+
+
+def test_wait_blocks_until_append():
+    log = TransitionLog()
+    threading.Timer(0.05, log.append, args=({'n': 1},)).start()
+    start = time.monotonic()
+    events, _ = log.wait(0, timeout=2)
+    assert [e['n'] for e in events] == [1]
+    assert time.monotonic() - start < 1.5
+    assert log.wait(1, timeout=0.01) == ([], False)
+
+
+def test_close_wakes_waiters():
+    log = TransitionLog()
+    threading.Timer(0.05, log.close).start()
+    start = time.monotonic()
+    assert log.wait(0, timeout=5) == ([], False)
+    assert time.monotonic() - start < 1.5 and log.closed
+
+
+def test_shutdown_ends_open_streams(monkeypatch):
+    monkeypatch.setattr(monitoring_app, 'transitions', TransitionLog())
+    response = monitoring_app.app.test_client().get('/status/stream', buffered=False)
+    chunks = response.response
+    assert b'event: hello' in next(chunks)
+
+    threading.Timer(0.05, monitoring_app.begin_shutdown).start()
+    start = time.monotonic()
+    assert list(chunks) == []
+    assert time.monotonic() - start < monitoring_app.STATUS_STREAM_HEARTBEAT_SECONDS
+    response.close()
+
+
+def test_only_transitions_are_published():
+    _reading('s1', 70.0)             # UNKNOWN -> OK
+    _reading('s1', 71.0)             # still OK
+    _reading('s1', 90.0, 1001)       # OK -> ALARM
+    _reading('s1', 90.5, 1002)       # ALARM, small move
+    _reading('s1', 91.5, 1003)       # ALARM, moved >= 1.0
+    monitoring_app.dispatcher.join()
+    events, _ = monitoring_app.transitions.since(0)
+    assert [(e['previous'], e['state'], e['temp_f']) for e in events] == [
+        ('UNKNOWN', 'OK', 70.0), ('OK', 'ALARM', 90.0), ('ALARM', 'ALARM', 91.5)]
+
+
+def test_silence_and_recovery_are_published():
+    _reading('s1', 70.0)
+    monitoring_app.check_sensor_silence(1000 + monitoring_app.SENSOR_SILENCE_THRESHOLD_SECONDS + 1)
+    _reading('s1', 70.0, 2000)
+    monitoring_app.dispatcher.join()
+    events, _ = monitoring_app.transitions.since(1)
+    assert [(e['state'], e['silent']) for e in events] == [('OK', True), ('OK', False)]
+
+
+def test_changes_long_poll():
+    client = monitoring_app.app.test_client()
+    epoch = monitoring_app.STREAM_EPOCH
+    assert client.get('/status/changes').json == {
+        'version': 0, 'epoch': epoch, 'cursor': f'{epoch}:0', 'events': [], 'reset': False}
+    _reading('s1', 90.0)
+    body = client.get(f'/status/changes?cursor={epoch}:0&timeout=0').json
+    assert body['version'] == 1 and body['events'][0]['state'] == 'ALARM' and not body['reset']
+    assert body['cursor'] == f'{epoch}:1'
+    assert client.get(f'/status/changes?cursor={epoch}:1&timeout=0').json['events'] == []
+    assert client.get(f'/status/changes?cursor={epoch}:99').json['reset'] is True
+    assert client.get('/status/changes?cursor=abc').status_code == 400
+
+
+def test_stream_resumes_from_last_event_id():
+    _reading('s1', 90.0)
+    _reading('s2', 60.0)
+    epoch = monitoring_app.STREAM_EPOCH
+    client = monitoring_app.app.test_client()
+    response = client.get('/status/stream', headers={'Last-Event-ID': f'{epoch}:1'}, buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    chunks = response.response
+    assert next(chunks).startswith(f'id: {epoch}:1\nevent: hello\n'.encode())
+    frame = next(chunks)
+    assert frame.startswith(f'id: {epoch}:2\nevent: transition\n'.encode()) and b'"sensor_id": "s2"' in frame
+    response.close()
+
+
+@pytest.mark.parametrize('last_event_id', ['old-process:1', '1'])
+def test_cursor_from_another_process_gets_reset(last_event_id):
+    # After a restart the new counter may already be past the old cursor;
+    # resuming from it would silently skip the ALARMs in between
+    for n in range(3):
+        _reading(f's{n}', 90.0)
+    client = monitoring_app.app.test_client()
+    response = client.get('/status/stream', headers={'Last-Event-ID': last_event_id}, buffered=False)
+    frame = next(response.response)
+    assert frame.startswith(f'id: {monitoring_app.STREAM_EPOCH}:3\nevent: reset\n'.encode())
+    response.close()
+    assert client.get(f'/status/changes?cursor={last_event_id}').json['reset'] is True
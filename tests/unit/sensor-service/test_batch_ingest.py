@@ -0,0 +1,109 @@
+import json
+import sys
+import importlib.util
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# If Flask isn't installed locally, skip these tests to be friendly for devs
+try:
+    import flask  # noqa: F401
+except ModuleNotFoundError:
+    pytest.skip("flask not installed", allow_module_level=True)
+
+# Load sensor module from file path because the package folder uses a hyphen
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'sensor-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+spec = importlib.util.spec_from_file_location("sensor_app", str(SERVICE_DIR / 'app.py'))
+sensor_app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(sensor_app)
+
+from readings import parse_batch, validate_batch  # noqa: E402
+
+app = sensor_app.app
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_validate_batch_accepts_and_rejects_per_item():
+    items = parse_batch(json.dumps([
+        {'sensor_id': 's1', 'temperature': 71.5, 'timestamp': 1000},
+        {'sensor_id': '', 'temperature': 71.5, 'timestamp': 1000},
+        {'sensor_id': 's2', 'temperature': 'hot', 'timestamp': 1000},
+        {'sensor_id': 's3', 'temperature': 70, 'timestamp': 1000.0},
+        {'sensor_id': 's4', 'temperature': True, 'timestamp': 1000},
+        'not-an-object',
+    ]), 'application/json')
+
+    accepted, errors = validate_batch(items)
+
+    assert [r['sensor_id'] for r in accepted] == ['s1', 's3']
+    assert accepted[1]['timestamp'] == 1000 and isinstance(accepted[1]['timestamp'], int)
+    assert accepted[0]['status'] == 'normal'
+    assert [e['index'] for e in errors] == [1, 2, 4, 5]
+
+
+def test_parse_batch_ndjson_rejects_only_bad_lines():
+    body = b'{"sensor_id": "s1", "temperature": 70.0, "timestamp": 1}\n{oops\n\n{"sensor_id": "s2", "temperature": 71.0, "timestamp": 2}\n'
+    items = parse_batch(body, 'application/x-ndjson; charset=utf-8')
+
+    accepted, errors = validate_batch(items)
+    assert [r['sensor_id'] for r in accepted] == ['s1', 's2']
+    assert errors == [{'index': 1, 'error': 'invalid JSON'}]
+
+
+def test_batch_endpoint_publishes_valid_readings_in_one_call(client):
+    readings = [
+        {'sensor_id': 's1', 'temperature': 70.0, 'timestamp': 1000},
+        {'sensor_id': 's2', 'temperature': 'bad', 'timestamp': 1000},
+        {'sensor_id': 's3', 'temperature': 72.0, 'timestamp': 1001},
+    ]
+    with patch.object(sensor_app.publisher, 'publish_many') as mock_publish_many:
+        response = client.post('/readings/batch', json=readings)
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['accepted'] == 2
+    assert data['rejected'] == 1
+    assert data['errors'][0]['index'] == 1
+    mock_publish_many.assert_called_once()
+    assert [r['sensor_id'] for r in mock_publish_many.call_args[0][0]] == ['s1', 's3']
+
+
+def test_batch_endpoint_rejects_non_array_body(client):
+    response = client.post('/readings/batch', json={'sensor_id': 's1'})
+    assert response.status_code == 400
+
+
+def test_batch_endpoint_rejects_invalid_utf8(client):
+    for content_type in ('application/json', 'application/x-ndjson'):
+        response = client.post('/readings/batch', data=b'[{"sensor_id": "\xff\xfe"}]', content_type=content_type)
+        assert response.status_code == 400
+        assert 'UTF-8' in json.loads(response.data)['error']
+
+
+def test_batch_endpoint_enforces_max_size(client):
+    with patch.object(sensor_app, 'READINGS_BATCH_MAX', 2):
+        response = client.post('/readings/batch', json=[{}, {}, {}])
+    assert response.status_code == 413
+
+
+def test_batch_endpoint_reports_broker_failure(client):
+    with patch.object(sensor_app.publisher, 'publish_many',
+                      side_effect=sensor_app.pika.exceptions.AMQPConnectionError):
+        response = client.post('/readings/batch', json=[{'sensor_id': 's1', 'temperature': 70.0, 'timestamp': 1}])
+    assert response.status_code == 503
+    assert json.loads(response.data)['accepted'] == 0
+
+
+def test_worker_exit_closes_publisher():
+    with patch.object(sensor_app.publisher, 'close') as close:
+        sensor_app.stop_worker()
+    close.assert_called_once_with(sensor_app.PUBLISH_CLOSE_TIMEOUT_SECONDS)
@@ -0,0 +1,164 @@
+import json
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+pika = pytest.importorskip("pika")
+
+# The service folder uses a hyphen, so put it on sys.path and import directly
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'sensor-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from publisher import BatchingPublisher, ConfirmTracker, PublishBufferFull, RabbitPublisher  # noqa: E402
+
+
+@pytest.fixture
+def mock_connection():
+    with patch.object(pika, 'BlockingConnection') as mock_conn:
+        yield mock_conn
+
+
+def test_publish_reuses_connection_and_declares_once(mock_connection):
+    channel = mock_connection.return_value.channel.return_value
+    pub = RabbitPublisher('mq', 5672, 'sensor_data')
+
+    for i in range(5):
+        pub.publish({'n': i})
+
+    mock_connection.assert_called_once()
+    channel.queue_declare.assert_called_once_with(queue='sensor_data', durable=True)
+    assert channel.basic_publish.call_count == 5
+    body = channel.basic_publish.call_args.kwargs['body']
+    assert json.loads(body) == {'n': 4}
+    assert pub.stats()['published'] == 5
+
+
+def test_publish_reconnects_once_when_idle_connection_dropped(mock_connection):
+    channel = mock_connection.return_value.channel.return_value
+    pub = RabbitPublisher('mq', 5672, 'sensor_data')
+    pub.publish({'n': 0})
+
+    channel.basic_publish.side_effect = [pika.exceptions.StreamLostError('gone'), None]
+    pub.publish({'n': 1})
+
+    assert mock_connection.call_count == 2
+    assert pub.connects == 2
+    assert pub.published == 2
+
+
+def test_publish_raises_when_fresh_connection_fails(mock_connection):
+    mock_connection.side_effect = pika.exceptions.AMQPConnectionError
+    pub = RabbitPublisher('mq', 5672, 'sensor_data')
+
+    with pytest.raises(pika.exceptions.AMQPConnectionError):
+        pub.publish({'n': 0})
+
+    # Next call tries again lazily
+    mock_connection.side_effect = None
+    pub.publish({'n': 1})
+    assert pub.published == 1
+
+
+def test_publish_many_is_serialized_across_threads(mock_connection):
+    channel = mock_connection.return_value.channel.return_value
+    in_flight = []
+    overlaps = []
+
+    def fake_publish(**kwargs):
+        in_flight.append(1)
+        if len(in_flight) > 1:
+            overlaps.append(True)
+        in_flight.pop()
+
+    channel.basic_publish.side_effect = fake_publish
+    pub = RabbitPublisher('mq', 5672, 'sensor_data')
+
+    threads = [threading.Thread(target=pub.publish_many, args=([{'n': i}] * 50,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not overlaps
+    assert pub.published == 400
+    mock_connection.assert_called_once()
+
+
+def test_confirm_tracker_multiple_ack_completes_batches_in_order():
+    tracker = ConfirmTracker()
+    first = tracker.add_batch(['a', 'b', 'c'], started_at=1.0)
+    second = tracker.add_batch(['d', 'e'], started_at=2.0)
+    assert (first.first_tag, second.first_tag) == (1, 4)
+
+    completed, acked = tracker.ack(2, multiple=True)
+    assert completed == [] and acked == 2
+
+    completed, acked = tracker.ack(5, multiple=True)
+    assert completed == [first, second] and acked == 3
+    assert tracker.pending == 0
+
+
+def test_confirm_tracker_nack_and_drain_return_bodies():
+    tracker = ConfirmTracker()
+    tracker.add_batch(['a', 'b', 'c'], started_at=1.0)
+
+    completed, nacked = tracker.nack(2)
+    assert completed == [] and nacked == ['b']
+
+    assert tracker.drain() == ['a', 'c']
+    assert tracker.pending == 0
+    assert tracker.next_tag == 1
+
+
+def _ready_batching_publisher(**kwargs):
+    pub = BatchingPublisher('mq', 5672, 'sensor_data', **kwargs)
+    pub._thread = MagicMock()  # no IO thread; drive callbacks by hand
+    pub._channel = MagicMock()
+    pub._ready = True
+    return pub
+
+
+def _confirm(method_cls, tag, multiple=False):
+    return MagicMock(method=method_cls(delivery_tag=tag, multiple=multiple))
+
+
+def test_batching_publisher_flushes_in_batches_and_reports_latency():
+    pub = _ready_batching_publisher(batch_size=2)
+    pub.publish_many([{'n': i} for i in range(5)])
+    pub._flush()
+
+    assert pub._channel.basic_publish.call_count == 5
+    assert pub.batches == 3
+    assert pub.stats()['pending_confirms'] == 5
+
+    pub._on_confirm(_confirm(pika.spec.Basic.Ack, 5, multiple=True))
+    stats = pub.stats()
+    assert stats['confirmed'] == 5
+    assert stats['pending_confirms'] == 0
+    assert stats['batch_latency_ms']['last'] is not None
+
+
+def test_batching_publisher_requeues_nacked_and_unconfirmed_messages():
+    pub = _ready_batching_publisher(batch_size=10)
+    pub.publish_many([{'n': i} for i in range(3)])
+    pub._flush()
+
+    pub._on_confirm(_confirm(pika.spec.Basic.Nack, 1))
+    assert pub.nacked == 1
+    assert [json.loads(b) for b in pub._buffer] == [{'n': 0}]
+
+    pub._on_connection_closed(MagicMock(), reason=None)
+    assert pub.unconfirmed == 2
+    assert sorted(json.loads(b)['n'] for b in pub._buffer) == [0, 1, 2]
+    assert pub.stats()['connected'] is False
+
+
+def test_batching_publisher_rejects_when_buffer_full():
+    pub = _ready_batching_publisher(batch_size=10, max_buffer=3)
+    pub.publish_many([{'n': 0}, {'n': 1}])
+    with pytest.raises(PublishBufferFull):
+        pub.publish_many([{'n': 2}, {'n': 3}])
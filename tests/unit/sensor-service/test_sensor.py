@@ -1,7 +1,7 @@
 import pytest
 import json
 from unittest.mock import patch, MagicMock
-from src.sensor-service.app import app, publish_message, generate_data, health_check
+from src.sensor-service.app import app, publish_message, generate_data, health_check, publisher
 
 @pytest.fixture
 def client():
@@ -9,6 +9,13 @@ def client():
     with app.test_client() as client:
         yield client
 
+@pytest.fixture(autouse=True)
+def reset_publisher():
+    # The publisher keeps its connection between calls; start each test cold
+    publisher.close()
+    yield
+    publisher.close()
+
 @patch('src.sensor-service.app.pika.BlockingConnection')
 @patch('src.sensor-service.app.time.sleep', return_value=None)
 def test_publish_message_success(mock_sleep, mock_connection):
@@ -17,11 +24,13 @@ def test_publish_message_success(mock_sleep, mock_connection):
 
     message = {'test': 'data'}
     publish_message(message)
+    publish_message(message)
 
+    # Connection and queue declaration are reused across calls
     mock_connection.assert_called_once()
     mock_channel.queue_declare.assert_called_once_with(queue='sensor_data', durable=True)
-    mock_channel.basic_publish.assert_called_once()
-    mock_connection.return_value.close.assert_called_once()
+    assert mock_channel.basic_publish.call_count == 2
+    mock_connection.return_value.close.assert_not_called()
 
 @patch('src.sensor-service.app.pika.BlockingConnection', side_effect=pika.exceptions.AMQPConnectionError)
 @patch('src.sensor-service.app.time.sleep', return_value=None)
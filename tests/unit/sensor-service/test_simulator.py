@@ -0,0 +1,104 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+SERVICE_DIR = Path(__file__).resolve().parents[3] / 'src' / 'sensor-service'
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from simulator import FleetSimulator, parse_profile_mix  # noqa: E402
+
+
+def test_parse_profile_mix():
+    assert parse_profile_mix('hot:0.1, erratic:0.2') == {'hot': 0.1, 'erratic': 0.2}
+    assert parse_profile_mix('') == {}
+    with pytest.raises(ValueError, match="Unknown fault profile"):
+        parse_profile_mix('melting:0.1')
+    with pytest.raises(ValueError, match="at most 1.0"):
+        parse_profile_mix('hot:0.8,cold:0.5')
+    for spec in ('hot:-0.1', 'hot:-0.5,cold:0.9', 'hot:1.5', 'hot:nan'):
+        with pytest.raises(ValueError, match="between 0 and 1"):
+            parse_profile_mix(spec)
+
+
+@pytest.mark.parametrize('rate, batch_size', [(0, 100), (-5, 100), (100, 0)])
+def test_non_positive_rate_or_batch_size_is_rejected(rate, batch_size):
+    # run() divides by both; fail loudly up front instead of in its thread
+    with pytest.raises(ValueError):
+        FleetSimulator(10, rate=rate, batch_size=batch_size)
+
+
+def test_profiles_are_assigned_by_fraction():
+    sim = FleetSimulator(1000, rate=100, profile_mix={'hot': 0.1, 'drift': 0.05}, seed=1)
+    counts = sim.profile_counts()
+    assert counts['hot'] == 100
+    assert counts['drift'] == 50
+    assert counts['normal'] == 850
+
+
+def test_default_profile_follows_fault_mode():
+    sim = FleetSimulator(50, rate=100, default_profile='cold', seed=1)
+    temps = [r['temperature'] for r in sim.next_batch(50, now=1000)]
+    assert all(58.0 <= t <= 62.0 for t in temps)
+
+
+def test_next_batch_walks_fleet_round_robin():
+    sim = FleetSimulator(10, rate=100, seed=1)
+    first = sim.next_batch(6, now=1000)
+    second = sim.next_batch(6, now=1000)
+    ids = [r['sensor_id'] for r in first + second]
+    assert ids[:10] == [f"sim-sensor-{i}" for i in range(1, 11)]
+    assert ids[10:] == ['sim-sensor-1', 'sim-sensor-2']
+    assert all(isinstance(r['temperature'], float) and r['timestamp'] == 1000 for r in first)
+
+
+def test_hot_and_erratic_ranges():
+    sim = FleetSimulator(200, rate=100, profile_mix={'hot': 0.5, 'erratic': 0.5}, seed=2)
+    batch = sim.next_batch(200, now=1000)
+    by_profile = dict(zip(sim.sensor_ids.tolist(), sim.profiles.tolist()))
+    hot = [r['temperature'] for r in batch if by_profile[r['sensor_id']] == 1]
+    erratic = [r['temperature'] for r in batch if by_profile[r['sensor_id']] == 3]
+    assert all(83.0 <= t <= 87.0 for t in hot)
+    assert max(erratic) - min(erratic) > 10.0
+
+
+def test_drift_sensors_warm_over_time():
+    sim = FleetSimulator(5, rate=100, default_profile='drift', seed=3)
+    early = np.mean([r['temperature'] for r in sim.next_batch(5, now=1000)])
+    for _ in range(400):
+        sim.next_batch(5, now=1000)
+    late = np.mean([r['temperature'] for r in sim.next_batch(5, now=1000)])
+    assert late - early > 10.0
+
+
+def test_silent_sensors_stop_after_grace_period():
+    sim = FleetSimulator(4, rate=100, profile_mix={'silent': 0.5}, silence_after=60, seed=4)
+    silent = set(sim.sensor_ids[sim.profiles == 5].tolist())
+
+    assert silent & {r['sensor_id'] for r in sim.next_batch(4, now=1000)}
+    later = {r['sensor_id'] for r in sim.next_batch(20, now=1061)}
+    assert not (silent & later)
+    assert len(later) == 2
+
+
+def test_run_publishes_until_stopped():
+    sim = FleetSimulator(100, rate=5000, batch_size=100, seed=5)
+    published = []
+
+    def publish_many(batch):
+        published.append(len(batch))
+        if sum(published) >= 500:
+            sim.stop()
+
+    thread = threading.Thread(target=sim.run, args=(publish_many,))
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert sum(published) >= 500
+    assert max(published) <= 100
+    assert sim.stats()['sent'] == sum(published)
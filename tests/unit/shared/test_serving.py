@@ -0,0 +1,143 @@
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('gunicorn')
+pytest.importorskip('flask')
+
+from src.shared.serving import BackgroundLeader, server_options, watch_shutdown  # noqa: E402
+
+SERVING = Path(__file__).resolve().parents[3] / 'src' / 'shared' / 'serving.py'
+
+
+def test_server_options_from_env():
+    options = server_options({'PORT': '5002', 'SERVER_WORKERS': '4', 'SERVER_THREADS': '16',
+                              'SERVER_KEEPALIVE_SECONDS': '2', 'SERVER_GRACEFUL_TIMEOUT_SECONDS': '10',
+                              'SERVER_MAX_REQUESTS': '1000'})
+    assert options['bind'] == '0.0.0.0:5002'
+    assert options['workers'] == 4 and options['threads'] == 16 and options['worker_class'] == 'gthread'
+    assert options['keepalive'] == 2 and options['graceful_timeout'] == 10
+    assert options['max_requests'] == 1000 and options['max_requests_jitter'] == 100
+
+
+def test_server_option_defaults():
+    options = server_options({})
+    assert options['workers'] == 2 and options['max_requests'] == 0
+    assert server_options({'SERVER_WORKERS': '0'})['workers'] == 1
+
+
+def test_only_one_leader_until_it_releases(tmp_path):
+    path = str(tmp_path / 'svc.lock')
+    first, second = BackgroundLeader(path), BackgroundLeader(path)
+    assert first.acquire(blocking=False)
+    assert not second.acquire(blocking=False)
+    first.release()
+    assert second.acquire(blocking=False)
+    second.release()
+
+
+def test_takeover_is_abandoned_when_worker_is_stopping(tmp_path):
+    path = str(tmp_path / 'svc.lock')
+    holder, waiter = BackgroundLeader(path), BackgroundLeader(path, takeover_delay=0.5)
+    holder.acquire()
+    started = []
+    thread = threading.Thread(target=waiter.run, args=(lambda: started.append(1), lambda: False))
+    thread.start()
+    holder.release()
+    thread.join(timeout=5)
+    assert not thread.is_alive() and started == [] and not waiter.running
+    # The abandoned takeover left the lock free
+    assert holder.acquire(blocking=False)
+    holder.release()
+
+
+APP = textwrap.dedent('''
+    import os
+    from flask import Flask
+
+    app = Flask(__name__)
+
+    def start_background():
+        with open(os.environ['MARKER'], 'a') as f:
+            f.write(f"start {os.getpid()}\\n")
+
+    def stop_background():
+        with open(os.environ['MARKER'], 'a') as f:
+            f.write(f"stop {os.getpid()}\\n")
+
+    def stop_worker():
+        with open(os.environ['MARKER'], 'a') as f:
+            f.write(f"exit {os.getpid()}\\n")
+
+    @app.route('/')
+    def index():
+        return str(os.getpid())
+''')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_shutdown_hook_runs_once_worker_is_told_to_stop():
+    class Worker:
+        alive = True
+
+    worker, calls = Worker(), []
+    thread = threading.Thread(target=watch_shutdown, args=(worker, lambda: calls.append(1), 0.01))
+    thread.start()
+    time.sleep(0.05)
+    assert calls == []
+    worker.alive = False
+    thread.join(timeout=2)
+    assert calls == [1]
+
+
+def test_background_starts_once_across_workers(tmp_path):
+    # Same layout as the images: serving.py next to app.py
+    shutil.copy(SERVING, tmp_path / 'serving.py')
+    (tmp_path / 'app.py').write_text(APP)
+    marker = tmp_path / 'marker'
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), SERVER_WORKERS='3', SERVER_LOCK_DIR=str(tmp_path),
+               SERVER_GRACEFUL_TIMEOUT_SECONDS='5', MARKER=str(marker))
+    server = subprocess.Popen([sys.executable, 'serving.py'], cwd=tmp_path, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 20
+        while True:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1) as response:
+                    assert response.status == 200
+                break
+            except OSError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.2)
+        time.sleep(1.0)  # let every worker finish booting
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=20)
+
+    events = [line.split() for line in marker.read_text().splitlines()]
+    started = [pid for event, pid in events if event == 'start']
+    stopped = [pid for event, pid in events if event == 'stop']
+    assert len(started) == 1 and len(stopped) == 1
+    # The same worker started and stopped the background tasks
+    assert started == stopped
+    # Every worker ran its own exit hook, the leader after stop_background()
+    exited = [pid for event, pid in events if event == 'exit']
+    assert len(exited) == 3 and len(set(exited)) == 3
+    assert events.index(['stop', stopped[0]]) < events.index(['exit', stopped[0]])